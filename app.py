@@ -1,20 +1,41 @@
 import streamlit as st
 from utils.data_loader import load_trading_log
-from pages_module.page_kr import show_kr_analysis, show_kr_input
-from pages_module.page_us import show_us_analysis, show_us_input
+from utils.prefetch import start_prefetch
+from utils.profiling import start_run, finish_run
+from utils.config import PROFILING_ENABLED
+
+# 장 마감 후 가격 캐시를 미리 받는 백그라운드 스케줄러 (프로세스당 한 번 시작)
+start_prefetch()
 
 # 거래로그 로드
 load_trading_log()
 
 st.set_page_config(page_title="투자 대시보드", layout="wide")
 st.title("💹 투자 대시보드")
-page = st.sidebar.radio("메뉴 선택", ["국내계좌 분석", "해외계좌 분석", "국내계좌 매수/매도 정보 입력", "해외계좌 매수/매도 정보 입력"])
+page = st.sidebar.radio("메뉴 선택", ["국내계좌 분석", "해외계좌 분석", "국내계좌 매수/매도 정보 입력", "해외계좌 매수/매도 정보 입력"],
+                        key="page")
+debug = st.sidebar.checkbox("디버그 패널", value=PROFILING_ENABLED, key="debug")
+
+# 디버그 패널을 켠 경우에만 이번 실행의 구간별 시간 / 카운터를 기록
+if debug:
+    start_run(page)
+try:
+    # 페이지 모듈은 처음 선택될 때 import (첫 화면에서 쓰지 않는 모듈 로드 비용을 줄임)
+    if page == "국내계좌 분석":
+        from pages_module.page_kr import show_kr_analysis
+        show_kr_analysis()
+    elif page == "해외계좌 분석":
+        from pages_module.page_us import show_us_analysis
+        show_us_analysis()
+    elif page == "국내계좌 매수/매도 정보 입력":
+        from pages_module.page_kr import show_kr_input
+        show_kr_input()
+    elif page == "해외계좌 매수/매도 정보 입력":
+        from pages_module.page_us import show_us_input
+        show_us_input()
+finally:
+    record = finish_run()
 
-if page == "국내계좌 분석":
-    show_kr_analysis()
-elif page == "해외계좌 분석":
-    show_us_analysis()
-elif page == "국내계좌 매수/매도 정보 입력":
-    show_kr_input()
-elif page == "해외계좌 매수/매도 정보 입력":
-    show_us_input()
\ No newline at end of file
+if record is not None:
+    from pages_module.debug_panel import show_debug_panel
+    show_debug_panel(record)
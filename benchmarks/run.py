@@ -0,0 +1,153 @@
+"""
+성능 벤치마크 (네트워크 없이 합성 거래로그 / 가격 패널 사용)
+
+    python -m benchmarks.run                         # 기본 규모
+    python -m benchmarks.run --trades 20000 --tickers 300 --repeat 5
+    python -m benchmarks.run --only calc_profit       # 이름에 포함된 항목만
+
+결과는 benchmarks/results/<커밋>.json 에 저장되고, 다른 커밋의 가장 최근 결과와 비교해 출력한다.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_tickers, make_price_dict, make_price_panel, make_trading_log
+from utils.analysis import analyze_account, calc_targets, calc_allocation_kr, calc_allocation_us
+from utils.finance import (calc_profit_kr, calc_profit_us, calc_realized_profit, get_remaining_cash,
+                           match_lots_kr, match_lots_us, calc_nav)
+from utils.ledger import PositionLedger
+from utils import indicators
+from utils.indicators import compute_indicators
+from utils.config import TARGET_STYLE_RULES_KR, TARGET_STYLE_RULES_US
+from pages_module.formats import rule_styles
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def _commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+def _time(func, repeat):
+    func()  # 첫 호출(지연 로드 등)은 제외
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {"min_s": min(samples), "median_s": statistics.median(samples), "repeat": repeat}
+
+def build_cases(args, panel_dir):
+    """{이름: 인자 없는 함수}"""
+    # 페이지처럼 지표 누적값을 저장하되 앱의 저장 경로 대신 임시 경로에 둔다
+    indicators.INDICATOR_STATE_DIR = os.path.join(panel_dir, "indicator_state")
+    cases = {}
+    for market in ["KR", "US"]:
+        US = market == "US"
+        tickers = make_tickers(args.tickers, US=US)
+        price_dict = make_price_dict(tickers, price_range=(20, 500) if US else (5_000, 50_000), seed=args.seed)
+        panel = make_price_panel(price_dict, panel_dir)
+        trading_log = make_trading_log(price_dict, args.trades, args.sell_ratio, args.partial_sell_ratio,
+                                       US=US, seed=args.seed)
+        last_close = panel.last_close()
+        book = match_lots_us(trading_log) if US else match_lots_kr(trading_log)
+        ledger = PositionLedger(trading_log, US=US)
+        calc_profit = calc_profit_us if US else calc_profit_kr
+        profit_df = calc_profit(trading_log, last_close, True, book=book)
+
+        held = profit_df["티커"].tolist()
+        close, high, low = (panel.field(field)[held] for field in ["Close", "High", "Low"])
+        category_col = None if US else "구분2"
+        target_table = analyze_account(market, trading_log, panel)["targets"]
+        style_rules = TARGET_STYLE_RULES_US if US else TARGET_STYLE_RULES_KR
+
+        prefix = market.lower()
+        cases.update({
+            f"{prefix}.match_lots": lambda log=trading_log, US=US: match_lots_us(log) if US else match_lots_kr(log),
+            f"{prefix}.calc_profit": lambda log=trading_log, f=calc_profit, lc=last_close: f(log, lc, True),
+            f"{prefix}.calc_profit(book)": lambda log=trading_log, f=calc_profit, lc=last_close, b=book: f(log, lc, True, book=b),
+            f"{prefix}.calc_realized_profit": lambda log=trading_log, US=US: calc_realized_profit(log, US=US),
+            f"{prefix}.get_remaining_cash": lambda log=trading_log, US=US: get_remaining_cash(log, US=US),
+            f"{prefix}.calc_nav": lambda log=trading_log, US=US, c=panel.close: calc_nav(log, c, US=US),
+            f"{prefix}.compute_indicators": lambda c=close, h=high, l=low: compute_indicators(c, h, l),
+            f"{prefix}.calc_targets": lambda df=profit_df, p=panel, col=category_col: calc_targets(df, p, col),
+            f"{prefix}.allocation": lambda df=profit_df, US=US: (calc_allocation_us if US else calc_allocation_kr)(df, 0.0),
+            # 분석 페이지와 같은 호출 (세션 장부의 book / realized_book, 저장된 지표 누적값 사용)
+            f"{prefix}.page_data": lambda m=market, log=trading_log, p=panel, l=ledger: analyze_account(
+                m, log, p, book=l.book, realized_book=l.realized_book, state_key=m),
+            f"{prefix}.style_targets": lambda df=target_table, r=style_rules: rule_styles(df, r),
+        })
+    return cases
+
+def _previous_result(commit):
+    files = [path for path in glob.glob(os.path.join(RESULTS_DIR, "*.json"))
+             if not os.path.basename(path).startswith(commit)]
+    if not files:
+        return None
+    with open(max(files, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="성능 벤치마크")
+    parser.add_argument("--trades", type=int, default=5000, help="계좌별 거래 수")
+    parser.add_argument("--tickers", type=int, default=100, help="계좌별 종목 수")
+    parser.add_argument("--sell-ratio", type=float, default=0.3, help="매도 거래 비율")
+    parser.add_argument("--partial-sell-ratio", type=float, default=0.7, help="매도 중 일부 매도 비율")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default=None, help="이름에 이 문자열이 포함된 항목만 실행")
+    parser.add_argument("--no-save", action="store_true", help="결과 파일을 저장하지 않음")
+    args = parser.parse_args(argv)
+
+    commit, dirty = _commit()
+    with tempfile.TemporaryDirectory() as panel_dir:
+        cases = build_cases(args, panel_dir)
+        results = {}
+        for name, func in cases.items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = _time(func, args.repeat)
+
+    previous = _previous_result(commit)
+    print(f"commit {commit}{' (dirty)' if dirty else ''}"
+          + (f" / 비교: {previous['commit']}" if previous else ""))
+    for name, result in results.items():
+        line = f"{name:<28} {result['min_s'] * 1000:10.2f} ms"
+        before = previous["results"].get(name) if previous else None
+        if before:
+            line += f"   {result['min_s'] / before['min_s']:6.2f}x ({before['min_s'] * 1000:.2f} ms)"
+        print(line)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": commit,
+                "dirty": dirty,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "params": {key: value for key, value in vars(args).items() if key not in ("only", "no_save")},
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"저장: {path}")
+
+if __name__ == "__main__":
+    main()
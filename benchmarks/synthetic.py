@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from utils.panel import build_price_panel
+
+# ---------------------------
+# 벤치마크용 합성 데이터 (네트워크 없이 생성)
+# 종목별 랜덤워크 가격을 먼저 만들고, 거래는 거래일 종가로 체결된 것으로 만든다.
+# 매도 수량은 항상 보유 수량 이하이므로 실제 거래로그와 같은 규칙을 따른다.
+
+CATEGORIES_KR = [("위험", "국내주식_지수"), ("위험", "국내주식_섹터"), ("위험", "해외주식_지수"),
+                 ("위험", "해외주식_섹터"), ("위험", "FX 및 원자재"), ("안전", "국내채권_종합"),
+                 ("안전", "국내채권_회사채"), ("안전", "해외채권_종합"), ("안전", "금리연계형/초단기채권")]
+CATEGORIES_US = ["지수구성", "개별종목"]
+
+def make_tickers(n_tickers, US=False):
+    if US:
+        letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+        return ["".join(letters[[i // 676 % 26, i // 26 % 26, i % 26]]) + "X" for i in range(n_tickers)]
+    return [f"{100000 + i * 7:06d}" for i in range(n_tickers)]
+
+def make_price_dict(tickers, start="2024-01-02", end="2025-10-15", price_range=(20, 500), seed=0):
+    """{티커: OHLCV DataFrame} (영업일 기준 랜덤워크, 시작가는 price_range에서 균등 추출)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    price_dict = {}
+    for ticker in tickers:
+        close = rng.uniform(*price_range) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        high = close * (1 + np.abs(rng.normal(0, 0.008, len(dates))))
+        low = close * (1 - np.abs(rng.normal(0, 0.008, len(dates))))
+        price_dict[ticker] = pd.DataFrame({
+            "Open": (high + low) / 2, "High": high, "Low": low, "Close": close,
+            "Volume": rng.integers(1_000, 1_000_000, len(dates)).astype(float),
+        }, index=pd.DatetimeIndex(dates, name="Date"))
+    return price_dict
+
+def make_price_panel(price_dict, panel_dir):
+    return build_price_panel(price_dict, list(price_dict), panel_dir=panel_dir)
+
+def make_trading_log(price_dict, n_trades, sell_ratio=0.3, partial_sell_ratio=0.7, US=False,
+                     trade_start="2025-01-02", seed=0):
+    """
+    price_dict의 종목으로 n_trades건의 거래로그를 만든다 (trading_log.csv / trading_log_us.csv 형식).
+    sell_ratio: 매도 비율, partial_sell_ratio: 매도 중 일부만 파는 비율 (나머지는 전량 매도)
+    """
+    rng = np.random.default_rng(seed)
+    tickers = list(price_dict)
+    closes = {ticker: df["Close"].loc[trade_start:] for ticker, df in price_dict.items()}
+    dates = closes[tickers[0]].index
+    trade_dates = np.sort(rng.choice(len(dates), n_trades))
+    categories = {ticker: (CATEGORIES_US[rng.integers(len(CATEGORIES_US))] if US
+                           else CATEGORIES_KR[rng.integers(len(CATEGORIES_KR))]) for ticker in tickers}
+
+    holdings = dict.fromkeys(tickers, 0)
+    rows = []
+    for date_pos in trade_dates:
+        ticker = tickers[rng.integers(len(tickers))]
+        trade_date = dates[date_pos]
+        price = float(closes[ticker].iloc[date_pos])
+
+        if holdings[ticker] > 0 and rng.random() < sell_ratio:
+            trade_type = "매도"
+            quantity = holdings[ticker]
+            if quantity > 1 and rng.random() < partial_sell_ratio:
+                quantity = int(rng.integers(1, quantity))
+            holdings[ticker] -= quantity
+        else:
+            trade_type = "매수"
+            quantity = int(rng.integers(1, 200))
+            holdings[ticker] += quantity
+
+        if US:
+            unit_price = round(price, 2)
+            rows.append({"티커": ticker, "이름": f"종목{ticker}", "거래일": trade_date, "거래유형": trade_type,
+                         "구분": categories[ticker], "거래수량": quantity, "평균단가": unit_price,
+                         "금액": round(unit_price * quantity, 2)})
+        else:
+            unit_price = round(price)
+            cat1, cat2 = categories[ticker]
+            rows.append({"구분1": cat1, "구분2": cat2, "거래일": trade_date, "티커": ticker,
+                         "종목명": f"ETF {ticker}", "거래유형": trade_type, "거래수량": quantity,
+                         "평균단가": float(unit_price), "금액": unit_price * quantity})
+
+    columns = (["티커", "이름", "거래일", "거래유형", "구분", "거래수량", "평균단가", "금액"] if US
+               else ["구분1", "구분2", "거래일", "티커", "종목명", "거래유형", "거래수량", "평균단가", "금액"])
+    return pd.DataFrame(rows, columns=columns)
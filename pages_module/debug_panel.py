@@ -0,0 +1,21 @@
+import streamlit as st
+import pandas as pd
+
+from utils.prefetch import read_status
+
+def show_debug_panel(record):
+    """사이드바에 이번 실행의 구간별 시간(ms)과 카운터 표시"""
+    with st.sidebar.expander("🛠 실행 시간", expanded=True):
+        st.markdown(f"**전체:** {record['total_s'] * 1000:,.1f} ms")
+        timings = pd.Series(record["timings_s"], dtype="float64").sort_values(ascending=False) * 1000
+        st.dataframe(timings.rename("ms").to_frame(),
+                     column_config={"ms": st.column_config.NumberColumn(label="ms", format="%,.1f")})
+        if record["counters"]:
+            st.dataframe(pd.Series(record["counters"], dtype="int64").rename("값").to_frame())
+
+    # 가격 미리 받기 상태 (utils/prefetch.py)
+    status = read_status()
+    if status:
+        with st.sidebar.expander("🛠 가격 미리 받기"):
+            st.dataframe(pd.DataFrame(status).T.reindex(
+                columns=["ok", "last_success", "next_run", "attempts", "tickers", "universe", "error"]))
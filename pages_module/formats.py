@@ -0,0 +1,59 @@
+import math
+import operator
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.config import TABLE_PAGE_SIZE
+
+# 계산 결과는 숫자로 유지하고 표시 형식은 column_config로만 지정한다.
+
+def percent_column(label):
+    return st.column_config.NumberColumn(label=label, format="%.2f%%")
+
+def krw_column(label):
+    return st.column_config.NumberColumn(label=label, format="%,d")
+
+def usd_column(label):
+    return st.column_config.NumberColumn(label=label, format="%,.2f")
+
+def usd_krw_column(label):
+    # 달러 금액을 원화로 환산해 보여줄 때
+    return st.column_config.NumberColumn(label=label, format="%,.0f원")
+
+# ---------------------------
+# 조건부 서식 / 페이지 나누기
+
+_OPS = {"<=": operator.le, "<": operator.lt, ">=": operator.ge, ">": operator.gt,
+        "==": operator.eq, "!=": operator.ne}
+
+def rule_styles(df, rules):
+    """
+    rules(utils/config.py의 *_STYLE_RULES)를 열 단위로 한 번에 비교해 df와 같은 모양의 CSS 표를 만든다.
+    df.style.apply(rule_styles, axis=None, rules=...) 형태로 쓴다. 없는 열을 가리키는 규칙은 건너뛴다.
+    """
+    styles = {}  # 열 -> CSS 배열
+    for rule in rules:
+        column, ref = rule["column"], rule.get("ref")
+        if column not in df.columns or (ref is not None and ref not in df.columns):
+            continue
+        if "op" in rule:
+            other = df[ref].to_numpy() * rule.get("scale", 1) if ref is not None else rule["value"]
+            with np.errstate(invalid="ignore"):
+                mask = np.asarray(_OPS[rule["op"]](df[column].to_numpy(), other), dtype=bool)
+        else:
+            mask = np.ones(len(df), dtype=bool)
+        css = styles.setdefault(column, np.full(len(df), "", dtype=object))
+        css[mask & (css == "")] = f"background-color: {rule['color']}"  # 먼저 칠한 칸은 유지
+    return pd.DataFrame(styles, index=df.index).reindex(columns=df.columns, fill_value="")
+
+def paginate(df, key, page_size=TABLE_PAGE_SIZE):
+    """행이 page_size보다 많으면 페이지 선택 입력을 보여주고 해당 페이지의 행만 반환한다."""
+    if len(df) <= page_size:
+        return df
+    n_pages = math.ceil(len(df) / page_size)
+    page = st.number_input(f"페이지 (전체 {len(df):,}행, {n_pages}페이지)", min_value=1, max_value=n_pages,
+                           value=1, step=1, key=key)
+    start = (int(page) - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -2,13 +2,14 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 
-from ta.momentum import RSIIndicator
-from ta.trend import ADXIndicator
-from ta.volatility import BollingerBands
+from utils.analysis import analyze_account
+from utils.data_loader import get_price, etf_index
+from utils.profiling import timer, count
+from utils.config import TARGET_STYLE_RULES_KR, ALLOCATION_STYLE_RULES
+from pages_module.trade_check import show_trade_impact
+from pages_module.formats import percent_column, krw_column, rule_styles, paginate
 
-from utils.finance import calc_profit_kr, get_remaining_cash, calc_realized_profit
-from utils.data_loader import get_price, load_etf_data
-from utils.config import INITIAL_CAPITAL_KR
+MONEY_COLUMNS = ["평균단가", "현재가", "평가손익", "현재평가금액", "기초평가금액", "매수단가", "매도단가", "실현손익"]
 
 def show_kr_analysis():
     # ---------------------------
@@ -16,14 +17,14 @@ def show_kr_analysis():
 
     # 거래로그
     trading_log = st.session_state.trading_log.copy()
+    count("trades", len(trading_log))
     
     # 가격 데이터
-    price_dict_KR = get_price(market="KR")
+    with timer("get_price"):
+        price_panel_KR = get_price(market="KR")
 
     # 현재 날짜
-    first_ticker = list(price_dict_KR.keys())[0]
-    first_ticker_df = price_dict_KR[first_ticker]
-    latest_date = first_ticker_df.index.max().date()
+    latest_date = price_panel_KR.latest_date.date()
 
     # ---------------------------
     ## 수익률 계산
@@ -36,291 +37,127 @@ def show_kr_analysis():
     with col2:
         st.markdown(f"**기준일:** {latest_date}")
 
-    # 수익률 데이터프레임
-    profit_df = calc_profit_kr(trading_log, price_dict_KR, apply_fee)
+    # 평가손익 / 실현손익 / 일별 총자산 / 목표수익률·지표 / 투자비중 (배치 리포트와 같은 계산,
+    # 매수/매도 매칭 결과는 세션의 보유 현황 장부를 그대로 사용)
+    ledger = st.session_state.ledger_kr
+    result = analyze_account("KR", trading_log, price_panel_KR, apply_fee, book=ledger.book,
+                             realized_book=ledger.realized_book, state_key="KR")
+    summary = result["summary"]
 
     # 평가손익 기준 정렬
-    result_df = profit_df.copy()
-    result_df["평가손익_int"] = result_df["평가손익"].str.replace(",", "").astype(int)
-    result_df = result_df.sort_values(by='평가손익_int',ascending=False, axis=0).reset_index(drop=True)
-    result_df = result_df.drop('평가손익_int',axis=1)
-    st.dataframe(result_df)
-
-    # ---------------------------
-    # 평가손익 총합 및 현재 자산 계산
-    profit_sum = result_df["평가손익"].str.replace(",", "").astype(int).sum()
-    eval_sum = result_df["현재평가금액"].str.replace(",", "").astype(int).sum()
-
-    remain_cash = get_remaining_cash(trading_log, US=False)
-    total_asset = eval_sum + remain_cash
-    total_return = profit_sum / INITIAL_CAPITAL_KR * 100
-
-    realized_profit_df, total_realized_profit = calc_realized_profit(trading_log, US=False)
+    result_df = result["profit"].sort_values(by='평가손익',ascending=False, axis=0).reset_index(drop=True)
+    with timer("render.profit"):
+        st.dataframe(paginate(result_df, key="profit_page_kr"),
+                     column_config={
+                        **{col: krw_column(col) for col in MONEY_COLUMNS},
+                        "투자수익률(%)": percent_column("투자수익률(%)")})
 
     st.markdown("#### 손익 실현 내역")
-    st.dataframe(realized_profit_df,
-                 column_config={
-                    "수익률(%)": st.column_config.NumberColumn(
-                        label="수익률(%)",
-                        format="%.2f%%")})
+    with timer("render.realized"):
+        st.dataframe(paginate(result["realized"], key="realized_page_kr"),
+                     column_config={
+                        **{col: krw_column(col) for col in MONEY_COLUMNS},
+                        "수익률(%)": percent_column("수익률(%)")})
     
     # ---------------------------
     # 전체 수익 요약 
     st.markdown("#### 📊 전체 수익 요약")
     col3, col4= st.columns(2)
     with col3:
-        st.metric(label="💹 총 평가손익", value=f"{profit_sum:+,} 원")
+        st.metric(label="💹 총 평가손익", value=f"{summary['총평가손익']:+,.0f} 원")
     with col4:
-        st.metric(label="📈 전체 수익률", value=f"{total_return:.2f} %")
+        st.metric(label="📈 전체 수익률", value=f"{summary['전체수익률(%)']:.2f} %")
     col5, col6 = st.columns(2)
     with col5:
-        st.metric(label="💸 현금", value=f"{remain_cash:,} 원")
+        st.metric(label="💸 현금", value=f"{summary['현금']:,.0f} 원")
     with col6:
-        st.metric(label="💰 총 자산", value=f"{total_asset:,} 원")
-    st.metric(label="💲 실현 손익 총액", value=f"{total_realized_profit:+,} 원")
+        st.metric(label="💰 총 자산", value=f"{summary['총자산']:,.0f} 원")
+    st.metric(label="💲 실현 손익 총액", value=f"{summary['실현손익총액']:+,} 원")
+
+    # 일별 총자산 추이
+    st.markdown("#### 📈 일별 총자산 추이")
+    st.line_chart(result["nav"][["총자산"]])
 
     
     # ---------------------------
     ## 목표 수익률 및 기술적 지표 분석
     st.markdown("---")
     st.markdown("### 📈 목표 수익률 및 기술적 지표 분석")
-    target_df = profit_df[['구분1','구분2','티커','종목명','매수일','평가손익','투자수익률(%)']].copy()
-
-    # 종목별 계산
-    tech_indicator = []
-    for ticker in target_df['티커']:
-        df = price_dict_KR[ticker].copy()
-        if df.empty:
-            continue
-
-        df['Return'] = df['Close'].pct_change()
-
-        buy_date = target_df.loc[target_df['티커']==ticker]['매수일'].values[0]
-        category = target_df.loc[target_df['티커']==ticker]['구분2'].values[0]
-
-        recent_window = df.loc[df.index <= buy_date]['Return'].dropna().iloc[-120:]
-        avg_r_120 = recent_window.mean()
-
-        # 목표 수익률 계산
-        r10_80 = max(avg_r_120 * 10 * 0.8, 0.04)
-        r10_120 = max(avg_r_120 * 10 * 1.2, 0.06)
-        r30_80 = max(avg_r_120 * 30 * 0.8, 0.04)
-        r30_120 = max(avg_r_120 * 30 * 1.2, 0.06)
-        r60_80 = max(avg_r_120 * 60 * 0.8, 0.04)
-        r60_120 = max(avg_r_120 * 60 * 1.2, 0.06)
-
-
-        cat_trg_10 = []
-        cat_trg_30 = ['국내주식_섹터', '해외주식_섹터','해외주식_지수']
-        cat_trg_60 = ['국내주식_지수', 'FX 및 원자재', '국내채권_종합', '국내채권_회사채','해외채권_종합','해외채권_회사채','금리연계형/초단기채권']
-
-        # 손절가 설정
-        if category in cat_trg_10:
-            tgt_80, tgt_120 = r10_80, r10_120
-            exit_80, exit_120 = r10_80*(-0.5), r10_120*(-0.5)
-        elif category in cat_trg_30:
-            tgt_80, tgt_120 = r30_80, r30_120
-            exit_80, exit_120 = r30_80*(-0.5), r30_120*(-0.5)
-        elif category in cat_trg_60:
-            tgt_80, tgt_120 = r60_80, r60_120
-            exit_80, exit_120 = r60_80*(-0.5), r60_120*(-0.5)
-        else:
-            tgt_80, tgt_120 = '설정되지 않은 카테고리'
-            exit_80, exit_120 = '설정되지 않은 카테고리'
-
-        # 기술적 지표 계산
-        rsi = RSIIndicator(close=df['Close'], window=14).rsi().iloc[-1]
-        rsi_signal = '과매수' if rsi > 70 else '과매도' if rsi < 30 else '중립'
-
-        bb = BollingerBands(close=df['Close'], window=20, window_dev=2)
-        bb_signal = '하단돌파(매수신호)' if df['Close'].iloc[-1] < bb.bollinger_lband().iloc[-1] else \
-                    '상단돌파(매도경고)' if df['Close'].iloc[-1] > bb.bollinger_hband().iloc[-1] else '정상범위'
-
-        adx = ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=14).adx().iloc[-1]
-        adx_signal = '강한추세' if adx > 20 else '약한추세'
-
-        # 기술적 지표와 목표 수익률을 데이터프레임에 추가
-        tech_indicator.append({
-            '티커': ticker,
-            '목표수익률(80%)': tgt_80*100,
-            '목표수익률(120%)': tgt_120*100,
-            '손절가(80%)': exit_80*100,
-            '손절가(120%)': exit_120*100,
-            'RSI신호': rsi_signal,
-            '볼린저밴드': bb_signal,
-            'ADX신호': adx_signal
-        })
-    tech_indicator = pd.DataFrame(tech_indicator)
-
-    target_df = pd.merge(target_df, tech_indicator, on='티커' )
-    target_df = target_df.sort_values('투자수익률(%)',axis=0, ascending=False).reset_index(drop=True)
-    target_df = target_df.drop(['구분1','구분2'],axis=1)
-
-    # 목표수익률 및 손절가 도달 표시 하이라이트 함수
-    def highlight_row(row):
-        style = [''] * len(row)
-        columns = row.index.tolist()
-
-        if "투자수익률(%)" in columns and "목표수익률(80%)" in columns and "목표수익률(120%)" in columns:
-            cur = row["투자수익률(%)"]
-            if cur >= row["목표수익률(120%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: mediumseagreen"
-            elif cur >= row["목표수익률(80%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: lightgreen"
-
-        if "투자수익률(%)" in columns and "손절가(80%)" in columns and "손절가(120%)" in columns:
-            cur = row["투자수익률(%)"]
-            if cur <= row["손절가(120%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: orangered"
-            elif cur <= row["손절가(80%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: salmon"
-
-        if "RSI신호" in columns:
-            if row["RSI신호"] == "과매수":
-                style[columns.index("RSI신호")] = "background-color: lightcoral"
-            elif row["RSI신호"] == "과매도":
-                style[columns.index("RSI신호")] = "background-color: lightblue"
-
-        if "볼린저밴드" in columns:
-            if row["볼린저밴드"] == "하단돌파(매수신호)":
-                style[columns.index("볼린저밴드")] = "background-color: lightblue"
-            elif row["볼린저밴드"] == "상단돌파(매도경고)":
-                style[columns.index("볼린저밴드")] = "background-color: lightcoral"
-
-        if "ADX신호" in columns and row["ADX신호"] == "강한추세":
-            style[columns.index("ADX신호")] = "background-color: lightgreen"
-
-        return style
-    
-    st.dataframe(target_df.style.apply(highlight_row, axis=1),
-                column_config={
-                    "투자수익률(%)": st.column_config.NumberColumn(
-                        label="투자수익률(%)",
-                        format="%.2f%%"),
-                    "손절가(80%)": st.column_config.NumberColumn(
-                        label="손절가(80%)",
-                        format="%.2f%%"),
-                    "손절가(120%)": st.column_config.NumberColumn(
-                        label="손절가(120%)",
-                        format="%.2f%%"),
-                    "목표수익률(80%)": st.column_config.NumberColumn(
-                        label="목표수익률(80%)",
-                        format="%.2f%%"),
-                    "목표수익률(120%)": st.column_config.NumberColumn(
-                        label="목표수익률(120%)",
-                        format="%.2f%%")
-                    },hide_index=True
-                )
+    target_df = result["targets"]
+
+    with timer("render.targets"):
+        # 목표수익률 / 손절가 도달 및 지표 신호 표시 (config의 서식 규칙, 표 전체를 한 번에 계산)
+        page_df = paginate(target_df, key="targets_page_kr")
+        st.dataframe(page_df.style.apply(rule_styles, axis=None, rules=TARGET_STYLE_RULES_KR),
+                    column_config={
+                        "평가손익": krw_column("평가손익"),
+                        "투자수익률(%)": st.column_config.NumberColumn(
+                            label="투자수익률(%)",
+                            format="%.2f%%"),
+                        "손절가(80%)": st.column_config.NumberColumn(
+                            label="손절가(80%)",
+                            format="%.2f%%"),
+                        "손절가(120%)": st.column_config.NumberColumn(
+                            label="손절가(120%)",
+                            format="%.2f%%"),
+                        "목표수익률(80%)": st.column_config.NumberColumn(
+                            label="목표수익률(80%)",
+                            format="%.2f%%"),
+                        "목표수익률(120%)": st.column_config.NumberColumn(
+                            label="목표수익률(120%)",
+                            format="%.2f%%")
+                        },hide_index=True
+                    )
     
     # ---------------------------
     ## 투자비중 분석
     st.markdown("---")
     st.markdown("## 투자비중 분석")
-    remaining_cash= get_remaining_cash(trading_log, US=False)
-    total_eval = profit_df['현재평가금액'].str.replace(",", "").astype(int).sum()
-    total_asset = remaining_cash + total_eval
-
-    # 구분1
-    cat1_ratio_df = profit_df[['구분1','현재평가금액','평균단가','보유수량']].copy()
-    cat1_ratio_df['평균단가']  = cat1_ratio_df['평균단가'].str.replace(",", "").astype(int) 
-    cat1_ratio_df['현재평가금액'] =  cat1_ratio_df['현재평가금액'].str.replace(",", "").astype(int)
-
-    cat1_ratio_df['기초평가금액'] = (cat1_ratio_df['평균단가'] * cat1_ratio_df['보유수량'])
-    cat1_ratio_df = cat1_ratio_df.drop(['평균단가','보유수량'],axis=1)
-
-    cat1_ratio_df = cat1_ratio_df.groupby('구분1').sum().reset_index()
-    cat1_ratio_df['수익률'] = (cat1_ratio_df['현재평가금액'] - cat1_ratio_df['기초평가금액']) /cat1_ratio_df['기초평가금액'] *100
-    cat1_ratio_df['투자비중'] = cat1_ratio_df['현재평가금액'] / total_asset *100
-
-    cat1_ratio_df['현재평가금액'] = cat1_ratio_df['현재평가금액'].apply(lambda x: f'{x:,}')
-    cat1_ratio_df['기초평가금액'] = cat1_ratio_df['기초평가금액'].apply(lambda x: f'{x:,}')
-    cat1_ratio_df = cat1_ratio_df.rename(columns = {'구분1':"구분"})
-
-    # 구분2
-    cat2_ratio_df =profit_df[['구분2','현재평가금액','평균단가','보유수량']].copy()
-    cat2_ratio_df['평균단가']  = cat2_ratio_df['평균단가'].str.replace(",", "").astype(int)
-    cat2_ratio_df['현재평가금액'] =  cat2_ratio_df['현재평가금액'].str.replace(",", "").astype(int)
-
-    cat2_ratio_df['기초평가금액'] = (cat2_ratio_df['평균단가'] * cat2_ratio_df['보유수량'])
-    cat2_ratio_df = cat2_ratio_df.drop(['평균단가','보유수량'],axis=1)
 
-    cat2_ratio_df = cat2_ratio_df.groupby('구분2').sum().reset_index()
-    cat2_ratio_df['수익률'] = (cat2_ratio_df['현재평가금액'] - cat2_ratio_df['기초평가금액']) /cat2_ratio_df['기초평가금액'] *100
-    cat2_ratio_df['투자비중'] = cat2_ratio_df['현재평가금액'] / total_asset *100
-    
-    cat2_ratio_df['현재평가금액'] = cat2_ratio_df['현재평가금액'].apply(lambda x: f'{x:,}')
-    cat2_ratio_df['기초평가금액'] = cat2_ratio_df['기초평가금액'].apply(lambda x: f'{x:,}')
-    cat2_ratio_df = cat2_ratio_df.rename(columns = {'구분2':"구분"})
-
-    # 합치기
-    ratio_df = pd.concat([cat1_ratio_df,cat2_ratio_df],axis=0)
-
-    # 상한 설정
-    limit_dict = {
-    '안전':100,
-    '위험':70,
-    'FX 및 원자재': 20,
-    '국내주식_섹터': 15,
-    '국내주식_지수': 30,
-    '국내채권_종합': 50,
-    '국내채권_회사채': 30,
-    '금리연계형/초단기채권': 50,
-    '해외주식_섹터': 10,
-    '해외주식_지수': 30,
-    '해외채권_종합': 50,
-    '해외채권_회사채': 30
-    }
-    ratio_df["상한"] = ratio_df["구분"].map(limit_dict).fillna("-")
-    ratio_df = ratio_df.sort_values('상한').reset_index(drop=True)
-
-    # 투자비중 하이라이트 함수
-    def highlight_exceed_limit(row):
-        style = [''] * len(row)
-        columns = row.index.tolist()
-
-        try:
-            if row["상한"] and row['투자비중'] >= row["상한"] * 0.8:
-                style[columns.index("투자비중")] = "background-color: salmon"
-            style[columns.index("상한")] = "background-color: #f0f0f0"
-
-        except Exception:
-            pass
-
-        return style
-    
-    st.dataframe(ratio_df.style.apply(highlight_exceed_limit, axis=1),
-                column_config={
-                    "수익률": st.column_config.NumberColumn(
-                        label="수익률",
-                        format="%.2f%%"),
-                    "투자비중": st.column_config.NumberColumn(
-                        label="투자비중",
-                        format="%.2f%%"),
-                    "상한": st.column_config.NumberColumn(
-                        label="상한",
-                        format="%.2f%%")})
+    # 구분1 / 구분2 / 종목별 투자비중과 상한 (보유 종목을 한 번에 집계)
+    ratio_df = result["allocation"]
+    is_ticker = ratio_df["수준"] == "티커"
+    ratio_column_config = {
+        "현재평가금액": krw_column("현재평가금액"),
+        "기초평가금액": krw_column("기초평가금액"),
+        **{col: percent_column(col) for col in ["수익률", "투자비중", "상한", "여유"]}}
+
+    with timer("render.allocation"):
+        # 상한의 80% 이상인 투자비중 표시
+        category_df = ratio_df.loc[~is_ticker].drop(columns="종목명")
+        st.dataframe(category_df.style.apply(rule_styles, axis=None, rules=ALLOCATION_STYLE_RULES),
+                    column_config=ratio_column_config, hide_index=True)
+        with st.expander("종목별 투자비중"):
+            ticker_df = paginate(ratio_df.loc[is_ticker].drop(columns="수준"), key="allocation_page_kr")
+            st.dataframe(ticker_df.style.apply(rule_styles, axis=None, rules=ALLOCATION_STYLE_RULES),
+                        column_config=ratio_column_config, hide_index=True)
 
 #  국내계좌 매수/매도 금액 입력 페이지
 def show_kr_input():
-    # 투자 가능 ETF 데이터 로드
-    etf_data = load_etf_data()
-    ticker_list = etf_data['티커'].tolist()
+    # 투자 가능 ETF 검색 인덱스 (프로세스당 한 번 생성)
+    index = etf_index()
 
     st.subheader("국내계좌 매수/매도 정보 입력")
-    st.markdown("로컬에서 입력 후 Push")
+    st.markdown("로컬에서 입력 후 CSV로 내보내서 Push")
+
+    # 티커 또는 종목명 검색 (정확히 일치하지 않으면 후보 목록에서 선택)
+    query = st.text_input("티커 또는 종목명 입력").strip()
+    instrument = index.lookup(query) if query else None
+    if query and instrument is None:
+        candidates = index.search(query)
+        if candidates:
+            instrument = st.selectbox("검색 결과", candidates,
+                                      format_func=lambda r: f"{r['종목명']} ({r['티커']})")
+        else:
+            st.warning("❗ 일치하는 종목이 없습니다.")
 
-    # 티커 또는 종목명 검색
-    ticker_input = st.text_input("티커 입력")
-    ticker_input = ticker_input.strip().zfill(6)
-    ticker_A = 'A' + ticker_input
-    if ticker_input:        
+    if instrument is not None:
         try:
-            if ticker_A in ticker_list:
-                ticker_input_data = etf_data[etf_data["티커"]== ticker_A]
-                name = ticker_input_data['ETF명'].values[0]
-                cat1 = ticker_input_data['구분1'].values[0]
-                cat2 = ticker_input_data['구분2'].values[0]
-                st.success(f"✅ {name} ({ticker_input}) 조회됨")
+            ticker_input = instrument["티커"]
+            name = instrument["종목명"]
+            cat1 = instrument["구분1"]
+            cat2 = instrument["구분2"]
+            st.success(f"✅ {name} ({ticker_input}) 조회됨")
             
             # 거래 정보 입력
             col1, col2 = st.columns(2)
@@ -335,6 +172,11 @@ def show_kr_input():
             with col4:
                 amount = st.number_input("거래 금액 (₩)", min_value=0)
 
+            # 저장 전에 거래 후 투자비중 확인 (가격 재조회 없이 세션의 보유 현황과 종가로 계산)
+            if quantity > 0 and amount > 0:
+                show_trade_impact("KR", {"구분1": cat1, "구분2": cat2, "티커": ticker_input, "종목명": name,
+                                        "거래유형": trade_type, "거래수량": quantity, "금액": amount})
+
             if st.button("거래로그에 추가"):
                 existing = st.session_state.trading_log
                 if trade_type == "매수":
@@ -349,12 +191,9 @@ def show_kr_input():
                                 "평균단가": round(amount/quantity),
                                 "금액": amount
                             }])
-                    st.session_state.trading_log = pd.concat([existing, new_entry], ignore_index=True)
 
                 elif trade_type == "매도":
-                    total_buy = existing[(existing["티커"] == ticker_input) & (existing["거래유형"] == "매수")]["거래수량"].sum()
-                    total_sell = existing[(existing["티커"] == ticker_input) & (existing["거래유형"] == "매도")]["거래수량"].sum()
-                    available = total_buy - total_sell                    
+                    available = st.session_state.ledger_kr.available(ticker_input)
                     if quantity > available:
                         st.error(f"❌ 매도 가능 금액({available:,.0f}원)를 초과했습니다.")
                         new_entry = None
@@ -370,14 +209,13 @@ def show_kr_input():
                                 "평균단가": round(amount/quantity),
                                 "금액": amount
                             }])
-                        st.session_state.trading_log = pd.concat([existing, new_entry], ignore_index=True)
 
                 if new_entry is not None:
-                    st.session_state.trading_log = (st.session_state.trading_log
-                                                  .groupby('티커')
-                                                  .apply(lambda x: x.sort_values(by='거래일'))
-                                                  .reset_index(drop=True))
-                    st.session_state.trading_log.to_csv("./data/trading_log.csv", index=False)
+                    # 저장소에는 한 행만 추가하고, 세션 거래로그는 저장소 id로 이어 붙임
+                    trade = new_entry.to_dict("records")[0]
+                    new_entry.index = [st.session_state.trade_store.append("KR", trade)]
+                    st.session_state.trading_log = pd.concat([existing, new_entry])
+                    st.session_state.ledger_kr.add(trade, st.session_state.trading_log)
                     st.success("✅ 거래 로그가 업데이트되고 저장되었습니다.")
 
         except Exception as e:
@@ -386,7 +224,7 @@ def show_kr_input():
     st.markdown("---")
     st.write("### 거래 기록")
 
-    editable_log = st.session_state.trading_log.sort_values(by='거래일',axis=0).reset_index(drop=True)
+    editable_log = st.session_state.trading_log.sort_values(by='거래일', kind='stable')
     editable_log["거래일"] = pd.to_datetime(editable_log["거래일"]).dt.date
     editable_log["삭제"] = False  # 삭제용 체크박스 열 추가
 
@@ -396,16 +234,25 @@ def show_kr_input():
             "삭제": st.column_config.CheckboxColumn(label="선택", help="삭제할 거래를 선택하세요.")
         },
         disabled=["구분1", "구분2","거래일", "티커", "종목명", "거래유형", "거래수량", "평균단가", "금액"],
+        hide_index=True,
         use_container_width=True
     )
 
     if st.button("선택한 거래 삭제"):
         to_delete = edited[edited["삭제"]]
         if not to_delete.empty:
-            # 삭제할 행을 제외한 데이터로 갱신
-            updated_log = edited[~edited["삭제"]].drop(columns=["삭제"])
+            # 선택한 id만 저장소와 세션 거래로그에서 삭제
+            st.session_state.trade_store.delete("KR", to_delete.index)
+            updated_log = st.session_state.trading_log.drop(index=to_delete.index)
             st.session_state.trading_log = updated_log
-            st.session_state.trading_log.to_csv("./data/trading_log.csv", index=False)
+            st.session_state.ledger_kr.remove(to_delete["티커"].unique().tolist(), updated_log)
             st.success(f"🗑️ {len(to_delete)}건의 거래가 삭제되었습니다.")
         else:
-            st.warning("❗ 삭제할 거래를 선택하지 않았습니다.")
\ No newline at end of file
+            st.warning("❗ 삭제할 거래를 선택하지 않았습니다.")
+
+    if st.button("CSV로 내보내기"):
+        path = st.session_state.trade_store.export_csv("KR")
+        st.success(f"💾 {path}에 저장되었습니다.")
+    pending = st.session_state.trade_store.pending("KR")
+    if any(pending.values()):
+        st.caption(f"아직 CSV로 내보내지 않은 변경: 추가 {pending['추가']}건, 삭제 {pending['삭제']}건")
\ No newline at end of file
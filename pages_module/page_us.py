@@ -2,13 +2,15 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 
-from ta.momentum import RSIIndicator
-from ta.trend import ADXIndicator
-from ta.volatility import BollingerBands
+from utils.analysis import analyze_account
+from utils.data_loader import get_price, get_fx_series, spx_index
+from utils.fx import latest_rate
+from utils.profiling import timer, count
+from utils.config import TARGET_STYLE_RULES_US
+from pages_module.trade_check import show_trade_impact
+from pages_module.formats import percent_column, usd_column, usd_krw_column, rule_styles, paginate
 
-from utils.finance import calc_profit_us, get_remaining_cash, calc_realized_profit
-from utils.data_loader import get_price, load_spx_data
-from utils.config import INITIAL_CAPITAL_US, EXCHANGE_RATE
+MONEY_COLUMNS = ["평균단가", "현재가", "평가손익", "현재평가금액", "매수단가", "매도단가", "실현손익"]
 
 def show_us_analysis():
     # ---------------------------
@@ -16,14 +18,19 @@ def show_us_analysis():
 
     # 거래로그
     trading_log = st.session_state.trading_log_us.copy()
+    count("trades", len(trading_log))
 
     # 가격 데이터
-    price_dict_US = get_price(market="US")
+    with timer("get_price"):
+        price_panel_US = get_price(market="US")
+
+    # 일별 원/달러 환율 (현재 금액은 최근 환율, 일별 / 거래별 금액은 해당일 환율로 환산)
+    with timer("get_fx"):
+        fx_series = get_fx_series(trading_log)
+    fx_rate = latest_rate(fx_series)
 
     # 현재 날짜
-    first_ticker = list(price_dict_US.keys())[0]
-    first_ticker_df = price_dict_US[first_ticker]
-    latest_date = first_ticker_df.index.max().date()
+    latest_date = price_panel_US.latest_date.date()
 
     # ---------------------------
     ## 수익률 계산
@@ -33,41 +40,33 @@ def show_us_analysis():
     with col1:
         apply_fee = st.checkbox("수수료 적용 (0.2%)", value=True)
     with col2:
-        apply_KRW = st.checkbox(f"원화 적용({EXCHANGE_RATE}원/$)", value=False)
+        apply_KRW = st.checkbox(f"원화 적용({fx_rate:,.1f}원/$)", value=False)
     with col3:
         st.markdown(f"**기준일:** {latest_date}")
 
-    # 수익률 데이터프레임
-    profit_df = calc_profit_us(trading_log, price_dict_US, apply_fee)
+    # 평가손익 / 실현손익 / 일별 총자산 / 목표수익률·지표 / 투자비중 (배치 리포트와 같은 계산,
+    # 매수/매도 매칭 결과는 세션의 보유 현황 장부를 그대로 사용, 원화 적용 시 원화 환산 열과 요약 추가)
+    ledger = st.session_state.ledger_us
+    result = analyze_account("US", trading_log, price_panel_US, apply_fee, book=ledger.book,
+                             realized_book=ledger.realized_book, state_key="US",
+                             fx_series=fx_series if apply_KRW else None)
+    summary = result["summary"]
 
     # 평가손익 기준 정렬
-    result_df = profit_df.copy()
-    result_df["현재평가금액_float"] = result_df["현재평가금액"].str.replace(",", "").astype(float)
-    result_df = result_df.sort_values(by=['구분','현재평가금액_float'],ascending=False, axis=0).reset_index(drop=True)
-    result_df = result_df.drop('현재평가금액_float',axis=1)
-    st.dataframe(result_df,
-                 column_config={
-                    "수익률(%)": st.column_config.NumberColumn(
-                        label="수익률(%)",
-                        format="%.2f%%")})
-
-    # ---------------------------
-    # 평가손익 총합 및 현재 자산 계산
-    profit_sum = result_df["평가손익"].str.replace(",", "").astype(float).sum()
-    eval_sum = result_df["현재평가금액"].str.replace(",", "").astype(float).sum()
-
-    remain_cash = get_remaining_cash(trading_log, US=True)
-    total_asset = eval_sum + remain_cash
-    total_return = profit_sum / INITIAL_CAPITAL_US * 100
-
-    realized_profit_df, total_realized_profit = calc_realized_profit(trading_log, US=True)
+    result_df = result["profit"].sort_values(by=['구분','현재평가금액'],ascending=False, axis=0).reset_index(drop=True)
+    with timer("render.profit"):
+        st.dataframe(paginate(result_df, key="profit_page_us"),
+                     column_config={
+                        **{col: usd_column(col) for col in MONEY_COLUMNS},
+                        "투자수익률(%)": percent_column("투자수익률(%)")})
 
     st.markdown("#### 손익 실현 내역")
-    st.dataframe(realized_profit_df,
-                 column_config={
-                    "수익률(%)": st.column_config.NumberColumn(
-                        label="수익률(%)",
-                        format="%.2f%%")})
+    with timer("render.realized"):
+        st.dataframe(paginate(result["realized"], key="realized_page_us"),
+                     column_config={
+                        **{col: usd_column(col) for col in MONEY_COLUMNS},
+                        "실현손익(원)": usd_krw_column("실현손익(원)"),
+                        "수익률(%)": percent_column("수익률(%)")})
     
     # ---------------------------
     # 전체 수익 요약 
@@ -75,153 +74,69 @@ def show_us_analysis():
     col5, col6= st.columns(2)
     with col5:
         if apply_KRW:
-            st.metric(label="💹 총 평가손익", value=f"{profit_sum*EXCHANGE_RATE:+,.0f}원")
+            st.metric(label="💹 총 평가손익", value=f"{summary['총평가손익']*fx_rate:+,.0f}원")
         else:
-            st.metric(label="💹 총 평가손익", value=f"{profit_sum:+,} $")
+            st.metric(label="💹 총 평가손익", value=f"{summary['총평가손익']:+,.2f} $")
     with col6:
-        st.metric(label="📈 전체 수익률", value=f"{total_return:.2f} %")
+        st.metric(label="📈 전체 수익률", value=f"{summary['전체수익률(%)']:.2f} %")
 
     col7, col8 = st.columns(2)
     with col7:
         if apply_KRW:
-            st.metric(label="💸 현금", value=f"{remain_cash*EXCHANGE_RATE:,.0f}원")
+            st.metric(label="💸 현금", value=f"{summary['현금']*fx_rate:,.0f}원")
         else:
-            st.metric(label="💸 현금", value=f"${remain_cash:,.2f}")
+            st.metric(label="💸 현금", value=f"${summary['현금']:,.2f}")
     with col8:
         if apply_KRW:
-            st.metric(label="💰 총 자산", value=f"{total_asset*EXCHANGE_RATE:,.0f}원")
+            st.metric(label="💰 총 자산", value=f"{summary['총자산(원)']:,.0f}원")
         else:
-            st.metric(label="💰 총 자산", value=f"${total_asset:,.2f}")
+            st.metric(label="💰 총 자산", value=f"${summary['총자산']:,.2f}")
     if apply_KRW:
-        st.metric(label="💲 실현 손익 총액", value=f"{total_realized_profit*EXCHANGE_RATE:+,} 원")
+        st.metric(label="💲 실현 손익 총액", value=f"{summary['실현손익총액(원)']:+,.0f} 원")
     else:
-        st.metric(label="💲 실현 손익 총액", value=f"${total_realized_profit:+,}")
+        st.metric(label="💲 실현 손익 총액", value=f"${summary['실현손익총액']:+,}")
+
+    # 일별 총자산 추이 (원화 적용 시 해당일 환율로 환산)
+    st.markdown("#### 📈 일별 총자산 추이")
+    st.line_chart(result["nav"][["총자산(원)" if apply_KRW else "총자산"]])
     
     # ---------------------------
     ## 목표수익률 및 지표 확인
     st.markdown('---')
     st.markdown("### 📈 목표 수익률 및 기술적 지표 분석")
-    target_df = profit_df[['구분','티커','이름','매수일','평가손익','투자수익률(%)']].copy()
-    target_df = target_df.loc[target_df["구분"]=='개별종목']
-
-    # 종목별 계산
-    tech_indicator = []
-    for ticker in target_df['티커']:
-        df = price_dict_US[ticker].copy()
-        if df.empty:
-            continue
-
-        df['Return'] = df['Close'].pct_change()
-
-        buy_date = target_df.loc[target_df['티커']==ticker]['매수일'].values[0]
-
-        recent_window = df.loc[df.index <= buy_date]['Return'].dropna().iloc[-120:]
-        avg_r_120 = recent_window.mean()
-
-        # 목표 수익률 및 손절가 계산
-        r10_80 = max(avg_r_120 * 10 * 0.8, 0.04)
-        r10_120 = max(avg_r_120 * 10 * 1.2, 0.06)
-        r30_80 = max(avg_r_120 * 30 * 0.8, 0.04)
-        r30_120 = max(avg_r_120 * 30 * 1.2, 0.06)
-        r60_80 = max(avg_r_120 * 60 * 0.8, 0.04)
-        r60_120 = max(avg_r_120 * 60 * 1.2, 0.06)
-
-        tgt_80, tgt_120 = r30_80, r30_120
-        exit_80, exit_120 = r30_80*(-0.5), r30_120*(-0.5)
-
-        # 기술적 지표 계산
-        rsi = RSIIndicator(close=df['Close'], window=14).rsi().iloc[-1]
-        rsi_signal = '과매수' if rsi > 70 else '과매도' if rsi < 30 else '중립'
-
-        bb = BollingerBands(close=df['Close'], window=20, window_dev=2)
-        bb_signal = '하단돌파(매수신호)' if df['Close'].iloc[-1] < bb.bollinger_lband().iloc[-1] else \
-                    '상단돌파(매도경고)' if df['Close'].iloc[-1] > bb.bollinger_hband().iloc[-1] else '정상범위'
-
-        adx = ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=14).adx().iloc[-1]
-        adx_signal = '강한추세' if adx > 20 else '약한추세'
-
-        # 기술적 지표와 목표 수익률을 데이터프레임에 추가
-        tech_indicator.append({
-            '티커': ticker,
-            '목표수익률(80%)': tgt_80*100,
-            '목표수익률(120%)': tgt_120*100,
-            '손절가(80%)': exit_80*100,
-            '손절가(120%)': exit_120*100,
-            'RSI신호': rsi_signal,
-            '볼린저밴드': bb_signal,
-            'ADX신호': adx_signal
-        })
-    tech_indicator = pd.DataFrame(tech_indicator)
-
-    target_df = pd.merge(target_df, tech_indicator, on='티커' )
-    target_df = target_df.sort_values('투자수익률(%)',axis=0, ascending=False).reset_index(drop=True)
-    target_df = target_df.drop(['구분'],axis=1)
-
-    # 목표수익률 및 손절가 도달 표시 하이라이트 함수
-    def highlight_row(row):
-        style = [''] * len(row)
-        columns = row.index.tolist()
-
-        if "투자수익률(%)" in columns and "목표수익률(80%)" in columns and "목표수익률(120%)" in columns:
-            cur = row["투자수익률(%)"]
-            if cur >= row["목표수익률(120%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: mediumseagreen"
-            elif cur >= row["목표수익률(80%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: lightgreen"
-
-        if "투자수익률(%)" in columns and "손절가(80%)" in columns and "손절가(120%)" in columns:
-            cur = row["투자수익률(%)"]
-            if cur <= row["손절가(80%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: salmon"
-            elif cur <= row["손절가(120%)"]:
-                style[columns.index("투자수익률(%)")] = "background-color: lightcoral"
-
-        if "RSI신호" in columns:
-            if row["RSI신호"] == "과매수":
-                style[columns.index("RSI신호")] = "background-color: lightcoral"
-            elif row["RSI신호"] == "과매도":
-                style[columns.index("RSI신호")] = "background-color: lightblue"
-
-        if "볼린저밴드" in columns:
-            if row["볼린저밴드"] == "하단돌파(매수신호)":
-                style[columns.index("볼린저밴드")] = "background-color: lightblue"
-            elif row["볼린저밴드"] == "상단돌파(매도경고)":
-                style[columns.index("볼린저밴드")] = "background-color: lightcoral"
-
-        if "ADX신호" in columns and row["ADX신호"] == "강한추세":
-            style[columns.index("ADX신호")] = "background-color: lightgreen"
-
-        return style
+    target_df = result["targets"]
+
+    with timer("render.targets"):
+        # 목표수익률 / 손절가 도달 및 지표 신호 표시 (config의 서식 규칙, 표 전체를 한 번에 계산)
+        page_df = paginate(target_df, key="targets_page_us")
+        st.dataframe(page_df.style.apply(rule_styles, axis=None, rules=TARGET_STYLE_RULES_US),
+                    column_config={
+                        "평가손익": usd_column("평가손익"),
+                        "투자수익률(%)": st.column_config.NumberColumn(
+                            label="투자수익률(%)",
+                            format="%.2f%%"),
+                        "손절가(80%)": st.column_config.NumberColumn(
+                            label="손절가(80%)",
+                            format="%.2f%%"),
+                        "손절가(120%)": st.column_config.NumberColumn(
+                            label="손절가(120%)",
+                            format="%.2f%%"),
+                        "목표수익률(80%)": st.column_config.NumberColumn(
+                            label="목표수익률(80%)",
+                            format="%.2f%%"),
+                        "목표수익률(120%)": st.column_config.NumberColumn(
+                            label="목표수익률(120%)",
+                            format="%.2f%%")
+                        },hide_index=True
+                    )
     
-    st.dataframe(target_df.style.apply(highlight_row, axis=1),
-                column_config={
-                    "투자수익률(%)": st.column_config.NumberColumn(
-                        label="투자수익률(%)",
-                        format="%.2f%%"),
-                    "손절가(80%)": st.column_config.NumberColumn(
-                        label="손절가(80%)",
-                        format="%.2f%%"),
-                    "손절가(120%)": st.column_config.NumberColumn(
-                        label="손절가(120%)",
-                        format="%.2f%%"),
-                    "목표수익률(80%)": st.column_config.NumberColumn(
-                        label="목표수익률(80%)",
-                        format="%.2f%%"),
-                    "목표수익률(120%)": st.column_config.NumberColumn(
-                        label="목표수익률(120%)",
-                        format="%.2f%%")
-                    },hide_index=True
-                )
-    
-    # 지수구성 포트폴리오 평가
-    index_eval_begin = (profit_df.loc[profit_df['구분']=='지수구성']['평균단가'].str.replace(",", "").astype(float) * profit_df.loc[profit_df['구분']=='지수구성']['보유수량']).sum()
-    index_eval_end =  profit_df.loc[profit_df['구분']=='지수구성']['현재평가금액'].str.replace(",", "").astype(float).sum()
-    index_profit = (index_eval_end - index_eval_begin)/index_eval_begin*100
+    # 지수구성 포트폴리오 평가 (지수구성 종목이 없으면 수익률 없음)
+    index_profit = summary["지수구성수익률(%)"]
     col9,col10 = st.columns(2)
     with col9:
-        st.metric(label="💹 지수구성 평가손익", value=f"{index_eval_end - index_eval_begin:+,.2f} $")
+        st.metric(label="💹 지수구성 평가손익", value=f"{summary['지수구성평가손익']:+,.2f} $")
     with col10:
-        st.metric(label="📈 지수구성 수익률", value=f"{index_profit:.2f} %")
+        st.metric(label="📈 지수구성 수익률", value=f"{index_profit:.2f} %" if index_profit is not None else "-")
 
 
     
@@ -231,74 +146,57 @@ def show_us_analysis():
     st.markdown("### 투자비중 분석")
     st.markdown("#### 지수구성 투자비중")
 
-    ratio_df = profit_df[['구분','티커','이름','현재평가금액']].copy()
-    index_df = ratio_df.loc[ratio_df['구분']=='지수구성']
-    index_df = index_df.drop('구분',axis=1)
-    index_df['현재평가금액'] = index_df['현재평가금액'].str.replace(",", "").astype(float)
+    index_df, Individ_df = result["allocation_index"], result["allocation_individual"]
 
-    remaining_cash= get_remaining_cash(trading_log, US=True)
-    total_eval = ratio_df['현재평가금액'].str.replace(",", "").astype(float).sum()
-    total_asset = remaining_cash + total_eval
-    index_df['투자비중'] = index_df['현재평가금액'] / total_asset *100
+    # 평가금액 표시 (원화 적용 시 환산한 숫자에 원화 형식만 지정)
     if apply_KRW:
-        index_df['현재평가금액'] = index_df['현재평가금액'].apply(lambda x: f'{x*EXCHANGE_RATE:,.0f}원')
+        eval_column = usd_krw_column("현재평가금액")
+        index_df['현재평가금액'] = index_df['현재평가금액'] * fx_rate
+        Individ_df['현재평가금액'] = Individ_df['현재평가금액'] * fx_rate
     else:
-        index_df['현재평가금액'] = index_df['현재평가금액'].apply(lambda x: f'${x:,}')
-
-    # 목표
-    tgt_dict = {
-    'NVDA': "9.25%",
-    'MSFT': "8.86%",
-    'AAPL': "7.22%",
-    'AMZN': "5.70%",
-    'GOOG': "5.20%",
-    'META': "4.43%",
-    'AVGO': "3.05%",
-    'TSLA': "2.51%",
-    'JPM': "1.92%",
-    'WMT': "1.87%"
-    }
-    index_df["목표비율"] = index_df["티커"].map(tgt_dict).fillna("-")
-    index_df = index_df.sort_values(by='투자비중',ascending=False).reset_index(drop=True)
+        eval_column = usd_column("현재평가금액")
+
     st.dataframe(index_df,
                 column_config={
+                    "현재평가금액": eval_column,
                     "투자비중": st.column_config.NumberColumn(
                         label="투자비중",
-                        format="%.2f%%")})
+                        format="%.2f%%"),
+                    "목표비율": percent_column("목표비율"),
+                    "여유": percent_column("여유")})
     
     # 개별종목
-    Individ_df =  ratio_df.loc[ratio_df['구분']=='개별종목']
-    Individ_df = Individ_df.drop('구분',axis=1)
-    Individ_df['현재평가금액'] = Individ_df['현재평가금액'].str.replace(",", "").astype(float)
-    Individ_df['투자비중'] = Individ_df['현재평가금액'] / total_asset *100
-    if apply_KRW:
-        Individ_df['현재평가금액'] = Individ_df['현재평가금액'].apply(lambda x: f'{x*EXCHANGE_RATE:,.0f}원')
-    else:
-        Individ_df['현재평가금액'] = Individ_df['현재평가금액'].apply(lambda x: f'${x:,}')
-    Individ_df = Individ_df.sort_values(by='투자비중',ascending=False).reset_index(drop=True)
-
     st.markdown("#### 개별종목 투자비중")
     st.dataframe(Individ_df,
             column_config={
+                "현재평가금액": eval_column,
                 "투자비중": st.column_config.NumberColumn(
                     label="투자비중",
                     format="%.2f%%")})
 
 def show_us_input():
-    # 투자 가능 SPX 데이터 로드
-    spx_data = load_spx_data()
-    spx_ticker_list = spx_data['티커'].tolist()
+    # 투자 가능 SPX 검색 인덱스 (프로세스당 한 번 생성)
+    index = spx_index()
 
     st.subheader("해외계좌 매수/매도 정보 입력")
-    st.markdown("로컬에서 입력 후 Push")
+    st.markdown("로컬에서 입력 후 CSV로 내보내서 Push")
+
+    # 티커 또는 이름 검색 (정확히 일치하지 않으면 후보 목록에서 선택)
+    query = st.text_input("티커 또는 이름 입력").strip()
+    instrument = index.lookup(query) if query else None
+    if query and instrument is None:
+        candidates = index.search(query)
+        if candidates:
+            instrument = st.selectbox("검색 결과", candidates,
+                                      format_func=lambda r: f"{r['종목명']} ({r['티커']})")
+        else:
+            st.warning("❗ 일치하는 종목이 없습니다.")
 
-    # 티커 또는 이름 검색
-    ticker_input = st.text_input("티커 입력")
-    if ticker_input:        
+    if instrument is not None:
         try:
-            if ticker_input in spx_ticker_list:
-                name = spx_data[spx_data["티커"] == ticker_input]['이름'].values[0]
-                st.success(f"✅ {name} ({ticker_input}) 조회됨")
+            ticker_input = instrument["티커"]
+            name = instrument["종목명"]
+            st.success(f"✅ {name} ({ticker_input}) 조회됨")
 
             # 거래 정보 입력
             col1, col2, col3 = st.columns(3)
@@ -315,6 +213,11 @@ def show_us_input():
             with col5:
                 amount = st.number_input("거래 금액 ($)", min_value=0.0, format="%.2f")
 
+            # 저장 전에 거래 후 투자비중 확인 (가격 재조회 없이 세션의 보유 현황과 종가로 계산)
+            if quantity > 0 and amount > 0:
+                show_trade_impact("US", {"구분": category, "티커": ticker_input, "이름": name,
+                                        "거래유형": trade_type, "거래수량": quantity, "금액": amount})
+
             if st.button("거래로그에 추가"):
                 existing = st.session_state.trading_log_us
                 if trade_type == "매수":
@@ -328,12 +231,9 @@ def show_us_input():
                                 "평균단가": round(amount/quantity, 2),
                                 "금액": amount
                             }])
-                    st.session_state.trading_log_us = pd.concat([existing, new_entry], ignore_index=True)
 
                 elif trade_type == "매도":
-                    total_buy = existing[(existing["티커"] == ticker_input) & (existing["거래유형"] == "매수")]["거래수량"].sum()
-                    total_sell = existing[(existing["티커"] == ticker_input) & (existing["거래유형"] == "매도")]["거래수량"].sum()
-                    available = total_buy - total_sell                    
+                    available = st.session_state.ledger_us.available(ticker_input)
                     if quantity > available:
                         st.error(f"❌ 매도 가능 금액({available:,.2f}달러)를 초과했습니다.")
                         new_entry = None
@@ -348,14 +248,13 @@ def show_us_input():
                                 "평균단가": round(amount/quantity,2),
                                 "금액": amount
                             }])
-                        st.session_state.trading_log_us = pd.concat([existing, new_entry], ignore_index=True)
 
                 if new_entry is not None:
-                    st.session_state.trading_log_us = (st.session_state.trading_log_us
-                                                    .groupby('티커')
-                                                    .apply(lambda x: x.sort_values(by='거래일'))
-                                                    .reset_index(drop=True))
-                    st.session_state.trading_log_us.to_csv("./data/trading_log_us.csv", index=False)
+                    # 저장소에는 한 행만 추가하고, 세션 거래로그는 저장소 id로 이어 붙임
+                    trade = new_entry.to_dict("records")[0]
+                    new_entry.index = [st.session_state.trade_store.append("US", trade)]
+                    st.session_state.trading_log_us = pd.concat([existing, new_entry])
+                    st.session_state.ledger_us.add(trade, st.session_state.trading_log_us)
                     st.success("✅ 거래 로그가 업데이트되고 저장되었습니다.")
 
         except Exception as e:
@@ -364,7 +263,7 @@ def show_us_input():
     st.markdown("---")
     st.write("### 거래 기록")
 
-    editable_log = st.session_state.trading_log_us.sort_values(by='거래일',axis=0).reset_index(drop=True)
+    editable_log = st.session_state.trading_log_us.sort_values(by='거래일', kind='stable')
     editable_log["거래일"] = pd.to_datetime(editable_log["거래일"]).dt.date
     editable_log["삭제"] = False  # 삭제용 체크박스 열 추가
 
@@ -374,16 +273,25 @@ def show_us_input():
             "삭제": st.column_config.CheckboxColumn(label="선택", help="삭제할 거래를 선택하세요.")
         },
         disabled=["구분","거래일", "티커", "이름", "거래유형", "거래수량", "평균단가", "금액"],
+        hide_index=True,
         use_container_width=True
     )
 
     if st.button("선택한 거래 삭제"):
         to_delete = edited[edited["삭제"]]
         if not to_delete.empty:
-            # 삭제할 행을 제외한 데이터로 갱신
-            updated_log = edited[~edited["삭제"]].drop(columns=["삭제"])
+            # 선택한 id만 저장소와 세션 거래로그에서 삭제
+            st.session_state.trade_store.delete("US", to_delete.index)
+            updated_log = st.session_state.trading_log_us.drop(index=to_delete.index)
             st.session_state.trading_log_us = updated_log
-            st.session_state.trading_log_us.to_csv("./data/trading_log_us.csv", index=False)
+            st.session_state.ledger_us.remove(to_delete["티커"].unique().tolist(), updated_log)
             st.success(f"🗑️ {len(to_delete)}건의 거래가 삭제되었습니다.")
         else:
-            st.warning("❗ 삭제할 거래를 선택하지 않았습니다.")
\ No newline at end of file
+            st.warning("❗ 삭제할 거래를 선택하지 않았습니다.")
+
+    if st.button("CSV로 내보내기"):
+        path = st.session_state.trade_store.export_csv("US")
+        st.success(f"💾 {path}에 저장되었습니다.")
+    pending = st.session_state.trade_store.pending("US")
+    if any(pending.values()):
+        st.caption(f"아직 CSV로 내보내지 않은 변경: 추가 {pending['추가']}건, 삭제 {pending['삭제']}건")
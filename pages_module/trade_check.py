@@ -0,0 +1,34 @@
+import streamlit as st
+
+from utils.analysis import calc_trade_impact
+from utils.data_loader import get_last_close
+from utils.profiling import timer
+from utils.config import TRADE_CHECK_STYLE_RULES
+from pages_module.formats import percent_column, rule_styles
+
+# ---------------------------
+# 거래 입력 전 투자비중 확인
+# 세션의 보유 현황 장부(현금 포함)와 저장된 종가만 사용하므로 수량 / 금액을 바꿀 때마다 바로 다시 계산된다.
+
+def show_trade_impact(market, trade):
+    """trade(입력 중인 거래 dict)를 반영한 거래 전 / 후 투자비중과 상한(해외계좌는 목표비율)"""
+    US = market == "US"
+    ledger = st.session_state.ledger_us if US else st.session_state.ledger_kr
+    with timer("trade_impact"):
+        impact = calc_trade_impact(ledger.positions(), ledger.cash, get_last_close(market), trade, US=US)
+
+    limit_label = "목표비율" if US else "상한"
+    st.markdown(f"#### 거래 후 투자비중 ({limit_label} 대비)")
+    st.dataframe(impact.style.apply(rule_styles, axis=None, rules=[] if US else TRADE_CHECK_STYLE_RULES),
+                 column_config={
+                     "상한": percent_column(limit_label),
+                     "거래전": percent_column("거래 전"),
+                     "투자비중": percent_column("거래 후"),
+                     "여유": percent_column("여유")},
+                 hide_index=True)
+
+    if not US:
+        exceeded = impact.loc[impact["투자비중"] > impact["상한"]]
+        if not exceeded.empty:
+            st.warning("⚠️ 거래 후 상한 초과: " + ", ".join(
+                f"{row['구분']} {row['투자비중']:.2f}% (상한 {row['상한']:.0f}%)" for _, row in exceeded.iterrows()))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.analysis import analyze_account, calc_allocation, calc_allocation_us, calc_trade_impact
+from utils.panel import build_price_panel
+from utils.price_sources import SyntheticSource
+
+
+def us_positions():
+    # NVDA는 지수구성 / 개별종목 양쪽에 보유
+    return pd.DataFrame({
+        "구분": ["지수구성", "지수구성", "개별종목", "개별종목"],
+        "티커": ["NVDA", "MSFT", "NVDA", "TSLA"],
+        "이름": ["NVIDIA", "Microsoft", "NVIDIA", "Tesla"],
+        "보유수량": [10, 5, 4, 2],
+        "평균단가": [100.0, 300.0, 100.0, 200.0],
+        "현재평가금액": [1200.0, 1500.0, 480.0, 300.0],
+    })
+
+
+def test_allocation_keeps_ticker_in_each_category():
+    ratio_df = calc_allocation(us_positions(), 1000.0, ["구분"], name_col="이름")
+    tickers = ratio_df.loc[ratio_df["수준"] == "티커"].set_index(["상위", "구분"])
+
+    assert len(tickers) == 4
+    assert tickers.loc[("지수구성", "NVDA"), "현재평가금액"] == pytest.approx(1200.0)
+    assert tickers.loc[("개별종목", "NVDA"), "현재평가금액"] == pytest.approx(480.0)
+    assert tickers.loc[("개별종목", "NVDA"), "수익률"] == pytest.approx(20.0)
+
+    categories = ratio_df.loc[ratio_df["수준"] == "구분"].set_index("구분")
+    assert categories.loc["지수구성", "현재평가금액"] == pytest.approx(2700.0)
+    assert categories.loc["개별종목", "현재평가금액"] == pytest.approx(780.0)
+    assert ratio_df.loc[ratio_df["수준"] == "티커", "투자비중"].sum() == pytest.approx(3480.0 / 4480.0 * 100)
+
+
+def test_allocation_sums_lots_of_same_path():
+    positions = pd.concat([us_positions(), us_positions().iloc[[0]]], ignore_index=True)
+    ratio_df = calc_allocation(positions, 0.0, ["구분"])
+    tickers = ratio_df.loc[ratio_df["수준"] == "티커"].set_index(["상위", "구분"])
+    assert len(tickers) == 4
+    assert tickers.loc[("지수구성", "NVDA"), "현재평가금액"] == pytest.approx(2400.0)
+
+
+def test_allocation_us_splits_index_and_individual():
+    index_df, individ_df = calc_allocation_us(us_positions(), 1000.0)
+    assert sorted(index_df["티커"]) == ["MSFT", "NVDA"]
+    assert sorted(individ_df["티커"]) == ["NVDA", "TSLA"]
+    nvda = individ_df.set_index("티커").loc["NVDA", "투자비중"]
+    assert nvda == pytest.approx(480.0 / 4480.0 * 100)
+
+
+def test_allocation_kr_levels():
+    positions = pd.DataFrame({
+        "구분1": ["주식", "주식", "채권"],
+        "구분2": ["국내주식", "해외주식", "국내채권"],
+        "티커": ["069500", "360750", "148070"],
+        "종목명": ["KODEX 200", "TIGER 미국S&P500", "KOSEF 국고채10년"],
+        "보유수량": [10, 10, 10],
+        "평균단가": [100.0, 100.0, 100.0],
+        "현재평가금액": [1100.0, 900.0, 1000.0],
+    })
+    ratio_df = calc_allocation(positions, 0.0, ["구분1", "구분2"], name_col="종목명", limits={"주식": 70.0})
+    rows = ratio_df.set_index(["수준", "구분"])
+    assert rows.loc[("구분1", "주식"), "투자비중"] == pytest.approx(2000.0 / 3000.0 * 100)
+    assert rows.loc[("구분1", "주식"), "여유"] == pytest.approx(70.0 - 2000.0 / 3000.0 * 100)
+    assert rows.loc[("구분2", "해외주식"), "상위"] == "주식"
+    assert rows.loc[("티커", "360750"), "상위"] == "해외주식"
+    assert np.isnan(rows.loc[("구분1", "채권"), "상한"])
+
+
+def test_trade_impact_keys_ticker_by_category():
+    positions = us_positions().drop(columns="현재평가금액")[["티커", "구분", "이름", "보유수량", "평균단가"]]
+    last_close = pd.Series({"NVDA": 120.0, "MSFT": 300.0, "TSLA": 150.0})
+    trade = {"티커": "NVDA", "이름": "NVIDIA", "구분": "개별종목", "거래유형": "매수", "거래수량": 1, "금액": 120.0}
+    impact = calc_trade_impact(positions, 1000.0, last_close, trade, US=True)
+
+    ticker_rows = impact.loc[impact["수준"] == "티커"]
+    assert len(ticker_rows) == 1
+    nvda = ticker_rows.iloc[0]
+    total_before = 1000.0 + 10 * 120.0 + 5 * 300.0 + 4 * 120.0 + 2 * 150.0
+    assert nvda["상위"] == "개별종목"
+    assert nvda["거래전"] == pytest.approx(4 * 120.0 / total_before * 100)
+    assert nvda["투자비중"] == pytest.approx(5 * 120.0 / total_before * 100)
+
+    categories = impact.loc[impact["수준"] == "구분"].set_index("구분")
+    assert categories.loc["지수구성", "거래전"] == pytest.approx(categories.loc["지수구성", "투자비중"])
+    assert categories.loc["개별종목", "거래전"] == pytest.approx((4 * 120.0 + 2 * 150.0) / total_before * 100)
+
+
+def test_analyze_account_without_index_positions(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.indicators.INDICATOR_STATE_DIR", str(tmp_path / "state"))
+    prices = {"TSLA": SyntheticSource(seed=1).read("TSLA", "2025-01-01", "2025-06-30")}
+    panel = build_price_panel(prices, ["TSLA"], panel_dir=str(tmp_path / "panel"))
+    trading_log = pd.DataFrame({
+        "구분": ["개별종목"], "거래일": [pd.Timestamp("2025-02-03")], "티커": ["TSLA"], "이름": ["Tesla"],
+        "거래유형": ["매수"], "거래수량": [2], "평균단가": [100.0], "금액": [200.0],
+    })
+
+    # 분석 페이지가 그대로 표시하는 결과: 지수구성 종목이 없으면 수익률을 나누지 않는다
+    result = analyze_account("US", trading_log, panel, state_key="US")
+    assert result["summary"]["지수구성평가손익"] == 0.0
+    assert result["summary"]["지수구성수익률(%)"] is None
+    assert result["targets"]["티커"].tolist() == ["TSLA"]
+    assert isinstance(result["summary"]["실현손익총액"], int)
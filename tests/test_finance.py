@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+
+from utils.finance import calc_profit_kr, calc_profit_us, calc_realized_profit, match_lots_kr, match_lots_us
+
+
+def kr_log(rows):
+    """rows: (거래일, 거래유형, 거래수량, 금액) - 모두 KODEX 200"""
+    return pd.DataFrame([{"구분1": "위험", "구분2": "국내주식_지수", "거래일": pd.Timestamp(day), "티커": "069500",
+                          "종목명": "KODEX 200", "거래유형": trade_type, "거래수량": quantity, "평균단가": amount / quantity,
+                          "금액": amount} for day, trade_type, quantity, amount in rows])
+
+
+def us_log(rows):
+    """rows: (거래일, 구분, 거래유형, 거래수량, 금액) - 모두 NVDA"""
+    return pd.DataFrame([{"티커": "NVDA", "이름": "엔비디아", "거래일": pd.Timestamp(day), "거래유형": trade_type,
+                          "구분": category, "거래수량": quantity, "평균단가": amount / quantity, "금액": amount}
+                         for day, category, trade_type, quantity, amount in rows])
+
+
+PARTIAL_SELL = [("2025-01-02", "매수", 10, 100_000), ("2025-01-03", "매수", 10, 120_000),
+                ("2025-01-06", "매도", 15, 195_000)]
+
+
+def test_partial_sell_across_two_lots():
+    book = match_lots_kr(kr_log(PARTIAL_SELL))
+
+    [match] = book.realized_matches()
+    assert match["quantity"] == 15
+    assert match["cost"] == pytest.approx(100_000 + 60_000)
+    assert match["cost_fee"] == pytest.approx(100_100 + 60_060)  # 매수 수수료 0.1% 포함
+    assert match["sell_amount"] == 195_000 - 195
+    assert match["buy_date"] == pd.Timestamp("2025-01-03")  # 마지막으로 매칭된 lot의 매수일
+
+    [(ticker, quantity, cost, cost_fee)] = list(book.open_positions())
+    assert (ticker, quantity) == ("069500", 5)
+    assert cost == pytest.approx(60_000) and cost_fee == pytest.approx(60_060)
+    assert book.buy_date["069500"] == pd.Timestamp("2025-01-02")  # 포지션을 시작한 날
+
+
+def test_profit_of_remaining_lot():
+    last_close = pd.Series({"069500": 13_000.0})
+    log = kr_log(PARTIAL_SELL)
+
+    row = calc_profit_kr(log, last_close, apply_fee=False).iloc[0]
+    assert row["평균단가"] == pytest.approx(12_000)
+    assert row["평가손익"] == pytest.approx(5_000)
+    assert row["투자수익률(%)"] == pytest.approx(8.33)
+
+    row = calc_profit_kr(log, last_close, apply_fee=True).iloc[0]
+    assert row["평가손익"] == pytest.approx(65_000 - 60_060 - 65)
+    assert row["투자수익률(%)"] == pytest.approx(8.12)
+    assert row["매수일"] == "2025-01-02"
+
+
+def test_sell_out_then_rebuy_resets_buy_date():
+    log = kr_log([("2025-01-02", "매수", 10, 100_000), ("2025-01-03", "매도", 10, 110_000),
+                  ("2025-01-06", "매수", 5, 60_000)])
+    book = match_lots_kr(log)
+    assert book.buy_date["069500"] == pd.Timestamp("2025-01-06")
+    assert [quantity for _, quantity, _, _ in book.open_positions()] == [5]
+    assert calc_profit_kr(log, pd.Series({"069500": 12_000.0}), apply_fee=False).iloc[0]["매수일"] == "2025-01-06"
+
+
+def test_same_day_trades_keep_log_order():
+    # 날짜순으로 정렬하되 같은 날 거래는 기록 순서대로 매칭한다 (로그가 날짜순이 아니어도)
+    buy_then_sell = kr_log([PARTIAL_SELL[1], PARTIAL_SELL[2], PARTIAL_SELL[0]])
+    buy_then_sell["거래일"] = pd.to_datetime(["2025-01-03", "2025-01-03", "2025-01-02"])
+    [match] = match_lots_kr(buy_then_sell).realized_matches()
+    assert match["quantity"] == 15
+
+    sell_then_buy = kr_log([("2025-01-02", "매수", 10, 100_000), ("2025-01-03", "매도", 15, 195_000),
+                            ("2025-01-03", "매수", 10, 120_000)])
+    book = match_lots_kr(sell_then_buy)
+    [match] = book.realized_matches()
+    assert match["quantity"] == 10  # 보유한 10주만 매칭
+    assert book.buy_date["069500"] == pd.Timestamp("2025-01-03")
+    assert [quantity for _, quantity, _, _ in book.open_positions()] == [10]
+
+
+def test_us_lots_are_kept_per_category():
+    log = us_log([("2025-01-02", "지수구성", "매수", 10, 1_000.0), ("2025-01-03", "개별종목", "매수", 4, 480.0),
+                  ("2025-01-06", "개별종목", "매도", 2, 260.0)])
+    book = match_lots_us(log, by_category=True)
+    positions = {key: quantity for key, quantity, _, _ in book.open_positions()}
+    assert positions == {("지수구성", "NVDA"): 10, ("개별종목", "NVDA"): 2}
+
+    profit = calc_profit_us(log, pd.Series({"NVDA": 130.0}), apply_fee=False).set_index("구분")
+    assert profit.loc["지수구성", "평균단가"] == pytest.approx(100.0)
+    assert profit.loc["개별종목", "평균단가"] == pytest.approx(120.0)
+    assert profit.loc["개별종목", "평가손익"] == pytest.approx(2 * 130.0 - 240.0)
+
+
+def test_realized_profit_totals():
+    realized_df, total = calc_realized_profit(kr_log(PARTIAL_SELL))
+    assert total == 195_000 - 195 - 160_160
+    assert realized_df.iloc[0]["매수단가"] == pytest.approx(160_000 / 15)
+    assert realized_df.iloc[0]["수익률(%)"] == pytest.approx(34_645 / 160_160 * 100)
+
+    log = us_log([("2025-01-02", "지수구성", "매수", 10, 1_000.0), ("2025-01-03", "개별종목", "매수", 10, 1_100.0),
+                  ("2025-01-06", "개별종목", "매도", 15, 1_800.0)])
+    realized_df, total = calc_realized_profit(log, US=True)  # 실현손익은 티커별 FIFO
+    # 매수: 1000 + 수수료 2 → 1002, 1100의 절반 + 수수료 2의 절반 → 551, 매도: 1800 - 수수료 3 → 1797
+    assert total == int(1_797 - 1_002 - 551)
+    assert list(realized_df["티커"]) == ["NVDA"]
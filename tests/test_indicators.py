@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.indicators as indicators
+from utils.indicators import IndicatorState, advance_state, compute_indicators
+from utils.price_sources import SyntheticSource
+
+# 기대값은 ta 0.11.0(RSIIndicator(14), BollingerBands(20, 2), ADXIndicator(14))으로 같은 계열을 계산한 마지막 값
+EXPECTED = {"RSI": 70.51278822144907, "볼린저상단": 126.06309302908446, "볼린저하단": 103.89327448302618,
+            "ADX": 22.766608785643236}
+
+
+def known_series(n=40):
+    i = np.arange(n)
+    close = 100 + 10 * np.sin(i / 3) + 0.5 * i
+    return close, close + 1 + (i % 3) * 0.5, close - 1 - (i % 4) * 0.3
+
+
+def test_indicators_match_reference_values():
+    close, high, low = known_series()
+    dates = pd.bdate_range("2025-01-02", periods=len(close))
+    short = np.full(len(close), np.nan)
+    short[-10:] = close[-10:]  # 최근 10봉만 있는 종목 (지표 계산에 봉이 부족)
+    close_df = pd.DataFrame({"AAA": close, "NEW": short}, index=dates)
+    high_df = pd.DataFrame({"AAA": high, "NEW": short + 1}, index=dates)
+    low_df = pd.DataFrame({"AAA": low, "NEW": short - 1}, index=dates)
+
+    result = compute_indicators(close_df, high_df, low_df).set_index("티커")
+    for column, expected in EXPECTED.items():
+        assert result.loc["AAA", column] == pytest.approx(expected, rel=1e-9)
+    assert result.loc["AAA", "종가"] == pytest.approx(close[-1])
+    assert (result.loc["AAA", "RSI신호"], result.loc["AAA", "볼린저밴드"], result.loc["AAA", "ADX신호"]) == \
+        ("과매수", "정상범위", "강한추세")
+
+    assert result.loc["NEW", ["RSI", "볼린저상단", "볼린저하단", "ADX"]].isna().all()
+    assert result.loc["NEW", "종가"] == pytest.approx(close[-1])
+
+
+def synthetic_panel(tickers, n):
+    source = SyntheticSource(seed=3)
+    frames = {ticker: source.read(ticker, "2024-01-01", "2024-12-31").iloc[:n] for ticker in tickers}
+    dates = frames[tickers[0]].index
+    return dates, [np.column_stack([frames[t][field].to_numpy() for t in tickers]) for field in ("Close", "High", "Low")]
+
+
+def test_advanced_state_matches_full_recompute(tmp_path):
+    tickers = ["AAA", "BBB", "CCC"]
+    dates, (close, high, low) = synthetic_panel(tickers, 121)
+    n = len(dates) - 1  # 마지막 한 봉은 저장 후에 새로 생긴 봉
+
+    full = advance_state(None, dates, tickers, close, high, low, n).values()
+
+    partial = advance_state(None, dates, tickers, close, high, low, 80)
+    path = str(tmp_path / "state.npz")
+    partial.save(path)
+    loaded = IndicatorState.load(path)
+    assert loaded.last_date == dates[79] and loaded.tickers == tickers
+    advanced = advance_state(loaded, dates, tickers, close, high, low, n)
+    pd.testing.assert_frame_equal(advanced.values(), full, rtol=1e-9)
+
+    # 다시 저장 / 불러온 뒤 새 봉 하나를 더 반영해도 처음부터 계산한 것과 같다
+    advanced.save(path)
+    appended = advance_state(IndicatorState.load(path), dates, tickers, close, high, low, n + 1)
+    pd.testing.assert_frame_equal(appended.values(),
+                                  advance_state(None, dates, tickers, close, high, low, n + 1).values(), rtol=1e-9)
+
+
+def test_saved_state_handles_new_ticker_and_appended_bar(tmp_path, monkeypatch):
+    monkeypatch.setattr(indicators, "INDICATOR_STATE_DIR", str(tmp_path))
+    dates, (close, high, low) = synthetic_panel(["AAA", "BBB"], 101)
+
+    def frames(rows, columns):
+        idx = [["AAA", "BBB"].index(c) for c in columns]
+        return [pd.DataFrame(values[:rows][:, idx], index=dates[:rows], columns=columns) for values in (close, high, low)]
+
+    compute_indicators(*frames(100, ["AAA"]), state_key="KR")
+    assert (tmp_path / "KR.npz").exists()
+    # 다음 실행: 봉 하나가 추가되고 종목(BBB)도 새로 생김
+    incremental = compute_indicators(*frames(101, ["AAA", "BBB"]), state_key="KR")
+    pd.testing.assert_frame_equal(incremental, compute_indicators(*frames(101, ["AAA", "BBB"])), rtol=1e-9)
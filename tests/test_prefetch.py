@@ -0,0 +1,187 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import utils.prices as prices
+from utils.cache import TTLCache
+from utils.prefetch import PrefetchScheduler, last_run_time, next_run_time, read_status, warm_market
+from utils.price_sources import SyntheticSource
+from utils.trade_store import TradeStore
+
+SCHEDULE = {"KR": ("Asia/Seoul", "15:45"), "US": ("America/New_York", "16:30")}
+
+
+@pytest.fixture(autouse=True)
+def no_real_sleep(monkeypatch):
+    # 재시도 대기는 가짜 시계로만 진행되어야 한다
+    monkeypatch.setattr("time.sleep", lambda seconds: pytest.fail("real sleep called"))
+
+
+class FakeClock:
+    """wait(초)만큼 시각을 앞당기는 가짜 시계"""
+
+    def __init__(self, now):
+        self.now = now
+        self.waits = []
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+        self.now += timedelta(seconds=seconds)
+        return False
+
+
+class FakeJob:
+    def __init__(self, clock, failures=None):
+        self.clock = clock
+        self.failures = dict(failures or {})  # market -> 실패로 돌려줄 횟수
+        self.calls = []
+
+    def __call__(self, market, today, universe):
+        self.calls.append((market, self.clock.now, universe))
+        if self.failures.get(market):
+            self.failures[market] -= 1
+            return {"tickers": 1, "universe": 0, "failed": ["AAPL"]}
+        return {"tickers": 1, "universe": 2 if universe else 0, "failed": []}
+
+
+def make_scheduler(tmp_path, clock, job, **kwargs):
+    return PrefetchScheduler(schedule=SCHEDULE, job=job, status_path=str(tmp_path / "status.json"),
+                             clock=clock, wait=clock.wait, seed=1, **kwargs)
+
+
+def run_until(scheduler, clock, until):
+    while clock.now < until:
+        scheduler.run_pending()
+        clock.wait(max((min(scheduler.next_run.values()) - clock.now).total_seconds(), 0))
+
+
+FRIDAY_KST_14 = datetime(2026, 10, 16, 5, 0, tzinfo=timezone.utc)  # 금요일 14:00 KST
+
+
+def test_run_times_skip_weekends():
+    friday_night = datetime(2026, 10, 16, 21, 0, tzinfo=timezone.utc)  # 금요일 17:00 ET
+    assert next_run_time(friday_night, *SCHEDULE["US"]) == datetime(2026, 10, 19, 20, 30, tzinfo=timezone.utc)
+    saturday = datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc)
+    assert last_run_time(saturday, *SCHEDULE["KR"]) == datetime(2026, 10, 16, 6, 45, tzinfo=timezone.utc)
+
+
+def test_cold_start_catch_up_is_delayed_and_skips_universe(tmp_path):
+    clock = FakeClock(FRIDAY_KST_14)
+    job = FakeJob(clock)
+    scheduler = make_scheduler(tmp_path, clock, job, startup_delay=300, universe=True)
+    assert scheduler.next_run == {"KR": FRIDAY_KST_14 + timedelta(seconds=300),
+                                  "US": FRIDAY_KST_14 + timedelta(seconds=300)}
+
+    scheduler.run_pending()
+    assert job.calls == []  # 첫 화면과 겹치지 않게 바로 실행하지 않음
+
+    run_until(scheduler, clock, datetime(2026, 10, 16, 7, 0, tzinfo=timezone.utc))
+    catch_up = FRIDAY_KST_14 + timedelta(seconds=300)
+    assert job.calls == [("KR", catch_up, False), ("US", catch_up, False),
+                         ("KR", datetime(2026, 10, 16, 6, 45, tzinfo=timezone.utc), True)]
+
+
+def test_failed_run_is_retried_with_backoff_and_status_written(tmp_path):
+    clock = FakeClock(FRIDAY_KST_14)
+    job = FakeJob(clock, failures={"US": 2})
+    scheduler = make_scheduler(tmp_path, clock, job, retries=3, retry_delay=60, startup_delay=0)
+    scheduler.run_pending()
+
+    assert [market for market, _, _ in job.calls] == ["KR", "US", "US", "US"]
+    first, second = clock.waits[:2]
+    assert 30 <= first <= 90 and 60 <= second <= 180  # 60 × 2^시도 × (0.5~1.5)
+
+    status = read_status(scheduler.status_path)
+    assert status["US"]["ok"] is True and status["US"]["attempts"] == 3
+    assert status["US"]["last_success"] == status["US"]["last_run"]
+    assert status["KR"]["next_run"] == next_run_time(clock.now, *SCHEDULE["KR"]).isoformat()
+
+
+def test_gives_up_after_retries(tmp_path):
+    clock = FakeClock(FRIDAY_KST_14)
+    job = FakeJob(clock, failures={"KR": 10})
+    scheduler = make_scheduler(tmp_path, clock, job, retries=2, startup_delay=0)
+    status = scheduler.run_job("KR")
+    assert status["ok"] is False and status["attempts"] == 3
+    assert status["error"] == "1개 종목 조회 실패" and "last_success" not in status
+
+
+def test_exception_in_job_is_recorded(tmp_path):
+    clock = FakeClock(FRIDAY_KST_14)
+
+    def broken(market, today, universe):
+        raise ConnectionError("offline")
+    scheduler = make_scheduler(tmp_path, clock, broken, retries=0, startup_delay=0)
+    status = scheduler.run_job("KR")
+    assert status["ok"] is False and "offline" in status["error"]
+
+
+def test_restart_after_success_waits_for_next_close(tmp_path):
+    clock = FakeClock(FRIDAY_KST_14)
+    job = FakeJob(clock)
+    make_scheduler(tmp_path, clock, job, startup_delay=0).run_pending()
+    assert len(job.calls) == 2
+    clock.now += timedelta(minutes=10)
+
+    restarted = make_scheduler(tmp_path, clock, job)
+    assert restarted.catch_up == set()
+    assert restarted.next_run["KR"] == datetime(2026, 10, 16, 6, 45, tzinfo=timezone.utc)
+
+
+def test_missed_close_is_caught_up_after_restart(tmp_path):
+    (tmp_path / "status.json").write_text(json.dumps({
+        market: {"last_success": "2026-10-14T00:00:00+00:00"} for market in SCHEDULE}))
+    clock = FakeClock(FRIDAY_KST_14)
+    scheduler = make_scheduler(tmp_path, clock, FakeJob(clock), startup_delay=60)
+    assert scheduler.catch_up == {"KR", "US"}
+    assert set(scheduler.next_run.values()) == {FRIDAY_KST_14 + timedelta(seconds=60)}
+
+
+class CountingSource(SyntheticSource):
+    """디스크 캐시를 거치는(네트워크 공급원처럼 동작하는) 합성 공급원"""
+    name = "counting"
+    cacheable = True
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def read(self, symbol, start, end):
+        self.reads.append(symbol)
+        return super().read(symbol, start, end)
+
+
+def test_warm_market_refetches_bars_cached_intraday(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # 가격 캐시 / 패널은 ./data 아래에 쓴다
+    source = CountingSource()
+    monkeypatch.setattr(prices, "get_price_source", lambda name=None: source)
+    monkeypatch.setattr(prices, "shared_price_cache", TTLCache(maxsize=16, ttl=600))
+    monkeypatch.setattr(prices, "shared_panel_cache", TTLCache(maxsize=16, ttl=600))
+
+    store = TradeStore(str(tmp_path / "trading_log.db"))
+    store.append("KR", {"구분1": "위험", "구분2": "국내주식_지수", "거래일": "2025-01-02", "티커": "069500",
+                        "종목명": "KODEX 200", "거래유형": "매수", "거래수량": 10, "평균단가": 40000.0, "금액": 400000})
+    today = datetime.today()
+
+    # 장중에 페이지를 열어 메모리 / 디스크 캐시가 채워진 상태
+    prices.load_account_prices(store.load("KR"), today=today)
+    cache_path = prices._cache_path("069500")
+    cached = pd.read_parquet(cache_path)
+    cached.attrs["checked_at"] = (pd.Timestamp.now() - pd.Timedelta(minutes=1)).isoformat()
+    cached.to_parquet(cache_path)
+    prices.load_account_prices(store.load("KR"), today=today, refresh=False)
+    assert source.reads == ["069500"]
+
+    result = warm_market("KR", today, universe=False, store=store)
+    assert result["failed"] == [] and source.reads == ["069500", "069500"]
+
+    # 새로 받은 값이 공용 캐시에 들어가 이후 페이지 조회는 다시 받지 않는다
+    prices.shared_panel_cache.clear()
+    prices.load_account_prices(store.load("KR"), today=today)
+    assert source.reads == ["069500", "069500"]
+    assert pd.Timestamp(pd.read_parquet(cache_path).attrs["checked_at"]) > pd.Timestamp(cached.attrs["checked_at"])
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from utils.prices import fetch_price, fetch_prices
+from utils.price_sources import ReplaySource, SyntheticSource, get_price_source
+
+
+def test_synthetic_prices_do_not_depend_on_window():
+    source = SyntheticSource(seed=1)
+    long = source.read("AAPL", "2025-01-01", "2025-06-30")
+    short = source.read("AAPL", "2025-03-03", "2025-03-31")
+    pd.testing.assert_frame_equal(short, long.loc["2025-03-03":"2025-03-31"])
+    assert not long.equals(SyntheticSource(seed=2).read("AAPL", "2025-01-01", "2025-06-30"))
+    assert (long["High"] >= long["Close"]).all() and (long["Low"] <= long["Close"]).all()
+
+
+def test_synthetic_price_levels_follow_market():
+    source = SyntheticSource()
+    assert source.read("069500", "2025-01-02", "2025-01-31")["Close"].iloc[0] > 1_000  # 원화
+    assert source.read("AAPL", "2025-01-02", "2025-01-31")["Close"].iloc[0] < 1_000  # 달러
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_replay_reads_window_from_directory(tmp_path, fmt):
+    data = SyntheticSource().read("069500", "2025-01-01", "2025-03-31")
+    if fmt == "parquet":
+        data.to_parquet(tmp_path / "069500.parquet")
+    else:
+        data.to_csv(tmp_path / "069500.csv")
+
+    window = ReplaySource(str(tmp_path)).read("069500", "2025-02-03", "2025-02-28")
+    assert window.index.min() == pd.Timestamp("2025-02-03")
+    assert window.index.max() == pd.Timestamp("2025-02-28")
+    assert window["Close"].to_numpy() == pytest.approx(data.loc["2025-02-03":"2025-02-28", "Close"].to_numpy())
+
+
+def test_replay_missing_symbol_is_reported_as_failed(tmp_path):
+    source = ReplaySource(str(tmp_path))
+    SyntheticSource().read("AAPL", "2025-01-01", "2025-01-31").to_parquet(tmp_path / "AAPL.parquet")
+
+    def fetcher(symbol, start, end):
+        return fetch_price(symbol, start, end, cache_dir=tmp_path / "cache", source=source)
+
+    windows = {"AAPL": ("2025-01-02", "2025-01-31"), "MSFT": ("2025-01-02", "2025-01-31")}
+    price_dict, failed = fetch_prices(windows, fetcher=fetcher, retries=0)
+    assert list(price_dict) == ["AAPL"]
+    assert isinstance(failed["MSFT"], FileNotFoundError)
+    assert not (tmp_path / "cache").exists()  # 로컬 공급원은 디스크 캐시를 거치지 않음
+
+
+def test_get_price_source_by_name():
+    assert get_price_source("synthetic") is get_price_source("synthetic")
+    with pytest.raises(ValueError):
+        get_price_source("unknown")
@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import utils.prices as prices
+from utils.cache import TTLCache
+from utils.price_sources import SyntheticSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def panel_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # 가격 패널(메모리 맵) 파일은 ./data/price_panel에 쓴다
+    clock = FakeClock()
+    monkeypatch.setattr(prices, "shared_panel_cache", TTLCache(maxsize=16, ttl=600, clock=clock))
+    return clock
+
+
+def test_panel_with_failures_is_cached_briefly(panel_cache, monkeypatch):
+    calls = []
+
+    def fake_fetch_prices(windows, refresh=False):
+        calls.append(sorted(windows))
+        data = SyntheticSource().read("AAA", "2025-01-01", "2025-01-31")
+        return {"AAA": data}, {"BAD": RuntimeError("no data")}
+    monkeypatch.setattr(prices, "fetch_prices", fake_fetch_prices)
+
+    windows = {"AAA": ("2025-01-01", "2025-01-31"), "BAD": ("2025-01-01", "2025-01-31")}
+    panel, failed = prices.load_price_panel(windows)
+    assert list(failed) == ["BAD"]
+    assert "AAA" in panel
+
+    # 실패 결과도 잠시 캐시되어 매 실행마다 다시 받지 않는다
+    _, failed = prices.load_price_panel(windows)
+    assert list(failed) == ["BAD"] and len(calls) == 1
+
+    # 명시적으로 새로고침하거나 실패 캐시 유효시간이 지나면 다시 받는다
+    prices.load_price_panel(windows, refresh=True)
+    assert len(calls) == 2
+    panel_cache.now += prices.PRICE_FAILED_CACHE_TTL + 1
+    prices.load_price_panel(windows)
+    assert len(calls) == 3
+
+
+def test_complete_panel_uses_full_ttl(panel_cache, monkeypatch):
+    calls = []
+
+    def fake_fetch_prices(windows, refresh=False):
+        calls.append(sorted(windows))
+        return {"AAA": SyntheticSource().read("AAA", "2025-01-01", "2025-01-31")}, {}
+    monkeypatch.setattr(prices, "fetch_prices", fake_fetch_prices)
+
+    windows = {"AAA": ("2025-01-01", "2025-01-31")}
+    prices.load_price_panel(windows)
+    panel_cache.now += prices.PRICE_FAILED_CACHE_TTL + 1
+    panel, failed = prices.load_price_panel(windows)
+    assert len(calls) == 1 and failed == {}
+    assert panel.last_close()["AAA"] == pytest.approx(
+        SyntheticSource().read("AAA", "2025-01-01", "2025-01-31")["Close"].iloc[-1], rel=1e-6)
+
+
+class CountingSource:
+    """캐시를 거치는 공급원처럼 동작하는 합성 공급원 (조회 횟수 기록)"""
+    name = "counting"
+    cacheable = True
+
+    def __init__(self):
+        self.reads = []
+
+    def read(self, symbol, start, end):
+        self.reads.append((pd.Timestamp(start), pd.Timestamp(end)))
+        return SyntheticSource().read(symbol, start, end)
+
+
+def test_weekend_does_not_refetch(tmp_path):
+    source = CountingSource()
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-04", cache_dir=tmp_path, source=source)  # 토요일까지
+    assert len(source.reads) == 1
+
+    data = prices.fetch_price("AAA", "2025-01-02", "2025-01-05", cache_dir=tmp_path, source=source)  # 일요일
+    assert len(source.reads) == 1
+    assert data.index.max() == pd.Timestamp("2025-01-03")
+
+
+def test_intraday_bar_is_refetched_once_after_the_session(tmp_path):
+    source = CountingSource()
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-03", cache_dir=tmp_path, source=source)
+    cached = prices.load_cached_price("AAA", tmp_path)
+    cached.attrs["checked_at"] = "2025-01-03T10:00:00"  # 금요일 장중에 받은 캐시로 가정
+    cached.to_parquet(prices._cache_path("AAA", tmp_path))
+
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-04", cache_dir=tmp_path, source=source)
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-04", cache_dir=tmp_path, source=source)
+    assert source.reads[1:] == [(pd.Timestamp("2025-01-03"), pd.Timestamp("2025-01-04"))]
+
+
+def test_intraday_bar_on_end_date_is_refetched_after_the_close(tmp_path, monkeypatch):
+    source = CountingSource()
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-03", cache_dir=tmp_path, source=source)
+    cached = prices.load_cached_price("AAA", tmp_path)
+    assert cached.index.max() == pd.Timestamp("2025-01-03")
+    cached.attrs["checked_at"] = "2025-01-03T10:00:00"  # 마지막 봉 당일 장중에 받은 캐시
+    cached.to_parquet(prices._cache_path("AAA", tmp_path))
+
+    # 같은 날을 끝으로 다시 요청해도 장중 봉은 확정값이 아니므로 다시 받는다
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-03", cache_dir=tmp_path, source=source)
+    assert source.reads[1:] == [(pd.Timestamp("2025-01-03"), pd.Timestamp("2025-01-03"))]
+
+    # 방금 확인했으므로 PRICE_RECHECK_INTERVAL 안에는 다시 받지 않는다
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-03", cache_dir=tmp_path, source=source)
+    assert len(source.reads) == 2
+
+
+def test_bar_before_later_cached_bars_is_final(tmp_path):
+    source = CountingSource()
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-10", cache_dir=tmp_path, source=source)
+    cached = prices.load_cached_price("AAA", tmp_path)
+    cached.attrs["checked_at"] = "2025-01-10T10:00:00"
+    cached.to_parquet(prices._cache_path("AAA", tmp_path))
+
+    data = prices.fetch_price("AAA", "2025-01-02", "2025-01-06", cache_dir=tmp_path, source=source)
+    assert len(source.reads) == 1 and data.index.max() == pd.Timestamp("2025-01-06")
+
+
+class HolidaySource(CountingSource):
+    """2025-01-20(월, 휴장) 봉이 없는 공급원"""
+
+    def read(self, symbol, start, end):
+        return super().read(symbol, start, end).loc[:"2025-01-17"]
+
+
+def test_weekday_holiday_is_rechecked_after_interval(tmp_path, monkeypatch):
+    source = HolidaySource()
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-20", cache_dir=tmp_path, source=source)
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-20", cache_dir=tmp_path, source=source)
+    assert len(source.reads) == 1
+
+    monkeypatch.setattr(prices, "PRICE_RECHECK_INTERVAL", 0)
+    prices.fetch_price("AAA", "2025-01-02", "2025-01-20", cache_dir=tmp_path, source=source)
+    assert len(source.reads) == 2
+
+
+def test_fetch_prices_retries_with_backoff(monkeypatch):
+    sleeps, attempts = [], {}
+    monkeypatch.setattr(prices.time, "sleep", sleeps.append)
+
+    def flaky(symbol, start, end):
+        attempts[symbol] = attempts.get(symbol, 0) + 1
+        if symbol == "BAD" or attempts[symbol] < 3:
+            raise ConnectionError(symbol)
+        return symbol
+
+    windows = {"AAA": ("2025-01-02", "2025-01-31"), "BAD": ("2025-01-02", "2025-01-31")}
+    price_dict, failed = prices.fetch_prices(windows, fetcher=flaky, max_workers=1, retries=2, backoff=0.5)
+    assert price_dict == {"AAA": "AAA"}
+    assert isinstance(failed["BAD"], ConnectionError)
+    assert attempts == {"AAA": 3, "BAD": 3}
+    assert sleeps == [0.5, 1.0, 0.5, 1.0]
+
+
+def test_fetch_prices_times_out_slow_symbol():
+    release = threading.Event()
+
+    def slow(symbol, start, end):
+        if symbol == "SLOW":
+            release.wait(5)
+        return symbol
+
+    windows = {"SLOW": ("2025-01-02", "2025-01-31"), "FAST": ("2025-01-02", "2025-01-31")}
+    started = time.monotonic()
+    try:
+        price_dict, failed = prices.fetch_prices(windows, fetcher=slow, max_workers=2, timeout=0.2, retries=0)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+    assert price_dict == {"FAST": "FAST"}
+    assert isinstance(failed["SLOW"], TimeoutError)
+
+
+def test_fetch_prices_counts_timeout_from_start_of_each_symbol():
+    # 작업자가 하나라 뒤 종목은 앞 종목이 끝날 때까지 대기하지만, 대기시간은 제한시간에 넣지 않는다
+    def steady(symbol, start, end):
+        time.sleep(0.15)
+        return symbol
+
+    windows = {symbol: ("2025-01-02", "2025-01-31") for symbol in ["A", "B", "C"]}
+    price_dict, failed = prices.fetch_prices(windows, fetcher=steady, max_workers=1, timeout=0.3, retries=0)
+    assert failed == {} and sorted(price_dict) == ["A", "B", "C"]
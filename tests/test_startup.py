@@ -0,0 +1,16 @@
+import pytest
+
+from utils.startup import startup_report
+
+
+@pytest.mark.parametrize("page, own_module", [
+    ("국내계좌 매수/매도 정보 입력", "pages_module.page_kr"),
+    ("해외계좌 매수/매도 정보 입력", "pages_module.page_us"),
+])
+def test_input_page_loads_only_its_own_module(monkeypatch, page, own_module):
+    monkeypatch.setenv("PREFETCH_ENABLED", "0")  # 백그라운드 스레드가 가격 공급원을 로드하지 않도록
+    report = startup_report(page)
+    assert report["exceptions"] == []
+    # 첫 화면에서 쓰지 않는 페이지 모듈 / FinanceDataReader가 최상위 import로 딸려 오면 실패
+    assert set(report["loaded"]) - {own_module} == set(), report["loaded"]
+    assert "price-prefetch" not in report["threads"]
@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.trade_store import TABLES, TradeStore
+
+
+def us_trade(ticker, day, quantity=1, price=100.0):
+    return {"티커": ticker, "이름": ticker, "거래일": day, "거래유형": "매수", "구분": "개별종목",
+            "거래수량": quantity, "평균단가": price, "금액": quantity * price}
+
+
+def write_csv(trades, bump=0):
+    _, columns, csv_path = TABLES["US"]
+    pd.DataFrame(trades, columns=columns).to_csv(csv_path, index=False)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))  # git pull처럼 서명이 바뀌게
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    write_csv([us_trade("AAPL", "2025-01-02"), us_trade("MSFT", "2025-01-03")])
+    store = TradeStore(str(tmp_path / "data" / "trading_log.db"))
+    store.sync_csv("US")
+    return store
+
+
+def test_csv_change_keeps_unexported_rows_and_ids(store):
+    before = store.load("US")
+    added = store.append("US", us_trade("NVDA", "2025-01-06"))
+
+    # 다른 곳에서 MSFT 거래를 지우고 TSLA 거래를 추가한 CSV를 받음
+    write_csv([us_trade("AAPL", "2025-01-02"), us_trade("TSLA", "2025-01-07")], bump=10**9)
+    assert store.sync_csv("US") == {"추가": 1, "삭제": 0}
+
+    after = store.load("US")
+    assert sorted(after["티커"]) == ["AAPL", "NVDA", "TSLA"]
+    assert after.index[after["티커"] == "AAPL"][0] == before.index[before["티커"] == "AAPL"][0]
+    assert after.loc[added, "티커"] == "NVDA"
+
+    store.delete("US", [added])  # 세션이 들고 있던 id로 그대로 삭제
+    assert "NVDA" not in set(store.load("US")["티커"])
+    assert store.pending("US") == {"추가": 0, "삭제": 0}
+
+
+def test_csv_change_keeps_unexported_deletes(store):
+    aapl = store.load("US").index[0]
+    store.delete("US", [aapl])
+    assert store.pending("US") == {"추가": 0, "삭제": 1}
+
+    write_csv([us_trade("AAPL", "2025-01-02"), us_trade("MSFT", "2025-01-03"), us_trade("TSLA", "2025-01-07")],
+              bump=10**9)
+    store.sync_csv("US")
+    assert sorted(store.load("US")["티커"]) == ["MSFT", "TSLA"]
+    assert store.pending("US") == {"추가": 0, "삭제": 1}
+
+
+def test_unchanged_csv_is_not_reimported(store):
+    store.append("US", us_trade("NVDA", "2025-01-06"))
+    assert store.sync_csv("US") is None
+    assert len(store.load("US")) == 3
+
+
+def test_added_row_already_in_csv_is_not_duplicated(store):
+    store.append("US", us_trade("NVDA", "2025-01-06"))
+    write_csv([us_trade("AAPL", "2025-01-02"), us_trade("MSFT", "2025-01-03"), us_trade("NVDA", "2025-01-06")],
+              bump=10**9)
+    assert store.sync_csv("US") == {"추가": 0, "삭제": 0}
+    assert len(store.load("US")) == 3
+
+
+def test_export_writes_local_changes_and_clears_pending(store):
+    store.delete("US", [store.load("US").index[0]])
+    store.append("US", us_trade("NVDA", "2025-01-06"))
+    csv_path = store.export_csv("US")
+
+    exported = pd.read_csv(csv_path, dtype={"티커": str})
+    assert list(exported["티커"]) == ["MSFT", "NVDA"]
+    assert store.pending("US") == {"추가": 0, "삭제": 0}
+    assert store.sync_csv("US") is None
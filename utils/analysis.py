@@ -0,0 +1,284 @@
+import numpy as np
+import pandas as pd
+
+from utils.finance import (calc_profit_kr, calc_profit_us, calc_realized_profit, calc_cash_series,
+                           get_remaining_cash, calc_nav, trade_cash_flow)
+from utils.fx import latest_rate, rates_on
+from utils.indicators import compute_indicators
+from utils.profiling import timer
+from utils.config import (INITIAL_CAPITAL_KR, INITIAL_CAPITAL_US, TARGET_LOOKBACK_BARS, TARGET_HORIZONS,
+                          TARGET_DEFAULT_HORIZON, TARGET_LEVELS, STOP_LOSS_RATIO, ALLOCATION_LIMITS_KR,
+                          ALLOCATION_TARGETS_US)
+
+# ---------------------------
+# 계좌 분석 (Streamlit 없이 사용)
+# 분석 페이지와 배치 리포트(utils/report.py)가 같은 계산을 쓰도록 화면 출력과 분리한다.
+
+def _trailing_mean_returns(close, dates, columns, buy_dates, bars):
+    """
+    close(날짜 × 티커 배열)의 티커별 일수익률 중 매수일(포함) 이전 마지막 bars개의 평균 (행마다 하나).
+    columns / buy_dates: 행별 close의 열 번호와 매수일. 해당 수익률이 하나도 없으면 NaN.
+    """
+    n_dates = close.shape[0]
+    # 티커별로 값이 있는 날끼리의 수익률 (티커마다 dropna 후 pct_change한 것과 같음)
+    previous = pd.DataFrame(close).ffill().shift(1).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = close / previous - 1
+    valid = ~np.isnan(returns)
+    valid_count = np.cumsum(valid, axis=0)
+    return_sum = np.cumsum(np.where(valid, returns, 0.0), axis=0)
+
+    # 모든 매수일의 날짜 위치를 한 번에 찾는다 (첫 날짜보다 이르면 -1)
+    positions = np.where(np.isnat(buy_dates), -1, np.searchsorted(dates, buy_dates, side="right") - 1)
+    safe_positions = np.maximum(positions, 0)
+    count = np.where(positions >= 0, valid_count[safe_positions, columns], 0)
+    window = np.minimum(count, bars)
+
+    # 구간 시작 = (count - bars)번째 유효 수익률이 있는 날. 열마다 단조증가하는 누적 개수를 열 순서로 이어 붙여
+    # 한 번의 searchsorted로 찾는다 (열 j의 값에는 j × (날짜 수 + 1)을 더해 열끼리 겹치지 않게 함)
+    offsets = np.arange(close.shape[1]) * (n_dates + 1)
+    flat_count = (valid_count + offsets).T.ravel()
+    skip = count - window
+    skip_positions = np.searchsorted(flat_count, skip + offsets[columns], side="left") - columns * n_dates
+    skipped_sum = np.where(skip > 0, return_sum[np.clip(skip_positions, 0, n_dates - 1), columns], 0.0)
+
+    window_sum = np.where(positions >= 0, return_sum[safe_positions, columns], 0.0) - skipped_sum
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(window > 0, window_sum / window, np.nan)
+
+def calc_targets(target_df, price_panel, category_col=None):
+    """
+    보유 종목별 목표수익률 / 손절가(%) - 모든 종목을 배열 연산 한 번으로 계산한다.
+    기준 기간은 category_col 값으로 TARGET_HORIZONS에서 찾고(없는 구분은 NaN),
+    category_col이 없으면 모든 종목에 TARGET_DEFAULT_HORIZON을 적용한다. 가격이 없는 종목은 제외한다.
+    """
+    columns = ['티커'] + [f'목표수익률({label})' for label, _, _ in TARGET_LEVELS] \
+        + [f'손절가({label})' for label, _, _ in TARGET_LEVELS]
+    ticker_columns = {ticker: i for i, ticker in enumerate(price_panel.tickers)}
+    has_price = ~np.isnan(price_panel.close.to_numpy()).all(axis=0) if len(price_panel.dates) \
+        else np.zeros(len(price_panel.tickers), dtype=bool)
+    rows = target_df.loc[[ticker in ticker_columns and has_price[ticker_columns[ticker]]
+                          for ticker in target_df['티커']]]
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    held = list(dict.fromkeys(rows['티커']))
+    close = price_panel.close[held].to_numpy(dtype='float64')
+    buy_dates = pd.to_datetime(rows['매수일']).to_numpy(dtype='datetime64[ns]')
+    avg_return = _trailing_mean_returns(close, price_panel.dates.to_numpy(dtype='datetime64[ns]'),
+                                        rows['티커'].map({ticker: i for i, ticker in enumerate(held)}).to_numpy(),
+                                        buy_dates, TARGET_LOOKBACK_BARS)
+
+    if category_col is None:
+        horizon = np.full(len(rows), TARGET_DEFAULT_HORIZON, dtype='float64')
+    else:
+        horizon = rows[category_col].map(TARGET_HORIZONS).to_numpy(dtype='float64')
+
+    result = {'티커': rows['티커'].to_numpy()}
+    targets = {label: np.maximum(avg_return * horizon * multiplier, floor) for label, multiplier, floor in TARGET_LEVELS}
+    for label, target in targets.items():
+        result[f'목표수익률({label})'] = target * 100
+    for label, target in targets.items():
+        result[f'손절가({label})'] = target * STOP_LOSS_RATIO * 100
+    return pd.DataFrame(result, columns=columns)
+
+def calc_target_table(target_df, price_panel, state_key=None, category_col=None):
+    """목표수익률 / 손절가와 기술적 지표 신호를 합친 표 (투자수익률 내림차순)"""
+    held = target_df['티커'].tolist()
+    with timer("indicators"):
+        signals = compute_indicators(price_panel.field('Close')[held],
+                                     price_panel.field('High')[held],
+                                     price_panel.field('Low')[held],
+                                     state_key=state_key)
+
+    with timer("targets"):
+        tech_indicator = calc_targets(target_df, price_panel, category_col)
+    tech_indicator = pd.merge(tech_indicator, signals[['티커','RSI신호','볼린저밴드','ADX신호']], on='티커')
+
+    target_df = pd.merge(target_df, tech_indicator, on='티커')
+    return target_df.sort_values('투자수익률(%)',axis=0, ascending=False).reset_index(drop=True)
+
+def _factorize_path(frame, columns):
+    """columns 값의 조합(경로)별 코드 (처음 나온 순서)"""
+    return pd.MultiIndex.from_arrays([np.asarray(frame[col], dtype=object) for col in columns]).factorize()
+
+def calc_allocation(profit_df, remain_cash, levels, name_col=None, limits=None):
+    """
+    levels(상위 → 하위 구분 열) → 티커 계층의 평가금액 / 수익률 / 투자비중(총자산 대비) / 상한 / 여유(상한 - 투자비중).
+    보유 종목은 (구분 경로, 티커)별로 한 번만 합산하고, 상위 수준은 그 합계를 다시 묶어 계산한다.
+    limits: {구분 값 또는 티커: 상한(%)} (없으면 NaN)
+    반환: 수준(열 이름), 구분(해당 수준의 값), 상위(바로 위 수준의 값), [name_col], 금액 / 비율 열
+    """
+    path = [*levels, "티커"]
+    positions = profit_df.dropna(subset=path)
+    # 같은 티커라도 구분이 다르면(예: 지수구성 / 개별종목에 모두 보유) 별개의 종목 행으로 본다
+    leaf_codes, leaves = _factorize_path(positions, path)
+    first = np.unique(leaf_codes, return_index=True)[1]  # 경로별 첫 행 (이름은 경로마다 하나)
+    leaf_labels = {col: positions[col].to_numpy(dtype=object)[first] for col in path + ([name_col] if name_col else [])}
+    leaf_eval = np.bincount(leaf_codes, weights=positions["현재평가금액"].to_numpy(dtype="float64"),
+                            minlength=len(leaves))
+    leaf_base = np.bincount(leaf_codes, weights=(positions["평균단가"] * positions["보유수량"]).to_numpy(dtype="float64"),
+                            minlength=len(leaves))
+    total_asset = remain_cash + leaf_eval.sum()
+
+    columns = {"수준": [], "구분": [], "상위": [], "현재평가금액": [], "기초평가금액": []}
+    names = []
+    for depth, level in enumerate(path):
+        codes, labels = _factorize_path(leaf_labels, path[:depth + 1])  # 상위 경로까지 같은 것끼리 묶음
+        group_first = np.unique(codes, return_index=True)[1]
+        columns["수준"].append(np.full(len(labels), level, dtype=object))
+        columns["구분"].append(leaf_labels[level][group_first])
+        columns["상위"].append(leaf_labels[path[depth - 1]][group_first] if depth
+                              else np.full(len(labels), None, dtype=object))
+        columns["현재평가금액"].append(np.bincount(codes, weights=leaf_eval, minlength=len(labels)))
+        columns["기초평가금액"].append(np.bincount(codes, weights=leaf_base, minlength=len(labels)))
+        if name_col:
+            names.append(leaf_labels[name_col][group_first] if level == "티커"
+                         else np.full(len(labels), None, dtype=object))
+
+    ratio_df = pd.DataFrame({col: np.concatenate(parts) for col, parts in columns.items()})
+    if name_col:
+        ratio_df.insert(3, name_col, np.concatenate(names))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio_df["수익률"] = (ratio_df["현재평가금액"] - ratio_df["기초평가금액"]) / ratio_df["기초평가금액"] * 100
+    ratio_df["투자비중"] = ratio_df["현재평가금액"] / total_asset * 100
+    ratio_df["상한"] = ratio_df["구분"].map(limits or {}).astype("float64")
+    ratio_df["여유"] = ratio_df["상한"] - ratio_df["투자비중"]
+    return ratio_df
+
+def calc_allocation_kr(profit_df, remain_cash):
+    """구분1 / 구분2 / 종목별 투자비중과 상한 (구분은 상한 순, 상한이 없는 구분은 뒤로 / 종목은 투자비중 순)"""
+    ratio_df = calc_allocation(profit_df, remain_cash, ["구분1", "구분2"], name_col="종목명",
+                               limits=ALLOCATION_LIMITS_KR)
+    is_ticker = ratio_df["수준"] == "티커"
+    return pd.concat([ratio_df.loc[~is_ticker].sort_values("상한", kind="stable"),
+                      ratio_df.loc[is_ticker].sort_values("투자비중", ascending=False, kind="stable")],
+                     ignore_index=True)
+
+def calc_allocation_us(profit_df, remain_cash):
+    """지수구성 / 개별종목별 종목 투자비중(총자산 대비, 달러 기준)과 목표비율. 반환: (index_df, individ_df)"""
+    ratio_df = calc_allocation(profit_df, remain_cash, ["구분"], name_col="이름", limits=ALLOCATION_TARGETS_US)
+    ticker_df = ratio_df.loc[ratio_df["수준"] == "티커"].rename(columns={"구분": "티커", "상한": "목표비율"})
+    ticker_df = ticker_df.sort_values("투자비중", ascending=False, kind="stable")
+
+    index_df = ticker_df.loc[ticker_df["상위"] == "지수구성", ["티커", "이름", "현재평가금액", "투자비중", "목표비율", "여유"]]
+    individ_df = ticker_df.loc[ticker_df["상위"] == "개별종목", ["티커", "이름", "현재평가금액", "투자비중"]]
+    return index_df.reset_index(drop=True), individ_df.reset_index(drop=True)
+
+def calc_trade_impact(positions, cash, last_close, trade, US=False):
+    """
+    입력 중인 거래(trade)를 현재 보유 현황에 반영했을 때의 구분 / 해당 종목 투자비중 변화와 상한(해외계좌는 목표비율).
+    positions / cash: PositionLedger.positions() / cash, last_close: 티커별 종가 (가격이 없는 종목은 평균단가로 평가)
+    반환: 수준, 구분, 상위, 상한, 거래전, 투자비중(거래 후), 여유 (구분은 상한 순, 마지막 행이 거래 종목)
+    """
+    levels, name_col, limits = (["구분"], "이름", ALLOCATION_TARGETS_US) if US \
+        else (["구분1", "구분2"], "종목명", ALLOCATION_LIMITS_KR)
+    ticker, quantity = trade["티커"], trade["거래수량"]
+    sign = 1 if trade["거래유형"] == "매수" else -1
+
+    before = positions.set_index("티커")
+    category = levels[-1]  # 종목 바로 위 구분 (해외계좌는 같은 티커를 구분별로 따로 보유)
+    match = np.flatnonzero((before.index == ticker) & (before[category] == trade[category]).to_numpy()
+                           if US else before.index == ticker)
+    if len(match):
+        after = before.copy()
+        row, column = match[0], after.columns.get_loc("보유수량")
+        after.iloc[row, column] = max(after.iloc[row, column] + sign * quantity, 0)
+        parent = after[category].iloc[row]
+    else:
+        new_position = pd.DataFrame([{**{col: trade[col] for col in [*levels, name_col]},
+                                      "보유수량": quantity if sign > 0 else 0,
+                                      "평균단가": trade["금액"] / quantity}], index=pd.Index([ticker], name="티커"))
+        after = pd.concat([before, new_position])
+        parent = trade[category]
+
+    def allocation(holdings, cash):
+        price = last_close.reindex(holdings.index).fillna(holdings["평균단가"])
+        holdings = holdings.assign(현재평가금액=holdings["보유수량"] * price).reset_index()
+        return calc_allocation(holdings, cash, levels, name_col, limits)
+
+    key = ["수준", "상위", "구분"]  # 티커 행은 (상위 구분, 티커)로 구분
+    pre = allocation(before, cash)
+    post = allocation(after, cash + trade_cash_flow(trade["거래유형"], trade["금액"], US=US))
+    impact = post[[*key, "상한"]].merge(pre[[*key, "투자비중"]].rename(columns={"투자비중": "거래전"}),
+                                       on=key, how="left")
+    impact["거래전"] = impact["거래전"].fillna(0.0)
+    impact[["투자비중", "여유"]] = post[["투자비중", "여유"]].to_numpy()
+    impact = impact[["수준", "구분", "상위", "상한", "거래전", "투자비중", "여유"]]
+
+    is_ticker = impact["수준"] == "티커"
+    return pd.concat([impact.loc[~is_ticker].sort_values("상한", kind="stable"),
+                      impact.loc[is_ticker & (impact["구분"] == ticker) & (impact["상위"] == parent)]],
+                     ignore_index=True)
+
+def analyze_account(market, trading_log, price_panel, apply_fee=True, book=None, realized_book=None, state_key=None,
+                    fx_series=None):
+    """
+    한 계좌의 평가손익 / 실현손익 / 일별 총자산 / 목표수익률·지표 / 투자비중을 한 번에 계산한다.
+    분석 페이지도 이 결과를 그대로 화면에 표시한다 (book / realized_book: 세션의 보유 현황 장부).
+    fx_series: 해외계좌의 일별 원/달러 환율 (주면 원화 환산 열과 요약을 추가)
+    반환: {"summary": dict, 표 이름: DataFrame, ...}
+    """
+    US = market == "US"
+    last_close = price_panel.last_close()
+    with timer("calc_profit"):
+        if US:
+            profit_df = calc_profit_us(trading_log, last_close, apply_fee, book=book)
+        else:
+            profit_df = calc_profit_kr(trading_log, last_close, apply_fee, book=book)
+    with timer("calc_realized_profit"):
+        realized_df, total_realized_profit = calc_realized_profit(trading_log, US=US, book=realized_book)
+
+    with timer("calc_cash"):
+        cash_series = calc_cash_series(trading_log, US=US)  # 거래일별 현금 잔고
+        remain_cash = get_remaining_cash(trading_log, US=US, cash_series=cash_series)
+    with timer("calc_nav"):
+        nav_df = calc_nav(trading_log, price_panel.close, US=US, cash_series=cash_series)
+
+    profit_sum = profit_df["평가손익"].sum()
+    eval_sum = profit_df["현재평가금액"].sum()
+    summary = {
+        "market": market,
+        "기준일": price_panel.latest_date.date().isoformat() if price_panel.latest_date is not None else None,
+        "수수료적용": apply_fee,
+        "총평가손익": float(profit_sum),
+        "전체수익률(%)": float(profit_sum / (INITIAL_CAPITAL_US if US else INITIAL_CAPITAL_KR) * 100),
+        "현금": float(remain_cash),
+        "총자산": float(eval_sum + remain_cash),
+        "실현손익총액": total_realized_profit,
+    }
+    result = {"profit": profit_df, "realized": realized_df, "nav": nav_df}
+
+    if US:
+        target_df = profit_df[['구분','티커','이름','매수일','평가손익','투자수익률(%)']]
+        target_df = target_df.loc[target_df["구분"]=='개별종목']
+        with timer("target_table"):
+            result["targets"] = calc_target_table(target_df, price_panel, state_key).drop(['구분'],axis=1)
+        with timer("allocation"):
+            result["allocation_index"], result["allocation_individual"] = calc_allocation_us(profit_df, remain_cash)
+
+        index_positions = profit_df.loc[profit_df['구분']=='지수구성']
+        index_eval_begin = (index_positions['평균단가'] * index_positions['보유수량']).sum()
+        index_eval_end = index_positions['현재평가금액'].sum()
+        summary["지수구성평가손익"] = float(index_eval_end - index_eval_begin)
+        summary["지수구성수익률(%)"] = float((index_eval_end - index_eval_begin)/index_eval_begin*100) \
+            if index_eval_begin else None
+
+        if fx_series is not None:
+            # 현재 금액은 최근 환율, 일별 총자산 / 실현손익은 해당일 환율로 환산
+            fx_rate = latest_rate(fx_series)
+            nav_df["총자산(원)"] = nav_df["총자산"] * rates_on(nav_df.index, fx_series)
+            realized_df["실현손익(원)"] = realized_df["실현손익"] * rates_on(realized_df["매도일"], fx_series)
+            summary["환율"] = fx_rate
+            summary["총자산(원)"] = summary["총자산"] * fx_rate
+            summary["실현손익총액(원)"] = float(realized_df["실현손익(원)"].sum())
+    else:
+        target_df = profit_df[['구분1','구분2','티커','종목명','매수일','평가손익','투자수익률(%)']]
+        with timer("target_table"):
+            result["targets"] = calc_target_table(target_df, price_panel, state_key,
+                                                  category_col='구분2').drop(['구분1','구분2'],axis=1)
+        with timer("allocation"):
+            result["allocation"] = calc_allocation_kr(profit_df, remain_cash)
+
+    result["summary"] = summary
+    return result
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    프로세스 전체(모든 Streamlit 세션)가 공유하는 TTL + LRU 캐시.
+    같은 key를 여러 스레드가 동시에 요청하면 계산은 한 번만 하고 나머지는 그 결과를 기다린다.
+    """
+
+    def __init__(self, maxsize=128, ttl=600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # key -> (만료시각, 값)
+        self._inflight = {}  # key -> _Call
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._get(key, default)
+
+    def _get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self.clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """ttl: 이 항목만의 유효시간(초, 기본값은 캐시의 ttl)"""
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def _set(self, key, value, ttl=None):
+        self._data[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        with self._lock:
+            value = self._get(key, missing)
+            if value is not missing:
+                return value
+            call = self._inflight.get(key)
+            owner = call is None
+            if owner:
+                call = self._inflight[key] = _Call()
+
+        if not owner:
+            return call.wait()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            # 실패는 캐시하지 않고, 기다리던 스레드에도 같은 예외를 전달
+            with self._lock:
+                del self._inflight[key]
+            call.set_error(e)
+            raise
+        with self._lock:
+            self._set(key, value)
+            del self._inflight[key]
+        call.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class _Call:
+    def __init__(self):
+        self._event = threading.Event()
+        self._value = None
+        self._error = None
+
+    def set_result(self, value):
+        self._value = value
+        self._event.set()
+
+    def set_error(self, error):
+        self._error = error
+        self._event.set()
+
+    def wait(self):
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
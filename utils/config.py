@@ -1,5 +1,134 @@
+import os
+
 INITIAL_CAPITAL_KR = 800000000  # 8억원
 INITIAL_CAPITAL_US = 147449  # 147,449달러(2억원)
 FEE_RATE_KR = 0.001  # 국내계좌 수수료 0.1%
 FEE_RATE_US = 0.002  # 해외계좌 수수료 0.2%
-EXCHANGE_RATE = 1379.1
\ No newline at end of file
+EXCHANGE_RATE = 1379.1  # 환율 조회 실패 시 사용하는 고정 환율
+FX_SYMBOL = "USD/KRW"  # 일별 환율 심볼 (가격 공급원에서 조회)
+
+# 투자비중 상한 (총자산 대비 %, 구분1 / 구분2 / 티커 어느 수준이든 지정 가능)
+ALLOCATION_LIMITS_KR = {
+    '안전': 100,
+    '위험': 70,
+    'FX 및 원자재': 20,
+    '국내주식_섹터': 15,
+    '국내주식_지수': 30,
+    '국내채권_종합': 50,
+    '국내채권_회사채': 30,
+    '금리연계형/초단기채권': 50,
+    '해외주식_섹터': 10,
+    '해외주식_지수': 30,
+    '해외채권_종합': 50,
+    '해외채권_회사채': 30,
+}
+# 해외계좌 지수구성 종목 목표비율 (총자산 대비 %)
+ALLOCATION_TARGETS_US = {
+    'NVDA': 9.25,
+    'MSFT': 8.86,
+    'AAPL': 7.22,
+    'AMZN': 5.70,
+    'GOOG': 5.20,
+    'META': 4.43,
+    'AVGO': 3.05,
+    'TSLA': 2.51,
+    'JPM': 1.92,
+    'WMT': 1.87,
+}
+
+# 거래로그
+TRADE_DB_PATH = "./data/trading_log.db"  # 거래로그 저장소(SQLite) 경로
+REPORT_DIR = "./data/report"  # 배치 리포트 출력 경로
+
+# 성능 측정
+PROFILING_ENABLED = False  # 디버그 패널 기본값 (사이드바에서 세션별로 켤 수 있음)
+PROFILE_LOG_PATH = "./data/profile_log.jsonl"  # 구간별 시간 / 카운터 기록 (JSON Lines)
+
+# 가격 데이터
+PRICE_SOURCE = os.environ.get("PRICE_SOURCE", "fdr")  # 가격 공급원: "fdr" / "replay" / "synthetic"
+PRICE_REPLAY_DIR = os.environ.get("PRICE_REPLAY_DIR", "./data/price_replay")  # replay 공급원이 읽는 경로
+PRICE_SYNTHETIC_SEED = 0  # synthetic 공급원 시드
+PRICE_CACHE_DIR = "./data/price_cache"  # 종목별 가격 캐시(Parquet) 저장 경로
+PRICE_FETCH_WORKERS = 8  # 동시에 조회할 최대 종목 수
+PRICE_FETCH_TIMEOUT = 20  # 종목별 조회 제한시간(초, 재시도 포함)
+PRICE_FETCH_RETRIES = 2  # 실패 시 재시도 횟수
+PRICE_FETCH_BACKOFF = 0.5  # 재시도 대기시간(초), 시도마다 2배씩 증가
+PRICE_RECHECK_INTERVAL = 3600  # 휴장일 등 마지막 캐시일 이후 봉이 없을 때 같은 구간을 다시 확인하는 간격(초)
+PRICE_MEMORY_CACHE_TTL = 600  # 프로세스 공용 가격 캐시 유효시간(초)
+PRICE_MEMORY_CACHE_SIZE = 512  # 프로세스 공용 가격 캐시 최대 항목 수
+PRICE_FAILED_CACHE_TTL = 120  # 조회 실패 종목이 있는 가격 패널을 보관하는 시간(초), 지나면 실패 종목을 다시 조회
+PRICE_PANEL_DIR = "./data/price_panel"  # 메모리 맵 가격 패널 저장 경로
+PRICE_PANEL_RETENTION = 86400  # 이전 버전 패널 보관 시간(초)
+
+# 가격 미리 받기 (utils/prefetch.py)
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1") == "1"  # 앱 실행 시 백그라운드 스케줄러 시작
+PREFETCH_SCHEDULE = {  # 계좌별 (시간대, 실행 시각) - 평일 장 마감 후
+    "KR": ("Asia/Seoul", "15:45"),  # KRX 15:30 마감
+    "US": ("America/New_York", "16:30"),  # NYSE 16:00 마감
+}
+PREFETCH_UNIVERSE = True  # 보유 종목 외에 투자대상 종목도 미리 받기
+PREFETCH_RETRIES = 3  # 조회 실패 종목이 있으면 다시 시도하는 횟수
+PREFETCH_RETRY_DELAY = 60  # 재시도 대기시간(초), 시도마다 2배씩 증가하고 0.5~1.5배 무작위로 흔듦
+PREFETCH_STARTUP_DELAY = 300  # 놓친 실행을 시작 후 몇 초 뒤에 할지 (첫 화면과 겹치지 않게, 이때는 보유 종목만 받음)
+PREFETCH_STATUS_PATH = "./data/prefetch_status.json"  # 마지막 실행 결과 / 다음 실행 시각
+
+# 기술적 지표
+RSI_WINDOW = 14
+RSI_OVERBOUGHT = 70  # 과매수 기준
+RSI_OVERSOLD = 30  # 과매도 기준
+BB_WINDOW = 20
+BB_WINDOW_DEV = 2
+ADX_WINDOW = 14
+ADX_TREND_THRESHOLD = 20  # 강한추세 기준
+INDICATOR_STATE_DIR = "./data/indicator_state"  # 지표 누적값 저장 경로
+
+# 가격 조회 구간 (utils/fetch_plan.py)
+TARGET_LOOKBACK_BARS = 120  # 목표수익률: 매수일 이전 평균 수익률을 계산하는 봉 수
+
+# 목표수익률 / 손절가 (utils/analysis.py의 calc_targets)
+# 목표수익률 = max(매수일 이전 TARGET_LOOKBACK_BARS봉 평균 일수익률 × 기준 기간 × 배수, 최소값), 손절가 = 목표수익률 × STOP_LOSS_RATIO
+TARGET_HORIZONS = {  # 구분2 -> 기준 기간(거래일), 표에 없는 구분은 목표수익률을 계산하지 않음(NaN)
+    '국내주식_섹터': 30,
+    '해외주식_섹터': 30,
+    '해외주식_지수': 30,
+    '국내주식_지수': 60,
+    'FX 및 원자재': 60,
+    '국내채권_종합': 60,
+    '국내채권_회사채': 60,
+    '해외채권_종합': 60,
+    '해외채권_회사채': 60,
+    '금리연계형/초단기채권': 60,
+}
+TARGET_DEFAULT_HORIZON = 30  # 구분을 쓰지 않는 계좌(해외 개별종목)의 기준 기간
+TARGET_LEVELS = [("80%", 0.8, 0.04), ("120%", 1.2, 0.06)]  # (열 이름, 배수, 최소 목표수익률)
+STOP_LOSS_RATIO = -0.5
+INDICATOR_WARMUP_BARS = 250  # 기술적 지표 워밍업 봉 수 (RSI/ADX 지수평균이 충분히 수렴하는 길이)
+
+# 표 조건부 서식 (pages_module/formats.py의 rule_styles)
+# column 열의 값을 op로 비교해 참이면 color를 칠한다. 같은 칸에는 먼저 나온 규칙이 우선한다.
+# 비교 기준은 value(고정값) 또는 ref(같은 행의 다른 열 값 × scale), op가 없으면 항상 칠한다.
+TARGET_STYLE_RULES_KR = [
+    {"column": "투자수익률(%)", "op": "<=", "ref": "손절가(120%)", "color": "orangered"},
+    {"column": "투자수익률(%)", "op": "<=", "ref": "손절가(80%)", "color": "salmon"},
+    {"column": "투자수익률(%)", "op": ">=", "ref": "목표수익률(120%)", "color": "mediumseagreen"},
+    {"column": "투자수익률(%)", "op": ">=", "ref": "목표수익률(80%)", "color": "lightgreen"},
+    {"column": "RSI신호", "op": "==", "value": "과매수", "color": "lightcoral"},
+    {"column": "RSI신호", "op": "==", "value": "과매도", "color": "lightblue"},
+    {"column": "볼린저밴드", "op": "==", "value": "하단돌파(매수신호)", "color": "lightblue"},
+    {"column": "볼린저밴드", "op": "==", "value": "상단돌파(매도경고)", "color": "lightcoral"},
+    {"column": "ADX신호", "op": "==", "value": "강한추세", "color": "lightgreen"},
+]
+TARGET_STYLE_RULES_US = [
+    {"column": "투자수익률(%)", "op": "<=", "ref": "손절가(80%)", "color": "salmon"},
+    {"column": "투자수익률(%)", "op": "<=", "ref": "손절가(120%)", "color": "lightcoral"},
+    *TARGET_STYLE_RULES_KR[2:],
+]
+ALLOCATION_STYLE_RULES = [
+    {"column": "투자비중", "op": ">=", "ref": "상한", "scale": 0.8, "color": "salmon"},  # 상한의 80% 이상
+    {"column": "상한", "color": "#f0f0f0"},
+]
+TABLE_PAGE_SIZE = 200  # 이보다 행이 많은 표는 페이지로 나눠 표시
+TRADE_CHECK_STYLE_RULES = [
+    {"column": "투자비중", "op": ">", "ref": "상한", "color": "orangered"},  # 거래 후 상한 초과
+    *ALLOCATION_STYLE_RULES,
+]
@@ -1,74 +1,106 @@
 import pandas as pd
-import os
 import streamlit as st
-from datetime import date, datetime
-import FinanceDataReader as fdr
+from datetime import datetime
+from functools import lru_cache
 
+from utils.config import EXCHANGE_RATE
+from utils.prices import load_account_prices
+from utils.fx import load_fx_series
+from utils.ledger import PositionLedger
+from utils.trade_store import TradeStore
+from utils.universe import InstrumentIndex
+
+@lru_cache(maxsize=None)
 def load_etf_data():
+    # 투자대상 목록은 바뀌지 않으므로 프로세스당 한 번만 읽는다 (반환값은 공유되므로 수정하지 말 것)
     return pd.read_csv('./data/국내계좌_투자대상_ETF.csv')
 
+@lru_cache(maxsize=None)
 def load_spx_data():
     df = pd.read_csv('./data/해외계좌_투자대상_개별종목.csv', encoding='cp949')
-    df['티커'] = df['티커'].apply(lambda x: x.split()[0])
+    df['티커'] = df['티커'].str.split().str[0]
     return df
 
-def get_price(market: str = "KR"):
+@lru_cache(maxsize=None)
+def etf_index():
+    """국내 ETF 검색 인덱스 (티커는 'A'를 뗀 6자리)"""
+    return InstrumentIndex(load_etf_data(), "티커", "ETF명", ticker_prefix="A")
+
+@lru_cache(maxsize=None)
+def spx_index():
+    """해외 개별종목 검색 인덱스"""
+    return InstrumentIndex(load_spx_data(), "티커", "이름")
+
+def get_price(market: str = "KR", trading_log=None):
     """
     market: "KR" 또는 "US"
+    trading_log: 생략하면 세션의 거래로그를 사용
+    반환: 거래로그에 있는 모든 티커의 PricePanel (날짜 × 티커)
     """
-    if market == "KR":
-        df = st.session_state.trading_log
-    elif market == "US":
-        df = st.session_state.trading_log_us
-    else:
+    if market not in ("KR", "US"):
         raise ValueError("market은 'KR' 또는 'US' 중 하나여야 합니다.")
+    if trading_log is None:
+        trading_log = st.session_state.trading_log if market == "KR" else st.session_state.trading_log_us
+
+    # 실패 종목은 잠시 캐시되므로 바로 다시 받으려면 버튼으로 요청한다
+    refresh_key = f"refresh_price_{market.lower()}"
+    price_panel, failed = load_account_prices(trading_log, refresh=st.session_state.pop(refresh_key, False))
 
-    tickers = df["티커"].astype(str).unique()
-    start_date = date(2025, 1, 1)
-    end_date = datetime.today().date()
-    price_dict = {}
+    if failed:
+        st.warning(f"{len(failed)}개 종목의 가격 데이터를 불러오는 데 실패했습니다: {', '.join(failed)}")
+        st.button("가격 다시 받기", key=f"{refresh_key}_button",
+                  on_click=lambda: st.session_state.update({refresh_key: True}))
 
-    for symbol in tickers:
-        try:
-            data = fdr.DataReader(symbol, start=start_date.isoformat(), end=end_date.isoformat())
-            price_dict[symbol] = data
-        except:
-            st.warning(f"{symbol} 가격 데이터를 불러오는 데 실패했습니다.")
-            price_dict[symbol] = None
+    # 입력 페이지의 거래 전 / 후 투자비중 계산에 재사용
+    st.session_state[f"last_close_{market.lower()}"] = price_panel.last_close()
+    return price_panel
 
-    return price_dict
+def get_last_close(market="KR"):
+    """세션에 저장된 티커별 마지막 종가 (분석 페이지에서 불러온 가격, 없으면 세션에서 한 번만 조회)"""
+    key = f"last_close_{market.lower()}"
+    if key not in st.session_state:
+        get_price(market)
+    return st.session_state[key]
+
+def get_fx_series(trading_log=None):
+    """
+    해외 거래로그 첫 거래일부터 오늘까지의 일별 원/달러 환율 (가격과 같은 캐시 사용)
+    조회에 실패하면 빈 Series를 반환하고, 환산 시 고정 환율(EXCHANGE_RATE)을 쓴다.
+    """
+    if trading_log is None:
+        trading_log = st.session_state.trading_log_us
+    today = datetime.today()
+    start = trading_log["거래일"].min() if not trading_log.empty else today
+
+    fx_series, error = load_fx_series(start, today)
+
+    if error is not None:
+        st.warning(f"환율 데이터를 불러오지 못해 고정 환율({EXCHANGE_RATE:,.1f}원/$)을 사용합니다: {error}")
+
+    return fx_series
+
+def _warn_kept_changes(label, pending):
+    # CSV를 다시 가져오면서 내보내지 않은 로컬 추가/삭제를 유지한 경우 알림
+    if pending and any(pending.values()):
+        st.warning(f"{label} 거래로그 CSV가 바뀌어 다시 가져왔습니다. 아직 내보내지 않은 변경"
+                   f"(추가 {pending['추가']}건, 삭제 {pending['삭제']}건)은 유지했으니 'CSV로 내보내기'로 저장하세요.")
 
 def load_trading_log():
-    # 국내 거래 로그 로드
+    # 거래로그 저장소 (CSV가 바뀐 경우에만 다시 가져옴)
+    if "trade_store" not in st.session_state:
+        st.session_state.trade_store = TradeStore()
+    store = st.session_state.trade_store
+
+    # 국내 / 해외 거래 로그 로드 (index: 저장소 id, 거래일은 저장소에서 읽을 때 한 번만 변환)
     if "trading_log" not in st.session_state:
-        path_kr = "./data/trading_log.csv"
-        if os.path.exists(path_kr):
-            st.session_state.trading_log = pd.read_csv(
-                path_kr,
-                dtype={"티커": str},
-                parse_dates=["거래일"]
-            )
-        else:
-            st.session_state.trading_log = pd.DataFrame(columns=[
-                "구분1", "구분2", "티커", "종목명", "거래일", "거래유형", "거래수량", "평균단가", "금액"
-            ])
-    st.session_state.trading_log["거래일"] = pd.to_datetime(
-        st.session_state.trading_log["거래일"], format="mixed"
-    )
-
-    # 해외 거래 로그 로드
+        _warn_kept_changes("국내", store.sync_csv("KR"))
+        st.session_state.trading_log = store.load("KR")
     if "trading_log_us" not in st.session_state:
-        path_us = "./data/trading_log_us.csv"
-        if os.path.exists(path_us):
-            st.session_state.trading_log_us = pd.read_csv(
-                path_us,
-                dtype={"티커": str},
-                parse_dates=["거래일"]
-            )
-        else:
-            st.session_state.trading_log_us = pd.DataFrame(columns=[
-                "티커", "이름", "거래일", "거래유형", "구분", "거래수량", "평균단가", "금액"
-            ])
-    st.session_state.trading_log_us["거래일"] = pd.to_datetime(
-        st.session_state.trading_log_us["거래일"], format="mixed"
-    )
\ No newline at end of file
+        _warn_kept_changes("해외", store.sync_csv("US"))
+        st.session_state.trading_log_us = store.load("US")
+
+    # 보유 현황 장부 (거래 추가/삭제 시 입력 페이지에서 갱신)
+    if "ledger_kr" not in st.session_state:
+        st.session_state.ledger_kr = PositionLedger(st.session_state.trading_log, US=False)
+    if "ledger_us" not in st.session_state:
+        st.session_state.ledger_us = PositionLedger(st.session_state.trading_log_us, US=True)
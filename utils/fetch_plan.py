@@ -0,0 +1,50 @@
+import pandas as pd
+
+from utils.config import TARGET_LOOKBACK_BARS, INDICATOR_WARMUP_BARS
+
+# ---------------------------
+# 가격 조회 계획
+# 고정 시작일부터 모든 티커를 받는 대신, 티커마다 실제로 쓰이는 구간만 정한다.
+#   - 보유 중: 평가(최근 종가), 목표수익률(매수일 이전 TARGET_LOOKBACK_BARS봉), 지표 워밍업(INDICATOR_WARMUP_BARS봉)
+#   - 일별 총자산(history=True): 첫 거래일부터 보유 중이면 오늘까지, 청산했으면 마지막 거래일까지
+#   - 청산 종목의 실현손익은 가격이 필요 없으므로 history=False이면 조회하지 않는다
+
+def _bars_before(date, bars):
+    # 휴장일을 감안해 영업일 기준 10% + 5일 여유를 둔다
+    return (pd.Timestamp(date) - pd.offsets.BDay(int(bars * 1.1) + 5)).normalize()
+
+def plan_price_windows(trading_log, today, history=True):
+    """반환: {티커: (start, end)} - 가격이 필요 없는 티커는 포함하지 않는다."""
+    today = pd.Timestamp(today).normalize()
+    if trading_log.empty:
+        return {}
+
+    tickers = trading_log["티커"].astype(str)
+    signed_qty = trading_log["거래수량"].where(trading_log["거래유형"] == "매수", -trading_log["거래수량"])
+    net_quantity = signed_qty.groupby(tickers).sum()
+    trade_dates = trading_log["거래일"].dt.normalize().groupby(tickers)
+    first_date, last_date = trade_dates.min(), trade_dates.max()
+
+    windows = {}
+    for ticker, quantity in net_quantity.items():
+        starts, ends = [], []
+        if quantity > 0:
+            # 보유 종목의 매수일은 첫 거래일 이후이므로 첫 거래일 기준 lookback이면 충분하다
+            starts += [_bars_before(first_date[ticker], TARGET_LOOKBACK_BARS + 1),
+                       _bars_before(today, INDICATOR_WARMUP_BARS)]
+            ends.append(today)
+        if history:
+            starts.append(first_date[ticker])
+            ends.append(today if quantity > 0 else last_date[ticker])
+        if starts:
+            windows[ticker] = (min(starts), max(ends))
+    return windows
+
+def plan_universe_windows(tickers, today, exclude=()):
+    """
+    투자대상 종목의 구간: 오늘 새로 매수해도 목표수익률 / 지표 계산에 충분한 봉 수부터 오늘까지.
+    exclude(이미 계획된 보유 종목 등)는 제외한다.
+    """
+    today = pd.Timestamp(today).normalize()
+    start = _bars_before(today, max(TARGET_LOOKBACK_BARS + 1, INDICATOR_WARMUP_BARS))
+    return {str(ticker): (start, today) for ticker in tickers if str(ticker) not in exclude}
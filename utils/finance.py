@@ -1,239 +1,303 @@
+import numpy as np
 import pandas as pd
+from collections import deque
+from utils.profiling import count
 from utils.config import INITIAL_CAPITAL_KR, INITIAL_CAPITAL_US, FEE_RATE_KR, FEE_RATE_US
 
-def get_remaining_cash(trading_log, US=False):
+def calc_cash_series(trading_log, US=False):
+    """
+    거래일별 현금 잔고 (index: 거래일).
+    매수는 -(금액 + 수수료), 매도는 +(금액 - 수수료)로 부호를 붙여 일별로 합산한 뒤 누적한다.
+    """
     cash = INITIAL_CAPITAL_KR
     fee_rate = FEE_RATE_KR
     if US:
         cash = INITIAL_CAPITAL_US
         fee_rate = FEE_RATE_US
-    for _, row in trading_log.iterrows():
-        fee = int(row["금액"] * fee_rate)
-        if row["거래유형"] == "매수":
-            cash -= (row["금액"] + fee)
-        elif row["거래유형"] == "매도":
-            cash += (row["금액"] - fee)
-    return cash
-
-def calc_profit_kr(trading_log, price_dict, apply_fee):
-    fee_rate = FEE_RATE_KR
+
+    amount = trading_log["금액"]
+    fee = (amount * fee_rate).astype("int64")  # int() 절사와 동일 (금액은 양수)
+    flow = np.select(
+        [trading_log["거래유형"] == "매수", trading_log["거래유형"] == "매도"],
+        [-(amount + fee), amount - fee],
+        0,
+    )
+    daily_flow = pd.Series(flow, index=trading_log.index).groupby(trading_log["거래일"].dt.normalize()).sum()
+    return cash + daily_flow.sort_index().cumsum()
+
+def trade_cash_flow(trade_type, amount, US=False):
+    """거래 한 건의 현금 변화 (calc_cash_series와 같은 규칙)"""
+    fee = int(amount * (FEE_RATE_US if US else FEE_RATE_KR))
+    return -(amount + fee) if trade_type == "매수" else amount - fee
+
+def get_remaining_cash(trading_log, US=False, cash_series=None):
+    if cash_series is None:
+        cash_series = calc_cash_series(trading_log, US)
+    if cash_series.empty:
+        return INITIAL_CAPITAL_US if US else INITIAL_CAPITAL_KR
+    return cash_series.iloc[-1]
+
+# ---------------------------
+# 일별 총자산(NAV) 추이
+# 거래로그를 날짜 × 티커 보유수량으로 펼친 뒤 같은 모양의 종가 패널과 곱하고 현금 잔고를 더한다.
+
+def _align_to(series_or_frame, dates):
+    # 거래일(휴장일 포함 가능) 기준 누적값을 가격 날짜에 맞춰 직전 값으로 채운다
+    union = series_or_frame.index.union(dates)
+    return series_or_frame.reindex(union).ffill().reindex(dates)
+
+def calc_position_panel(trading_log, dates):
+    """날짜(dates) × 티커 보유수량. 각 날짜 종가 기준으로 그날까지의 거래를 모두 반영한다."""
+    quantity = trading_log["거래수량"]
+    signed_qty = np.select(
+        [trading_log["거래유형"] == "매수", trading_log["거래유형"] == "매도"], [quantity, -quantity], 0)
+    daily = (pd.Series(signed_qty, index=trading_log.index)
+             .groupby([trading_log["거래일"].dt.normalize(), trading_log["티커"]]).sum()
+             .unstack(fill_value=0)
+             .sort_index())
+    return _align_to(daily.cumsum(), dates).fillna(0)
+
+def calc_nav(trading_log, close_panel, US=False, cash_series=None):
+    """
+    close_panel: 날짜 × 티커 종가
+    반환: 첫 거래일 이후 날짜별 보유평가금액 / 현금 / 총자산 / 수익률(%) (초기자본 대비)
+    """
+    initial = INITIAL_CAPITAL_US if US else INITIAL_CAPITAL_KR
+    if not trading_log.empty:  # 첫 거래일부터
+        close_panel = close_panel.loc[close_panel.index >= trading_log["거래일"].min().normalize()]
+    dates = close_panel.index
+    if cash_series is None:
+        cash_series = calc_cash_series(trading_log, US)
+
+    quantity = calc_position_panel(trading_log, dates).reindex(columns=close_panel.columns, fill_value=0)
+    prices = close_panel.ffill().fillna(0)  # 휴장 등으로 빈 날은 직전 종가
+    holdings = (quantity.to_numpy(dtype=np.float64) * prices.to_numpy(dtype=np.float64)).sum(axis=1)
+    cash = _align_to(cash_series, dates).fillna(initial).to_numpy(dtype=np.float64)
+
+    nav = pd.DataFrame({"보유평가금액": holdings, "현금": cash}, index=dates)
+    nav["총자산"] = nav["보유평가금액"] + nav["현금"]
+    nav["수익률(%)"] = (nav["총자산"] / initial - 1) * 100
+    return nav
+
+# ---------------------------
+# FIFO 매수/매도 매칭 엔진
+# 거래로그를 거래일 순으로 한 번만 훑으면서 종목별 보유 lot(deque)과 매도별 실현 내역을 만든다.
+# calc_profit_kr / calc_profit_us / calc_realized_profit은 이 결과를 보여주는 방식만 다르다.
+
+class LotBook:
+    def __init__(self, fee_rate, key_cols, meta_cols):
+        self.fee_rate = fee_rate
+        self.key_cols = key_cols
+        self.meta_cols = meta_cols
+        self.lots = {}  # key -> deque([수량, 금액, 수수료 포함 금액, 매수일])
+        self.buy_date = {}  # key -> 현재 포지션에 해당하는 매수일
+        self.meta = {}  # key -> 마지막 거래의 구분/종목명 등
+        self.last_date = {}  # key -> 마지막으로 반영한 거래일
+        self.realized = {}  # key -> 매도 거래별 매칭 결과
+
+    def key_of(self, trade):
+        if len(self.key_cols) == 1:
+            return trade[self.key_cols[0]]
+        return tuple(trade[col] for col in self.key_cols)
+
+    def apply_trade(self, trade):
+        # trade: 거래로그 한 행에 해당하는 dict
+        self.apply(self.key_of(trade), trade["거래유형"], trade["거래일"], trade["거래수량"], trade["금액"],
+                   tuple(trade[col] for col in self.meta_cols))
+
+    def apply_log(self, trading_log):
+        log = trading_log.sort_values("거래일", kind="stable")
+        count("lots.trades", len(log))
+
+        if len(self.key_cols) == 1:
+            keys = log[self.key_cols[0]].tolist()
+        else:
+            keys = list(zip(*(log[col].tolist() for col in self.key_cols)))
+        metas = list(zip(*(log[col].tolist() for col in self.meta_cols)))
+
+        for key, trade_type, trade_date, quantity, amount, meta in zip(
+            keys, log["거래유형"].tolist(), log["거래일"].tolist(),
+            log["거래수량"].tolist(), log["금액"].tolist(), metas
+        ):
+            self.apply(key, trade_type, trade_date, quantity, amount, meta)
+
+    def reset(self, keys):
+        for key in keys:
+            for table in (self.lots, self.buy_date, self.meta, self.last_date, self.realized):
+                table.pop(key, None)
+
+    def apply(self, key, trade_type, trade_date, quantity, amount, meta):
+        self.meta[key] = meta
+        self.last_date[key] = trade_date
+        position = self.lots.setdefault(key, deque())
+
+        if trade_type == "매수":
+            fee = int(amount * self.fee_rate)
+            if not position:  # 새롭게 포지션 시작
+                self.buy_date[key] = trade_date
+            position.append([quantity, amount, amount + fee, trade_date])
+
+        elif trade_type == "매도":
+            sell_qty = quantity
+            realized_cost = 0
+            realized_cost_fee = 0
+            matched_qty = 0
+            matched_buy_date = None
+
+            while sell_qty > 0 and position:
+                lot = position[0]
+                qty, amt, amt_fee, b_date = lot
+                if qty > sell_qty:
+                    portion = sell_qty / qty
+                    realized_cost += amt * portion
+                    realized_cost_fee += amt_fee * portion
+                    lot[0] -= sell_qty
+                    lot[1] -= amt * portion
+                    lot[2] -= amt_fee * portion
+                    matched_qty += sell_qty
+                    matched_buy_date = b_date
+                    sell_qty = 0
+                else:
+                    realized_cost += amt
+                    realized_cost_fee += amt_fee
+                    matched_qty += qty
+                    matched_buy_date = b_date
+                    sell_qty -= qty
+                    position.popleft()
+
+            if not position:
+                self.buy_date[key] = None  # 포지션 청산 → 다음 매수에서 다시 설정
+
+            if matched_qty > 0:
+                self.realized.setdefault(key, []).append({
+                    "key": key,
+                    "buy_date": matched_buy_date,
+                    "sell_date": trade_date,
+                    "quantity": matched_qty,
+                    "cost": realized_cost,
+                    "cost_fee": realized_cost_fee,
+                    "sell_amount": amount - int(amount * self.fee_rate),
+                })
+
+    def open_positions(self):
+        # (key, 보유수량, 매수금액, 수수료 포함 매수금액) - key 순서대로
+        for key in sorted(self.lots):
+            position = self.lots[key]
+            remaining_quantity = sum(lot[0] for lot in position)
+            if remaining_quantity == 0:
+                continue
+            total_cost = sum(lot[1] for lot in position)
+            total_cost_fee = sum(lot[2] for lot in position)
+            yield key, remaining_quantity, total_cost, total_cost_fee
+
+    def realized_matches(self):
+        # groupby와 같은 순서(key 순, 같은 key 안에서는 매도일 순)
+        return [match for key in sorted(self.realized) for match in self.realized[key]]
+
+def match_lots(trading_log, fee_rate, key_cols, meta_cols):
+    book = LotBook(fee_rate, key_cols, meta_cols)
+    book.apply_log(trading_log)
+    return book
+
+def match_lots_kr(trading_log):
+    return match_lots(trading_log, FEE_RATE_KR, ["티커"], ["구분1", "구분2", "종목명"])
+
+def match_lots_us(trading_log, by_category=True):
+    # 평가손익은 (구분, 티커)별로, 실현손익은 티커별로 매칭한다
+    key_cols = ["구분", "티커"] if by_category else ["티커"]
+    return match_lots(trading_log, FEE_RATE_US, key_cols, ["구분", "이름"])
+
+# 금액 컬럼은 숫자(float64)로 반환하고, 천 단위 구분 등 표시 형식은 화면(column_config)에서 지정한다.
+PROFIT_COLUMNS_KR = ["구분1", "구분2", "티커", "종목명", "매수일", "평균단가", "현재가",
+                     "평가손익", "투자수익률(%)", "보유수량", "현재평가금액"]
+PROFIT_COLUMNS_US = ["구분", "티커", "이름", "매수일", "평균단가", "현재가",
+                     "평가손익", "투자수익률(%)", "보유수량", "현재평가금액"]
+REALIZED_COLUMNS_KR = ["구분1", "구분2", "티커", "종목명", "매수일", "매도일",
+                       "매수단가", "매도단가", "실현손익", "수익률(%)"]
+REALIZED_COLUMNS_US = ["구분", "티커", "이름", "매수일", "매도일",
+                       "매수단가", "매도단가", "실현손익", "수익률(%)"]
+
+def _profit_row(end_price, remaining_quantity, total_cost, total_cost_fee, apply_fee, fee_rate):
+    average_price = total_cost / remaining_quantity
+
+    eval_value = float(end_price) * remaining_quantity
+    profit = eval_value - total_cost
+    total_return = profit / total_cost if total_cost else 0
+    if apply_fee:
+        profit = eval_value - total_cost_fee - int(eval_value * fee_rate)
+        total_return = profit / total_cost_fee if total_cost_fee else 0
+
+    return {
+        "평균단가": float(average_price),
+        "현재가": float(end_price),
+        "평가손익": float(profit),
+        "투자수익률(%)": round(total_return * 100, 2),
+        "보유수량": int(remaining_quantity),
+        "현재평가금액": eval_value,
+    }
+
+def calc_profit_kr(trading_log, last_close, apply_fee, book=None):
+    # last_close: 티커별 마지막 종가 (PricePanel.last_close())
+    if book is None:
+        book = match_lots_kr(trading_log)
 
     result = []
-    grouped = trading_log.sort_values("거래일").groupby("티커")
-
-    for ticker, group in grouped:
-        position = []  # 보유 중인 매수 거래들
-        buy_date = None  # 현재 포지션에 해당하는 매수일
-        end_price = price_dict[ticker]["Close"].iloc[-1]
-
-        for _, row in group.iterrows():
-            if row["거래유형"] == "매수":
-                cost = row["금액"]
-                fee = int(row["금액"] * fee_rate)
-                cost_fee = row["금액"] + fee
-
-                if not position:  # 새롭게 포지션 시작
-                    buy_date = row["거래일"]
-
-                position.append([row["거래수량"], cost, cost_fee])
-
-            elif row["거래유형"] == "매도":
-                sell_qty = row["거래수량"]
-                while sell_qty > 0 and position:
-                    qty, amt, amt_fee = position[0]
-                    if qty > sell_qty:
-                        portion = sell_qty / qty
-                        position[0][0] -= sell_qty
-                        position[0][1] -= amt * portion
-                        position[0][2] -= amt_fee * portion
-                        sell_qty = 0
-                    else:
-                        sell_qty -= qty
-                        position.pop(0)
-
-                if not position:
-                    buy_date = None  # 포지션 청산 → 다음 매수에서 다시 설정
-
-        remaining_quantity = sum(q for q, _, __ in position)
-        if remaining_quantity == 0:
-            continue
-
-        total_cost = sum(amt for _, amt, __ in position)
-        total_cost_fee = sum(amt_fee for _, __, amt_fee in position)
-        average_price = total_cost / remaining_quantity
-
-        eval_value = end_price * remaining_quantity        
-        profit = eval_value - total_cost
-        total_return = profit / total_cost if total_cost else 0
-        if apply_fee:    
-            profit = eval_value - total_cost_fee - int(eval_value * fee_rate)
-            total_return = profit / total_cost_fee if total_cost_fee else 0
+    for ticker, remaining_quantity, total_cost, total_cost_fee in book.open_positions():
+        cat1, cat2, name = book.meta[ticker]
+        buy_date = book.buy_date.get(ticker)
+        end_price = last_close[ticker]
 
         result.append({
-            '구분1': group["구분1"].iloc[-1],
-            '구분2': group["구분2"].iloc[-1],
+            '구분1': cat1,
+            '구분2': cat2,
             "티커": ticker,
-            "종목명": group["종목명"].iloc[-1],
+            "종목명": name,
             "매수일": buy_date.strftime("%Y-%m-%d") if buy_date else None,
-            "평균단가": f'{int(average_price):,}',
-            "현재가": f'{int(end_price):,}',
-            "평가손익": f"{int(profit):,}",
-            "투자수익률(%)": round(total_return * 100, 2),
-            "보유수량": int(remaining_quantity),
-            "현재평가금액": f"{int(eval_value):,}"
+            **_profit_row(end_price, remaining_quantity, total_cost, total_cost_fee, apply_fee, FEE_RATE_KR),
         })
 
-    return pd.DataFrame(result)
+    return pd.DataFrame(result, columns=PROFIT_COLUMNS_KR)
+
+def calc_profit_us(trading_log, last_close, apply_fee, book=None):
+    # last_close: 티커별 마지막 종가 (PricePanel.last_close())
+    if book is None:
+        book = match_lots_us(trading_log, by_category=True)
 
-def calc_profit_us(trading_log, price_dict, apply_fee):
-    fee_rate = FEE_RATE_US
     result = []
-    grouped = trading_log.sort_values("거래일").groupby(['구분',"티커"])
-
-    for ticker, group in grouped:
-        ticker = ticker[1]
-        position = []  # 보유 중인 매수 거래들
-        buy_date = None  # 현재 포지션에 해당하는 매수일
-        end_price = price_dict[ticker]["Close"].iloc[-1]
-
-        for _, row in group.iterrows():
-            if row["거래유형"] == "매수":
-                cost = row["금액"]
-                fee = int(row["금액"] * fee_rate)
-                cost_fee = row["금액"] + fee
-
-                if not position:  # 새롭게 포지션 시작
-                    buy_date = row["거래일"]
-
-                position.append([row["거래수량"], cost, cost_fee])
-
-            elif row["거래유형"] == "매도":
-                sell_qty = row["거래수량"]
-                while sell_qty > 0 and position:
-                    qty, amt, amt_fee = position[0]
-                    if qty > sell_qty:
-                        portion = sell_qty / qty
-                        position[0][0] -= sell_qty
-                        position[0][1] -= amt * portion
-                        position[0][2] -= amt_fee * portion
-                        sell_qty = 0
-                    else:
-                        sell_qty -= qty
-                        position.pop(0)
-
-                if not position:
-                    buy_date = None  # 포지션 청산 → 다음 매수에서 다시 설정
-
-        remaining_quantity = sum(q for q, _, __ in position)
-        if remaining_quantity == 0:
-            continue
-
-        total_cost = sum(amt for _, amt, __ in position)
-        total_cost_fee = sum(amt_fee for _, __, amt_fee in position)
-        average_price = total_cost / remaining_quantity
-
-        eval_value = end_price * remaining_quantity        
-        profit = eval_value - total_cost
-        total_return = profit / total_cost if total_cost else 0
-        if apply_fee:    
-            profit = eval_value - total_cost_fee - int(eval_value * fee_rate)
-            total_return = profit / total_cost_fee if total_cost_fee else 0
+    for key, remaining_quantity, total_cost, total_cost_fee in book.open_positions():
+        ticker = key[1]
+        category, name = book.meta[key]
+        buy_date = book.buy_date.get(key)
+        end_price = last_close[ticker]
 
         result.append({
-            '구분': group["구분"].iloc[-1],
+            '구분': category,
             "티커": ticker,
-            "이름": group["이름"].iloc[-1],
+            "이름": name,
             "매수일": buy_date.strftime("%Y-%m-%d") if buy_date else None,
-            "평균단가": f'{average_price:,.2f}',
-            "현재가": f'{end_price:,.2f}',
-            "평가손익": f"{profit:,.2f}",
-            "투자수익률(%)": round(total_return * 100, 2),
-            "보유수량": int(remaining_quantity),
-            "현재평가금액": f"{eval_value:,.2f}"
+            **_profit_row(end_price, remaining_quantity, total_cost, total_cost_fee, apply_fee, FEE_RATE_US),
         })
 
-    return pd.DataFrame(result)
-
-def calc_realized_profit(trading_log, US=False):
-    result = []
-    total_realized_profit = 0
-    grouped = trading_log.sort_values("거래일").groupby("티커")
-    fee_rate = FEE_RATE_KR
-    if US:
-        fee_rate = FEE_RATE_US
-
-    for ticker, group in grouped:
-        position = []
-
-        for _, row in group.iterrows():
-            if row["거래유형"] == "매수":
-                cost = row["금액"]
-                fee = int(cost * fee_rate)
-                total_cost = cost + fee
-                position.append([row["거래수량"], cost, total_cost, row["거래일"]])
-
-            elif row["거래유형"] == "매도":
-                sell_qty = row["거래수량"]
-                sell_date = row["거래일"]
-                total_sell = row["금액"] - int(row["금액"] * fee_rate)
-
-                realized_cost = 0
-                realized_cost_fee = 0
-                matched_qty = 0
-                matched_buy_date = None
-
-                while sell_qty > 0 and position:
-                    qty, amt, amt_fee, b_date = position[0]
-                    if qty > sell_qty:
-                        portion = sell_qty / qty
-                        realized_cost += amt * portion
-                        realized_cost_fee += amt_fee * portion
-                        position[0][0] -= sell_qty
-                        position[0][1] -= amt * portion
-                        position[0][2] -= amt_fee * portion
-                        matched_qty += sell_qty
-                        matched_buy_date = b_date
-                        sell_qty = 0
-                    else:
-                        realized_cost += amt
-                        realized_cost_fee += amt_fee
-                        matched_qty += qty
-                        matched_buy_date = b_date
-                        sell_qty -= qty
-                        position.pop(0)
-
-                if matched_qty > 0:
-                    buy_unit_price = realized_cost / matched_qty if matched_qty else 0
-                    sell_unit_price = total_sell / matched_qty if matched_qty else 0
-                    profit = total_sell - realized_cost_fee
-                    return_pct = profit / realized_cost_fee *100
-                    total_realized_profit += profit
-
-                    if US:
-                        result.append({
-                        '구분': group["구분"].iloc[-1],
-                        "티커": ticker,
-                        "이름": group["이름"].iloc[-1],
-                        "매수일": matched_buy_date.strftime("%Y-%m-%d") if matched_buy_date else None,
-                        "매도일": sell_date.strftime("%Y-%m-%d") if sell_date else None,
-                        "매수단가": f'{round(buy_unit_price,2):,}',
-                        "매도단가": f'{round(sell_unit_price,2):,}',
-                        "실현손익": f"{round(profit,2):,}",
-                        "수익률(%)": return_pct
-                        })
-                    else:
-                        result.append({
-                            '구분1': group["구분1"].iloc[-1],
-                            '구분2': group["구분2"].iloc[-1],
-                            "티커": ticker,
-                            "종목명": group["종목명"].iloc[-1],
-                            "매수일": matched_buy_date.strftime("%Y-%m-%d") if matched_buy_date else None,
-                            "매도일": sell_date.strftime("%Y-%m-%d") if sell_date else None,
-                            "매수단가": f'{int(buy_unit_price):,}',
-                            "매도단가": f'{int(sell_unit_price):,}',
-                            "실현손익": f"{int(profit):,}",
-                            "수익률(%)": return_pct
-                        })
-
-    return pd.DataFrame(result), int(total_realized_profit)
-    
\ No newline at end of file
+    return pd.DataFrame(result, columns=PROFIT_COLUMNS_US)
+
+def calc_realized_profit(trading_log, US=False, book=None):
+    if book is None:
+        book = match_lots_us(trading_log, by_category=False) if US else match_lots_kr(trading_log)
+
+    matches = pd.DataFrame(book.realized_matches(),
+                           columns=["key", "buy_date", "sell_date", "quantity", "cost", "cost_fee", "sell_amount"])
+    meta = pd.DataFrame([book.meta[key] for key in matches["key"]], columns=book.meta_cols, dtype=object)
+
+    profit = matches["sell_amount"] - matches["cost_fee"]
+    result = pd.DataFrame({
+        **{col: meta[col].to_numpy() for col in book.meta_cols},
+        "티커": matches["key"].to_numpy(),
+        "매수일": pd.to_datetime(matches["buy_date"]).dt.strftime("%Y-%m-%d"),
+        "매도일": pd.to_datetime(matches["sell_date"]).dt.strftime("%Y-%m-%d"),
+        "매수단가": (matches["cost"] / matches["quantity"]).astype("float64"),
+        "매도단가": (matches["sell_amount"] / matches["quantity"]).astype("float64"),
+        "실현손익": profit.astype("float64"),
+        "수익률(%)": (profit / matches["cost_fee"] * 100).astype("float64"),
+    })
+    columns = REALIZED_COLUMNS_US if US else REALIZED_COLUMNS_KR
+    return result[columns], int(profit.sum())
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from utils.config import EXCHANGE_RATE, FX_SYMBOL
+from utils.prices import cached_fetch_price
+from utils.profiling import count
+
+# ---------------------------
+# 일별 원/달러 환율
+# 종목 가격과 같은 경로(공용 메모리 캐시 → 디스크 캐시 → 가격 공급원)로 조회하고,
+# 조회에 실패하거나 해당 날짜 이전 환율이 없으면 고정 환율(EXCHANGE_RATE)을 쓴다.
+
+def load_fx_series(start, end, refresh=False):
+    """[start, end] 일별 환율 종가 (index: 날짜). 반환: (series, error) - 실패 시 빈 Series와 예외"""
+    try:
+        data = cached_fetch_price(FX_SYMBOL, start, end, refresh=refresh)
+    except Exception as e:
+        count("fx.failed")
+        return pd.Series(dtype="float64"), e
+    return data["Close"].astype("float64").dropna(), None
+
+def rates_on(dates, fx_series):
+    """dates 각각에 적용할 환율 (그날 또는 직전 환율, 그 이전이면 첫 환율, 환율이 없으면 EXCHANGE_RATE)"""
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+    if fx_series.empty:
+        return np.full(len(dates), EXCHANGE_RATE, dtype="float64")
+    positions = fx_series.index.searchsorted(dates, side="right") - 1
+    return fx_series.to_numpy()[np.clip(positions, 0, len(fx_series) - 1)]
+
+def latest_rate(fx_series):
+    return float(fx_series.iloc[-1]) if not fx_series.empty else EXCHANGE_RATE
+
+def to_krw(amounts, dates, fx_series):
+    """달러 금액(배열/Series)을 같은 길이의 dates 기준 환율로 원화 환산"""
+    return np.asarray(amounts, dtype="float64") * rates_on(dates, fx_series)
@@ -0,0 +1,258 @@
+import os
+import numpy as np
+import pandas as pd
+
+from utils.profiling import count
+from utils.config import (INDICATOR_STATE_DIR, RSI_WINDOW, RSI_OVERBOUGHT, RSI_OVERSOLD, BB_WINDOW, BB_WINDOW_DEV,
+                          ADX_WINDOW, ADX_TREND_THRESHOLD)
+
+# ---------------------------
+# 기술적 지표 일괄 계산
+# 날짜 × 종목 패널을 날짜 순으로 한 줄씩 훑으면서 모든 종목의 RSI / 볼린저밴드 / ADX를 동시에 갱신한다.
+# 계산식은 ta 라이브러리(RSIIndicator, BollingerBands, ADXIndicator)와 같다.
+
+class IndicatorState:
+    """
+    종목별 지표 누적값. update()는 종목 수에 비례하는 고정 비용으로 하루치 봉을 반영한다.
+    save() / load()로 디스크에 보관해 두면 다음 실행에서는 이후에 생긴 봉만 반영하면 된다.
+    """
+
+    # 종목별 배열 (window_close만 bb_window × 종목 수)
+    ARRAYS = ["count", "prev_close", "prev_high", "prev_low", "last_close", "avg_gain", "avg_loss",
+              "window_close", "close_sum", "close_sumsq", "tr_sum", "plus_dm_sum", "minus_dm_sum",
+              "dx_sum", "adx"]
+
+    def __init__(self, tickers, rsi_window=RSI_WINDOW, bb_window=BB_WINDOW, adx_window=ADX_WINDOW):
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.rsi_window = rsi_window
+        self.bb_window = bb_window
+        self.adx_window = adx_window
+        self.last_date = None  # 마지막으로 반영한 봉의 날짜
+
+        self.count = np.zeros(n, dtype=np.int64)  # 지금까지 반영한 봉 수
+        self.prev_close = np.full(n, np.nan)
+        self.prev_high = np.full(n, np.nan)
+        self.prev_low = np.full(n, np.nan)
+        self.last_close = np.full(n, np.nan)
+
+        # RSI: Wilder 평활 상승폭/하락폭
+        self.avg_gain = np.zeros(n)
+        self.avg_loss = np.zeros(n)
+
+        # 볼린저밴드: 최근 bb_window개 종가와 합, 제곱합
+        self.window_close = np.zeros((bb_window, n))
+        self.close_sum = np.zeros(n)
+        self.close_sumsq = np.zeros(n)
+
+        # ADX: TR / +DM / -DM 누적(평활)값과 DX 합, ADX
+        self.tr_sum = np.zeros(n)
+        self.plus_dm_sum = np.zeros(n)
+        self.minus_dm_sum = np.zeros(n)
+        self.dx_sum = np.zeros(n)
+        self.adx = np.full(n, np.nan)
+
+    def update(self, close, high, low):
+        """하루치 종가/고가/저가 배열(종목 순서는 self.tickers)을 반영한다. NaN인 종목은 건너뛴다."""
+        close = np.asarray(close, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        valid = ~(np.isnan(close) | np.isnan(high) | np.isnan(low))
+        if not valid.any():
+            return
+
+        k = self.count  # 이번 봉의 종목별 순번 (0부터)
+        has_prev = valid & (k > 0)
+
+        # RSI
+        alpha = 1 / self.rsi_window
+        diff = np.where(has_prev, close - self.prev_close, 0.0)
+        gain = np.where(diff > 0, diff, 0.0)
+        loss = np.where(diff < 0, -diff, 0.0)
+        self.avg_gain = np.where(has_prev, (1 - alpha) * self.avg_gain + alpha * gain, self.avg_gain)
+        self.avg_loss = np.where(has_prev, (1 - alpha) * self.avg_loss + alpha * loss, self.avg_loss)
+
+        # 볼린저밴드
+        slot = k % self.bb_window
+        cols = np.flatnonzero(valid)
+        dropped = np.where(k[cols] >= self.bb_window, self.window_close[slot[cols], cols], 0.0)
+        self.close_sum[cols] += close[cols] - dropped
+        self.close_sumsq[cols] += close[cols] ** 2 - dropped ** 2
+        self.window_close[slot[cols], cols] = close[cols]
+
+        # ADX
+        w = self.adx_window
+        tr = np.fmax(high, self.prev_close) - np.fmin(low, self.prev_close)
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+        seeding = has_prev & (k <= w)  # 1 ~ w번째 봉: 단순 합
+        smoothing = has_prev & (k > w)  # 이후: Wilder 평활
+        for name, value in (("tr_sum", tr), ("plus_dm_sum", plus_dm), ("minus_dm_sum", minus_dm)):
+            acc = getattr(self, name)
+            acc = np.where(seeding, acc + value, acc)
+            acc = np.where(smoothing, acc - acc / w + value, acc)
+            setattr(self, name, acc)
+
+        has_dx = has_prev & (k >= w)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plus_di = np.where(self.tr_sum != 0, 100 * self.plus_dm_sum / self.tr_sum, 0.0)
+            minus_di = np.where(self.tr_sum != 0, 100 * self.minus_dm_sum / self.tr_sum, 0.0)
+            di_sum = plus_di + minus_di
+            dx = np.where(di_sum != 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+        self.dx_sum = np.where(has_dx & (k < 2 * w), self.dx_sum + dx, self.dx_sum)
+        self.adx = np.where(has_dx & (k == 2 * w - 1), self.dx_sum / w, self.adx)
+        self.adx = np.where(has_dx & (k >= 2 * w), (self.adx * (w - 1) + dx) / w, self.adx)
+
+        # 다음 봉을 위한 값 갱신
+        self.prev_close = np.where(valid, close, self.prev_close)
+        self.prev_high = np.where(valid, high, self.prev_high)
+        self.prev_low = np.where(valid, low, self.prev_low)
+        self.last_close = self.prev_close
+        self.count = k + valid
+
+    def params(self):
+        return (self.rsi_window, self.bb_window, self.adx_window)
+
+    def copy(self):
+        other = IndicatorState(self.tickers, *self.params())
+        other.last_date = self.last_date
+        for name in self.ARRAYS:
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def select(self, tickers):
+        # tickers 순서로 종목을 추려낸 새 상태 (self에 없는 종목은 포함할 수 없음)
+        idx = [self.tickers.index(ticker) for ticker in tickers]
+        other = IndicatorState(tickers, *self.params())
+        other.last_date = self.last_date
+        for name in self.ARRAYS:
+            setattr(other, name, getattr(self, name)[..., idx].copy())
+        return other
+
+    def extend(self, other):
+        # 같은 날짜까지 반영된 다른 종목들의 상태를 이어 붙인다
+        self.tickers = self.tickers + other.tickers
+        for name in self.ARRAYS:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(other, name)], axis=-1))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path,
+                 tickers=np.array(self.tickers, dtype=str),
+                 params=np.array(self.params()),
+                 last_date=np.array("" if self.last_date is None else self.last_date.isoformat()),
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                state = cls(data["tickers"].tolist(), *data["params"].tolist())
+                last_date = str(data["last_date"])
+                state.last_date = pd.Timestamp(last_date) if last_date else None
+                for name in cls.ARRAYS:
+                    setattr(state, name, data[name])
+            return state
+        except Exception:
+            return None  # 깨진 파일은 무시하고 처음부터 다시 계산
+
+    def values(self):
+        """종목별 최신 지표값 (봉 수가 부족한 종목은 NaN)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(self.avg_loss == 0, 100.0,
+                           100 - 100 / (1 + self.avg_gain / self.avg_loss))
+            rsi = np.where(self.count >= self.rsi_window, rsi, np.nan)
+
+            mean = self.close_sum / self.bb_window
+            std = np.sqrt(np.maximum(self.close_sumsq / self.bb_window - mean ** 2, 0.0))
+            bb_ready = self.count >= self.bb_window
+            bb_high = np.where(bb_ready, mean + BB_WINDOW_DEV * std, np.nan)
+            bb_low = np.where(bb_ready, mean - BB_WINDOW_DEV * std, np.nan)
+
+        return pd.DataFrame({
+            "티커": self.tickers,
+            "종가": self.last_close,
+            "RSI": rsi,
+            "볼린저상단": bb_high,
+            "볼린저하단": bb_low,
+            "ADX": self.adx,
+        })
+
+def _sweep(state, dates, close, high, low, rows):
+    # close / high / low: 날짜 × 종목 배열 (열 순서는 state.tickers), rows: 반영할 행 번호
+    count("indicators.bars", len(rows) * close.shape[1])
+    for i in rows:
+        state.update(close[i], high[i], low[i])
+    if len(rows):
+        state.last_date = dates[rows[-1]]
+
+def advance_state(state, dates, tickers, close, high, low, end):
+    """
+    state를 패널의 end번째 행 직전까지 진행시킨다. state 이후의 봉만 반영하고,
+    새로 생긴 종목이나 마지막 반영일의 종가가 달라진 종목은 처음부터 다시 계산한다.
+    """
+    fresh = IndicatorState(tickers)
+    if state is None or state.params() != fresh.params() or state.last_date is None \
+            or state.last_date not in dates[:end]:
+        _sweep(fresh, dates, close, high, low, range(end))
+        return fresh
+
+    anchor_row = dates.get_loc(state.last_date)
+    known = [ticker for ticker in tickers if ticker in state.tickers]
+    state = state.select(known)
+    anchor = close[anchor_row, [tickers.index(ticker) for ticker in known]]
+    unchanged = np.isnan(anchor) | np.isclose(anchor, state.prev_close, rtol=1e-9, atol=0)
+    keep = [ticker for ticker, ok in zip(known, unchanged) if ok]
+    rebuild = [ticker for ticker in tickers if ticker not in keep]
+
+    if rebuild:
+        cols = [tickers.index(ticker) for ticker in rebuild]
+        rebuilt = IndicatorState(rebuild)
+        _sweep(rebuilt, dates, close[:, cols], high[:, cols], low[:, cols], range(anchor_row + 1))
+        state = state.select(keep)
+        state.extend(rebuilt)
+        state = state.select(tickers)
+
+    _sweep(state, dates, close, high, low, range(anchor_row + 1, end))
+    return state
+
+def compute_indicators(close, high, low, state_key=None):
+    """
+    close / high / low: 날짜 × 티커 패널 (같은 index, columns)
+    state_key를 주면 직전 봉까지의 지표 상태를 디스크에 보관하고, 다음 호출에서는 새 봉만 반영한다.
+    마지막 봉은 장중 값일 수 있으므로 저장하지 않고 매번 복사본에만 반영한다.
+    반환: 티커별 최신 RSI / 볼린저밴드 / ADX 값과 신호
+    """
+    dates = close.index
+    tickers = list(close.columns)
+    close_values = close.to_numpy(dtype=np.float64)
+    high_values = high.reindex_like(close).to_numpy(dtype=np.float64)
+    low_values = low.reindex_like(close).to_numpy(dtype=np.float64)
+    last_row = len(dates) - 1
+
+    path = os.path.join(INDICATOR_STATE_DIR, f"{state_key}.npz") if state_key else None
+    state = IndicatorState.load(path) if path else None
+    state = advance_state(state, dates, tickers, close_values, high_values, low_values, max(last_row, 0))
+    if path and state.last_date is not None:
+        state.save(path)
+
+    latest = state.copy()
+    _sweep(latest, dates, close_values, high_values, low_values, range(max(last_row, 0), len(dates)))
+    return indicator_signals(latest.values())
+
+def indicator_signals(values):
+    signals = values.copy()
+    signals["RSI신호"] = np.select(
+        [signals["RSI"] > RSI_OVERBOUGHT, signals["RSI"] < RSI_OVERSOLD], ["과매수", "과매도"], "중립")
+    signals["볼린저밴드"] = np.select(
+        [signals["종가"] < signals["볼린저하단"], signals["종가"] > signals["볼린저상단"]],
+        ["하단돌파(매수신호)", "상단돌파(매도경고)"], "정상범위")
+    signals["ADX신호"] = np.where(signals["ADX"] > ADX_TREND_THRESHOLD, "강한추세", "약한추세")
+    return signals
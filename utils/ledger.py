@@ -0,0 +1,75 @@
+import pandas as pd
+
+from utils.finance import match_lots_kr, match_lots_us, get_remaining_cash, trade_cash_flow
+
+class PositionLedger:
+    """
+    세션 상태에 보관하는 보유 현황 장부.
+    거래를 추가하면 해당 종목의 lot과 현금만 갱신하고, 매도 가능 수량은 종목별 순수량으로 바로 조회한다.
+    분석 페이지는 거래로그 전체를 다시 매칭하지 않고 book / realized_book을 그대로 사용한다.
+    """
+
+    def __init__(self, trading_log, US=False):
+        self.US = US
+        if US:
+            self.book = match_lots_us(trading_log, by_category=True)  # 평가손익용 (구분, 티커)
+            self.realized_book = match_lots_us(trading_log, by_category=False)  # 실현손익용 티커
+        else:
+            self.book = match_lots_kr(trading_log)
+            self.realized_book = self.book
+
+        signed_qty = trading_log["거래수량"].where(trading_log["거래유형"] == "매수", -trading_log["거래수량"])
+        self.net_quantity = signed_qty.groupby(trading_log["티커"]).sum().to_dict()
+        self.cash = get_remaining_cash(trading_log, US=US)
+
+    def _books(self):
+        return [self.book] if self.realized_book is self.book else [self.book, self.realized_book]
+
+    def available(self, ticker):
+        # 매도 가능 수량 = 총 매수수량 - 총 매도수량
+        return self.net_quantity.get(ticker, 0)
+
+    def positions(self):
+        """현재 보유 종목 (티커, 구분 / 종목명, 보유수량, 평균단가) - 가격 없이 장부에서 바로 만든다"""
+        rows = []
+        for key, quantity, total_cost, _ in self.book.open_positions():
+            ticker = key[-1] if isinstance(key, tuple) else key
+            rows.append({"티커": ticker, **dict(zip(self.book.meta_cols, self.book.meta[key])),
+                         "보유수량": quantity, "평균단가": total_cost / quantity})
+        return pd.DataFrame(rows, columns=["티커", *self.book.meta_cols, "보유수량", "평균단가"])
+
+    def add(self, trade, trading_log):
+        """
+        trade: 새로 추가된 거래(dict), trading_log: trade가 추가된 이후의 거래로그.
+        기존 거래보다 이른 날짜로 입력된 경우에만 해당 종목을 거래로그에서 다시 매칭한다.
+        """
+        ticker = trade["티커"]
+        sign = 1 if trade["거래유형"] == "매수" else -1
+        self.net_quantity[ticker] = self.net_quantity.get(ticker, 0) + sign * trade["거래수량"]
+        self.cash += trade_cash_flow(trade["거래유형"], trade["금액"], US=self.US)
+
+        for book in self._books():
+            key = book.key_of(trade)
+            last_date = book.last_date.get(key)
+            if last_date is not None and trade["거래일"] < last_date:
+                self._replay(book, [ticker], trading_log)
+            else:
+                book.apply_trade(trade)
+
+    def remove(self, tickers, trading_log):
+        """tickers의 거래가 삭제된 뒤, 남은 거래로그(trading_log)로 해당 종목만 다시 계산한다."""
+        rows = trading_log[trading_log["티커"].isin(tickers)]
+        signed_qty = rows["거래수량"].where(rows["거래유형"] == "매수", -rows["거래수량"])
+        net = signed_qty.groupby(rows["티커"]).sum()
+        for ticker in tickers:
+            self.net_quantity[ticker] = net.get(ticker, 0)
+        self.cash = get_remaining_cash(trading_log, US=self.US)
+
+        for book in self._books():
+            self._replay(book, tickers, trading_log)
+
+    def _replay(self, book, tickers, trading_log):
+        ticker_col = book.key_cols.index("티커")
+        book.reset([key for key in list(book.lots)
+                    if (key[ticker_col] if len(book.key_cols) > 1 else key) in tickers])
+        book.apply_log(trading_log[trading_log["티커"].isin(tickers)])
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from utils.config import PRICE_PANEL_DIR, PRICE_PANEL_RETENTION
+
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# ---------------------------
+# 가격 패널 (날짜 × 티커, 필드별 float32 배열)
+# 배열은 내용 해시로 이름 붙인 디렉터리에 메모리 맵 파일로 저장되므로,
+# 같은 데이터를 쓰는 여러 Streamlit 워커 프로세스가 복사 없이 같은 페이지 캐시를 공유한다.
+
+class PricePanel:
+    def __init__(self, dates, tickers, arrays):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self._arrays = arrays  # field -> (날짜 수, 티커 수) 배열
+        self._frames = {}
+
+    def field(self, name):
+        """필드 배열을 그대로 감싼 DataFrame (복사 없음, 읽기 전용으로 사용)"""
+        if name not in self._frames:
+            self._frames[name] = pd.DataFrame(self._arrays[name], index=self.dates,
+                                              columns=self.tickers, copy=False)
+        return self._frames[name]
+
+    @property
+    def close(self):
+        return self.field("Close")
+
+    @property
+    def latest_date(self):
+        return self.dates.max() if len(self.dates) else None
+
+    def __contains__(self, ticker):
+        return ticker in self.tickers
+
+    def last_close(self):
+        """티커별 마지막 종가 (데이터가 없는 티커는 NaN)"""
+        close = self._arrays["Close"]
+        if close.shape[0] == 0:
+            return pd.Series(np.nan, index=self.tickers)
+        valid = ~np.isnan(close)
+        last_row = close.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+        values = close[last_row, np.arange(close.shape[1])].astype(np.float64)
+        return pd.Series(np.where(valid.any(axis=0), values, np.nan), index=self.tickers)
+
+def _panel_arrays(price_dict, tickers):
+    frames = {ticker: price_dict[ticker] for ticker in tickers
+              if price_dict.get(ticker) is not None and not price_dict[ticker].empty}
+    dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values())))) \
+        if frames else pd.DatetimeIndex([])
+
+    arrays = {field: np.full((len(dates), len(tickers)), np.nan, dtype=np.float32) for field in PANEL_FIELDS}
+    for col, ticker in enumerate(tickers):
+        df = frames.get(ticker)
+        if df is None:
+            continue
+        rows = dates.get_indexer(df.index)
+        for field in PANEL_FIELDS:
+            if field in df:
+                arrays[field][rows, col] = df[field].to_numpy(dtype=np.float32)
+    return dates, arrays
+
+def _version(dates, tickers, arrays):
+    digest = hashlib.sha1()
+    digest.update(json.dumps(tickers).encode())
+    digest.update(dates.asi8.tobytes())
+    for field in PANEL_FIELDS:
+        digest.update(arrays[field].tobytes())
+    return digest.hexdigest()[:16]
+
+def build_price_panel(price_dict, tickers, panel_dir=PRICE_PANEL_DIR):
+    """
+    {티커: OHLCV DataFrame}을 tickers 순서의 PricePanel로 만든다.
+    같은 내용의 패널이 이미 디스크에 있으면 그 파일을 그대로 연다.
+    """
+    tickers = [str(ticker) for ticker in tickers]
+    dates, arrays = _panel_arrays(price_dict, tickers)
+    if len(dates) == 0 or not tickers:
+        return PricePanel(dates, tickers, arrays)  # 빈 파일은 메모리 맵할 수 없음
+
+    path = os.path.join(panel_dir, _version(dates, tickers, arrays))
+    if not os.path.exists(path):
+        os.makedirs(panel_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=panel_dir, prefix=".tmp-")
+        for field in PANEL_FIELDS:
+            arrays[field].tofile(os.path.join(tmp_path, f"{field}.f32"))
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"dates": [d.isoformat() for d in dates], "tickers": tickers}, f, ensure_ascii=False)
+        try:
+            os.rename(tmp_path, path)  # 다 쓴 뒤에 한 번에 공개
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)  # 다른 프로세스가 먼저 만든 경우
+        _cleanup(panel_dir, keep=path)
+    return open_price_panel(path)
+
+def open_price_panel(path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    shape = (len(meta["dates"]), len(meta["tickers"]))
+    arrays = {field: np.memmap(os.path.join(path, f"{field}.f32"), dtype=np.float32, mode="r", shape=shape)
+              for field in PANEL_FIELDS}
+    return PricePanel(pd.to_datetime(meta["dates"]), meta["tickers"], arrays)
+
+def _cleanup(panel_dir, keep):
+    # 오래된 버전 정리 (열려 있는 메모리 맵은 삭제되어도 계속 읽을 수 있음)
+    cutoff = time.time() - PRICE_PANEL_RETENTION
+    for name in os.listdir(panel_dir):
+        path = os.path.join(panel_dir, name)
+        if path != keep and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,233 @@
+"""
+가격 캐시 미리 받기 (백그라운드 스케줄러)
+
+장 마감 후(PREFETCH_SCHEDULE) 보유 종목과 투자대상 종목의 가격을 미리 받아 두어,
+마감 후 처음 대시보드를 여는 사람도 조회를 기다리지 않고 캐시된 가격을 쓰게 한다.
+앱(app.py)은 프로세스당 한 번 start_prefetch()로 스레드를 시작하고, 한 번만 실행하려면:
+
+    python -m utils.prefetch                    # 국내/해외 계좌를 지금 바로 한 번 받기
+    python -m utils.prefetch --market US --no-universe
+
+실행 결과와 다음 실행 시각은 PREFETCH_STATUS_PATH(JSON)에 기록한다.
+시계(clock) / 대기(wait) / 작업(job)을 바꿔 넣을 수 있으므로 가짜 시계와 로컬 공급원(replay / synthetic)으로 시험할 수 있다.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from utils.fetch_plan import plan_price_windows, plan_universe_windows
+from utils.fx import load_fx_series
+from utils.prices import fetch_price, fetch_prices, load_price_panel
+from utils.trade_store import TradeStore
+from utils.config import (PREFETCH_ENABLED, PREFETCH_SCHEDULE, PREFETCH_UNIVERSE, PREFETCH_RETRIES,
+                          PREFETCH_RETRY_DELAY, PREFETCH_STARTUP_DELAY, PREFETCH_STATUS_PATH, FX_SYMBOL)
+
+# ---------------------------
+# 실행 시각
+
+def _scheduled_on(day, close_time):
+    hour, minute = map(int, close_time.split(":"))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+def next_run_time(now, tz, close_time):
+    """now 이후 첫 평일 close_time (tz 기준 시각, tz가 붙은 datetime)"""
+    candidate = _scheduled_on(now.astimezone(ZoneInfo(tz)), close_time)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return _scheduled_on(candidate, close_time)
+
+def last_run_time(now, tz, close_time):
+    """now 이전(포함) 마지막 평일 close_time"""
+    candidate = _scheduled_on(now.astimezone(ZoneInfo(tz)), close_time)
+    if candidate > now:
+        candidate -= timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate -= timedelta(days=1)
+    return _scheduled_on(candidate, close_time)
+
+# ---------------------------
+# 계좌별 작업
+
+def universe_tickers(market):
+    from utils.data_loader import etf_index, spx_index  # 투자대상 목록은 필요할 때만 로드
+    index = etf_index() if market == "KR" else spx_index()
+    return [record["티커"] for record in index.records]
+
+def warm_market(market, today, universe=PREFETCH_UNIVERSE, store=None):
+    """
+    market 계좌의 보유 종목 가격(페이지와 같은 조회 구간)과 투자대상 종목 가격을 받아 캐시에 채운다.
+    보유 종목은 페이지가 쓰는 공용 메모리 캐시 / 디스크 캐시에, 투자대상 종목은 디스크 캐시에만 저장한다.
+    장중에 받아 둔 봉을 종가로 바꾸도록 모든 캐시를 건너뛰고(refresh) 새로 받는다.
+    거래로그는 저장소에 있는 그대로 읽는다 (CSV 다시 가져오기는 사용자가 앱 / 리포트를 열 때만 한다).
+    반환: {"tickers": 보유 종목 수, "universe": 투자대상 종목 수, "failed": 실패 심볼 목록}
+    """
+    store = store or TradeStore()
+    trading_log = store.load(market)
+
+    windows = plan_price_windows(trading_log, today)
+    _, failed = load_price_panel(windows, refresh=True)
+    failed = list(failed)
+
+    universe_windows = plan_universe_windows(universe_tickers(market), today, exclude=windows) if universe else {}
+    if universe_windows:
+        _, universe_failed = fetch_prices(universe_windows, fetcher=fetch_price, refresh=True)
+        failed += list(universe_failed)
+
+    if market == "US" and not trading_log.empty:
+        _, error = load_fx_series(trading_log["거래일"].min(), today, refresh=True)
+        if error is not None:
+            failed.append(FX_SYMBOL)
+    return {"tickers": len(windows), "universe": len(universe_windows), "failed": sorted(failed)}
+
+# ---------------------------
+# 스케줄러
+
+def read_status(path=PREFETCH_STATUS_PATH):
+    """계좌별 마지막 실행 결과 / 다음 실행 시각 (기록이 없으면 빈 dict)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _utc_now():
+    return datetime.now(timezone.utc)
+
+class PrefetchScheduler:
+    """
+    schedule({market: (시간대, "HH:MM")})의 평일 실행 시각마다 job(market, today, universe)을 실행한다.
+    조회 실패 종목이 있거나 예외가 나면 retry_delay × 2^시도 × (0.5~1.5 무작위) 후 retries번까지 다시 시도한다.
+    시작 시 마지막 예정 시각 이후 성공 기록이 없으면(서버가 꺼져 있었던 경우 등) startup_delay초 뒤에
+    보유 종목만 한 번 받는다 (투자대상 종목은 다음 정기 실행에서 받음).
+    clock(): 현재 시각(tz가 붙은 datetime), wait(초): 대기하다 중지 요청이 오면 True
+    """
+
+    def __init__(self, schedule=PREFETCH_SCHEDULE, job=warm_market, status_path=PREFETCH_STATUS_PATH,
+                 retries=PREFETCH_RETRIES, retry_delay=PREFETCH_RETRY_DELAY, startup_delay=PREFETCH_STARTUP_DELAY,
+                 universe=PREFETCH_UNIVERSE, clock=_utc_now, wait=None, seed=None):
+        self.schedule = schedule
+        self.job = job
+        self.universe = universe
+        self.status_path = status_path
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._stop = threading.Event()
+        self.wait = wait or self._stop.wait
+        self.rng = random.Random(seed)
+        self._thread = None
+
+        self.status = self._load_status()
+        now = self.clock()
+        self.next_run, self.catch_up = {}, set()
+        for market, (tz, close_time) in schedule.items():
+            last_success = self.status.get(market, {}).get("last_success")
+            missed = last_success is None or datetime.fromisoformat(last_success) < last_run_time(now, tz, close_time)
+            if missed:
+                self.catch_up.add(market)
+            self.next_run[market] = now + timedelta(seconds=startup_delay) if missed \
+                else next_run_time(now, tz, close_time)
+
+    def _load_status(self):
+        return read_status(self.status_path)
+
+    def _write_status(self):
+        for market, due in self.next_run.items():
+            self.status.setdefault(market, {})["next_run"] = due.isoformat()
+        os.makedirs(os.path.dirname(self.status_path) or ".", exist_ok=True)
+        tmp_path = f"{self.status_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.status, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.status_path)
+
+    def run_job(self, market, universe=None):
+        """market 작업을 재시도 포함해 한 번 실행하고 상태를 기록한다 (universe: 투자대상 종목도 받을지, 기본 self.universe)."""
+        started = time.perf_counter()
+        # 페이지는 서버 현지 날짜(datetime.today())로 조회 구간을 정하므로 같은 기준일을 쓴다
+        today = self.clock().astimezone().replace(tzinfo=None)
+        result, error, attempts = None, None, 0
+        for attempt in range(self.retries + 1):
+            attempts = attempt + 1
+            try:
+                result = self.job(market, today, universe=self.universe if universe is None else universe)
+                error = f"{len(result['failed'])}개 종목 조회 실패" if result["failed"] else None
+            except Exception as e:
+                result, error = None, repr(e)
+            if error is None or attempt == self.retries:
+                break
+            if self.wait(self.retry_delay * 2 ** attempt * self.rng.uniform(0.5, 1.5)):
+                break  # 중지 요청
+
+        finished = self.clock().isoformat()
+        status = self.status.setdefault(market, {})
+        status.update({"last_run": finished, "ok": error is None, "attempts": attempts, "error": error,
+                       "duration_s": round(time.perf_counter() - started, 3), **(result or {})})
+        if error is None:
+            status["last_success"] = finished
+        return status
+
+    def schedule_next(self, market):
+        tz, close_time = self.schedule[market]
+        self.next_run[market] = next_run_time(self.clock(), tz, close_time)
+
+    def run_pending(self):
+        """실행 시각이 지난 작업을 실행하고 다음 실행 시각을 정한다."""
+        for market, due in list(self.next_run.items()):
+            if due <= self.clock():
+                self.run_job(market, universe=self.universe and market not in self.catch_up)
+                self.catch_up.discard(market)
+                self.schedule_next(market)
+        self._write_status()
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self.run_pending()
+            delay = (min(self.next_run.values()) - self.clock()).total_seconds()
+            if self.wait(max(delay, 0)):
+                break
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="price-prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def start_prefetch():
+    """프로세스당 한 번 백그라운드 스케줄러를 시작한다 (PREFETCH_ENABLED가 False면 시작하지 않음)."""
+    global _scheduler
+    if not PREFETCH_ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler().start()
+    return _scheduler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가격 캐시 미리 받기 (한 번 실행)")
+    parser.add_argument("--market", nargs="+", choices=list(PREFETCH_SCHEDULE), default=list(PREFETCH_SCHEDULE))
+    parser.add_argument("--no-universe", action="store_true", help="투자대상 종목은 받지 않음")
+    args = parser.parse_args(argv)
+
+    scheduler = PrefetchScheduler(schedule={market: PREFETCH_SCHEDULE[market] for market in args.market},
+                                  universe=PREFETCH_UNIVERSE and not args.no_universe)
+    for market in args.market:
+        print(json.dumps({"market": market, **scheduler.run_job(market)}, ensure_ascii=False))
+        scheduler.schedule_next(market)
+    scheduler._write_status()
+
+if __name__ == "__main__":
+    main()
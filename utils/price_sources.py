@@ -0,0 +1,91 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+
+from utils.config import PRICE_SOURCE, PRICE_REPLAY_DIR, PRICE_SYNTHETIC_SEED
+
+# ---------------------------
+# 가격 데이터 공급원
+# read(symbol, start, end)는 [start, end] 구간의 일봉(Open/High/Low/Close/Volume, index: 날짜)을 반환한다.
+# cacheable이 True인 공급원만 종목별 디스크 캐시(utils/prices.py)를 거친다.
+
+class FdrSource:
+    """FinanceDataReader (네트워크)"""
+    name = "fdr"
+    cacheable = True
+
+    def read(self, symbol, start, end):
+        import FinanceDataReader as fdr  # import 비용이 커서 실제로 조회할 때만 로드
+        return fdr.DataReader(symbol, start=pd.Timestamp(start).date().isoformat(),
+                              end=pd.Timestamp(end).date().isoformat())
+
+class ReplaySource:
+    """
+    로컬 디렉터리의 <symbol>.parquet 또는 <symbol>.csv를 재생 (오프라인 데모 / 테스트용).
+    가격 캐시 디렉터리(data/price_cache)도 같은 형식이므로 그대로 지정할 수 있다.
+    """
+    name = "replay"
+    cacheable = False
+
+    def __init__(self, directory=PRICE_REPLAY_DIR):
+        self.directory = directory
+
+    def read(self, symbol, start, end):
+        safe = str(symbol).replace("/", "_")
+        parquet_path = os.path.join(self.directory, f"{safe}.parquet")
+        csv_path = os.path.join(self.directory, f"{safe}.csv")
+        if os.path.exists(parquet_path):
+            data = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            data = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        else:
+            raise FileNotFoundError(f"{symbol}의 재생 데이터가 없습니다: {self.directory}")
+        return data.sort_index().loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+class SyntheticSource:
+    """
+    종목별로 고정된 시드의 랜덤워크 (부하 테스트 / 벤치마크용).
+    경로는 항상 ORIGIN부터 만들기 때문에 조회 구간이 달라도 같은 날짜의 가격은 같다.
+    """
+    name = "synthetic"
+    cacheable = False
+    ORIGIN = "2020-01-01"
+
+    def __init__(self, seed=PRICE_SYNTHETIC_SEED):
+        self.seed = seed
+
+    def read(self, symbol, start, end):
+        dates = pd.bdate_range(self.ORIGIN, pd.Timestamp(end))
+        n = len(dates)
+        # 계열마다 따로 만든 생성기를 써야 조회 끝날짜(n)가 달라도 앞부분 값이 같다
+        key = zlib.crc32(str(symbol).encode())
+        rng_close, rng_high, rng_low, rng_volume = (np.random.default_rng([self.seed, key, i]) for i in range(4))
+        # 국내 종목(숫자 티커)은 원화, 해외 종목은 달러, 환율("USD/KRW")은 원/달러 수준의 가격
+        if "/" in str(symbol):
+            (low_price, high_price), drift, volatility = (1_300, 1_450), 0.0, 0.004
+        else:
+            low_price, high_price = (5_000, 50_000) if str(symbol).isdigit() else (20, 500)
+            drift, volatility = 0.0003, 0.015
+
+        close = rng_close.uniform(low_price, high_price) * np.exp(np.cumsum(rng_close.normal(drift, volatility, n)))
+        high = close * (1 + np.abs(rng_high.normal(0, 0.008, n)))
+        low = close * (1 - np.abs(rng_low.normal(0, 0.008, n)))
+        data = pd.DataFrame({
+            "Open": (high + low) / 2, "High": high, "Low": low, "Close": close,
+            "Volume": rng_volume.integers(1_000, 1_000_000, n).astype("float64"),
+        }, index=pd.DatetimeIndex(dates, name="Date"))
+        return data.loc[pd.Timestamp(start):]
+
+PRICE_SOURCES = {source.name: source for source in [FdrSource, ReplaySource, SyntheticSource]}
+
+_active = {}
+
+def get_price_source(name=None):
+    """설정(PRICE_SOURCE)에서 고른 공급원 (프로세스당 하나씩 만들어 재사용)"""
+    name = name or PRICE_SOURCE
+    if name not in PRICE_SOURCES:
+        raise ValueError(f"알 수 없는 가격 공급원입니다: {name} (사용 가능: {', '.join(PRICE_SOURCES)})")
+    if name not in _active:
+        _active[name] = PRICE_SOURCES[name]()
+    return _active[name]
@@ -0,0 +1,224 @@
+import contextvars
+import os
+import time
+from functools import partial
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.cache import TTLCache
+from utils.profiling import timer, count
+from utils.panel import build_price_panel
+from utils.price_sources import get_price_source
+from utils.fetch_plan import plan_price_windows
+from utils.config import (PRICE_CACHE_DIR, PRICE_FETCH_WORKERS, PRICE_FETCH_TIMEOUT,
+                          PRICE_FETCH_RETRIES, PRICE_FETCH_BACKOFF, PRICE_RECHECK_INTERVAL,
+                          PRICE_MEMORY_CACHE_TTL, PRICE_MEMORY_CACHE_SIZE, PRICE_FAILED_CACHE_TTL)
+
+# ---------------------------
+# 종목별 가격 캐시 (Parquet)
+# 한 번 받은 일봉은 디스크에 저장해 두고, 이후에는 마지막 캐시일 이후 구간만 추가로 받는다.
+
+def _cache_path(symbol, cache_dir=PRICE_CACHE_DIR):
+    # "USD/KRW" 같은 심볼도 파일명으로 쓸 수 있도록 치환
+    safe = str(symbol).replace("/", "_")
+    return os.path.join(cache_dir, f"{safe}.parquet")
+
+def load_cached_price(symbol, cache_dir=PRICE_CACHE_DIR):
+    path = _cache_path(symbol, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        # 깨진 캐시 파일은 무시하고 새로 받는다
+        return None
+
+def _covered_from(cached):
+    # 캐시가 실제로 덮고 있는 시작일 (요청 시작일이 휴장일이어도 다시 받지 않도록 따로 저장)
+    covered = cached.attrs.get("covered_from")
+    return pd.Timestamp(covered) if covered else cached.index.min()
+
+def _up_to_date(cached, end):
+    """
+    캐시를 end까지 다시 받지 않아도 되는지 (주말 / 휴장일에는 새 봉이 없으므로 매번 받지 않는다).
+    end 날짜의 봉도 장중에 받은 것이면 확정값이 아니므로 마지막 봉과 같은 기준으로 다시 확인한다.
+    """
+    last_date = cached.index.max()
+    if last_date > end:
+        return True  # end 이후 봉이 있으면 end까지는 확정
+    if "checked_at" not in cached.attrs:
+        return False
+    checked_at = pd.Timestamp(cached.attrs["checked_at"])
+    # 마지막 예상 거래일(end가 주말이면 직전 금요일)까지 있고, 그날이 지난 뒤 확인했으면 장중 봉도 아님
+    if last_date >= pd.offsets.BDay().rollback(end) and checked_at.normalize() > last_date:
+        return True
+    # 평일 휴장일 / 아직 올라오지 않은 봉: 같은 구간을 최근에 확인했으면 잠시 다시 받지 않음
+    return (pd.Timestamp(cached.attrs["checked_end"]) >= end
+            and (pd.Timestamp.now() - checked_at).total_seconds() < PRICE_RECHECK_INTERVAL)
+
+def save_cached_price(symbol, data, covered_from, cache_dir=PRICE_CACHE_DIR, checked_end=None):
+    os.makedirs(cache_dir, exist_ok=True)
+    data.attrs["covered_from"] = pd.Timestamp(covered_from).isoformat()
+    # 마지막으로 공급원에서 받은 시각과 그때 요청한 끝날짜 (_up_to_date에서 사용)
+    data.attrs["checked_at"] = pd.Timestamp.now().isoformat()
+    data.attrs["checked_end"] = pd.Timestamp(checked_end if checked_end is not None else data.index.max()).isoformat()
+    path = _cache_path(symbol, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    data.to_parquet(tmp_path)
+    os.replace(tmp_path, path)  # 쓰는 도중 중단되어도 기존 캐시는 보존
+
+def fetch_price(symbol, start, end, cache_dir=PRICE_CACHE_DIR, source=None, refresh=False):
+    """
+    symbol의 [start, end] 일봉을 가격 공급원(source, 기본값은 설정의 PRICE_SOURCE)에서 받아 반환한다.
+    캐시가 start부터 덮고 있으면 마지막 캐시일부터 end까지만 새로 받아 이어 붙인다.
+    (마지막 캐시일은 장중 데이터였을 수 있으므로 다시 받아 덮어쓴다)
+    주말 / 휴장일처럼 end까지 새 봉이 없을 날에는 _up_to_date 기준으로 다시 받지 않는다.
+    refresh=True면 _up_to_date와 관계없이 마지막 캐시일부터 다시 받는다 (장 마감 후 미리 받기 등).
+    로컬 공급원(replay / synthetic)은 캐시를 거치지 않는다.
+    """
+    source = source or get_price_source()
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end).normalize()
+    if not source.cacheable:
+        data = source.read(symbol, start, end)
+        count("price.rows_fetched", len(data))
+        count("price.fetch")
+        return data
+
+    cached = load_cached_price(symbol, cache_dir)
+
+    if cached is not None and not cached.empty and _covered_from(cached) <= start:
+        covered_from = _covered_from(cached)
+        if not refresh and _up_to_date(cached, end):
+            count("price.disk_cache_hit")
+            return cached.loc[start:end]
+        delta = source.read(symbol, cached.index.max(), end)
+        count("price.rows_fetched", len(delta))
+        data = pd.concat([cached, delta])
+    else:
+        covered_from = start
+        data = source.read(symbol, start, end)
+        count("price.rows_fetched", len(data))
+    count("price.fetch")
+
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+    if not data.empty:
+        save_cached_price(symbol, data, covered_from, cache_dir, checked_end=end)
+    return data.loc[start:end]
+
+# ---------------------------
+# 프로세스 공용 메모리 캐시
+# 모든 세션이 공유하므로 반환된 DataFrame은 수정하지 말고 필요하면 .copy()해서 쓴다.
+
+shared_price_cache = TTLCache(maxsize=PRICE_MEMORY_CACHE_SIZE, ttl=PRICE_MEMORY_CACHE_TTL)
+
+def cached_fetch_price(symbol, start, end, refresh=False):
+    """공용 메모리 캐시를 거친 fetch_price (refresh=True면 캐시를 무시하고 새로 받아 메모리 / 디스크 캐시를 갱신)"""
+    source = get_price_source()
+    key = (source.name, str(symbol), pd.Timestamp(start).date(), pd.Timestamp(end).date())
+    count("price.requests")
+
+    def compute():
+        count("price.memory_cache_miss")
+        return fetch_price(symbol, start, end, source=source, refresh=refresh)
+    if refresh:
+        data = compute()
+        shared_price_cache.set(key, data)
+        return data
+    return shared_price_cache.get_or_compute(key, compute)
+
+# ---------------------------
+# 여러 종목 동시 조회
+
+def _fetch_with_retry(fetcher, symbol, start, end, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return fetcher(symbol, start, end)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+def fetch_prices(windows, fetcher=cached_fetch_price, max_workers=PRICE_FETCH_WORKERS,
+                 timeout=PRICE_FETCH_TIMEOUT, retries=PRICE_FETCH_RETRIES, backoff=PRICE_FETCH_BACKOFF, refresh=False):
+    """
+    windows({symbol: (start, end)})의 종목을 최대 max_workers개씩 병렬로 조회한다.
+    fetcher(symbol, start, end)가 실패하면 backoff, 2*backoff, ... 간격으로 retries번 재시도하고,
+    조회를 시작한 지 timeout초가 지나도록 끝나지 않은 종목은 실패로 처리한다.
+    refresh=True면 fetcher에 refresh=True를 넘겨 캐시를 무시하고 새로 받게 한다.
+    반환값: (price_dict, failed) - failed는 {symbol: 예외}
+    """
+    price_dict = {}
+    failed = {}
+    started = {}
+    if refresh:
+        fetcher = partial(fetcher, refresh=True)
+
+    def task(symbol):
+        started[symbol] = time.monotonic()
+        start, end = windows[symbol]
+        return _fetch_with_retry(fetcher, symbol, start, end, retries, backoff)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    # 워커 스레드에서도 현재 측정 실행(contextvars)에 기록되도록 컨텍스트를 복사해 실행
+    futures = {executor.submit(contextvars.copy_context().run, task, symbol): symbol for symbol in windows}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol = futures[future]
+                try:
+                    price_dict[symbol] = future.result()
+                except Exception as e:
+                    failed[symbol] = e
+
+            # 제한시간을 넘긴 종목은 기다리지 않는다 (스레드는 백그라운드에서 마저 끝남)
+            now = time.monotonic()
+            for future in list(pending):
+                symbol = futures[future]
+                if symbol in started and now - started[symbol] > timeout:
+                    failed[symbol] = TimeoutError(f"{timeout}초 내에 응답이 없습니다.")
+                    pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return price_dict, failed
+
+# ---------------------------
+# 가격 패널
+
+shared_panel_cache = TTLCache(maxsize=16, ttl=PRICE_MEMORY_CACHE_TTL)
+
+def load_price_panel(windows, refresh=False):
+    """
+    windows({티커: (start, end)})의 종목별 구간 가격을 PricePanel로 반환한다. 반환값: (panel, failed)
+    결과는 실패 종목과 함께 프로세스 공용 캐시에 보관한다. 실패 종목이 있으면 PRICE_FAILED_CACHE_TTL초만 보관해
+    늘 실패하는 종목 때문에 매 실행마다 재시도하지 않고, 그 뒤나 refresh=True일 때 다시 조회한다.
+    refresh=True면 패널 / 종목별 메모리 캐시 / 디스크 캐시를 모두 건너뛰고 새로 받아 각 캐시를 갱신한다.
+    """
+    windows = {str(ticker): (pd.Timestamp(start).date(), pd.Timestamp(end).date())
+               for ticker, (start, end) in windows.items()}
+    tickers = list(windows)
+    key = (get_price_source().name, tuple(windows.items()))
+    cached = None if refresh else shared_panel_cache.get(key)
+    if cached is not None:
+        count("price.panel_cache_hit")
+        return cached
+
+    with timer("price.fetch_all"):
+        fetched, failed = fetch_prices(windows, refresh=refresh)
+    count("price.failed", len(failed))
+    with timer("price.build_panel"):
+        panel = build_price_panel(fetched, tickers)
+    shared_panel_cache.set(key, (panel, failed), ttl=PRICE_FAILED_CACHE_TTL if failed else None)
+    return panel, failed
+
+def load_account_prices(trading_log, today=None, refresh=False):
+    """
+    거래로그에 있는 티커 중 가격이 필요한 티커의 PricePanel (날짜 × 티커)과 조회 실패 티커 목록.
+    티커별 조회 구간은 plan_price_windows가 정한다 (today: 기준일, 기본값은 오늘, refresh: 캐시된 패널 무시).
+    Streamlit 없이 사용할 수 있으므로 배치 리포트 / 미리 받기에서도 같은 경로로 가격을 불러온다.
+    """
+    return load_price_panel(plan_price_windows(trading_log, today or datetime.today()), refresh=refresh)
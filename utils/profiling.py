@@ -0,0 +1,101 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from utils.config import PROFILE_LOG_PATH
+
+# ---------------------------
+# 구간별 시간 / 카운터 측정
+# 측정은 start_run()으로 시작한 실행(페이지 한 번 그리기 등)에만 기록된다. 실행 중이 아니면
+# timer()는 공용 no-op 객체를, count()는 바로 반환하므로 코드에 계속 남겨 두어도 비용이 거의 없다.
+# 실행 기록은 contextvars로 전달되므로 세션(스크립트 실행 스레드)끼리 섞이지 않는다.
+
+_current = contextvars.ContextVar("profile_run", default=None)
+
+class ProfileRun:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.timings = {}  # 구간 이름 -> 누적 초
+        self.counters = {}  # 카운터 이름 -> 누적 값
+        self._lock = threading.Lock()  # 가격 조회 워커 스레드에서도 기록
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def add_count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def record(self):
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "run": self.name,
+            "total_s": round(self.total(), 6),
+            "timings_s": {name: round(seconds, 6) for name, seconds in self.timings.items()},
+            "counters": dict(self.counters),
+        }
+
+class _Timer:
+    __slots__ = ("run", "name", "started")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.run.add_time(self.name, time.perf_counter() - self.started)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name):
+    """with timer("이름"): ... 구간 시간을 현재 실행에 누적"""
+    run = _current.get()
+    return _NULL_TIMER if run is None else _Timer(run, name)
+
+def count(name, value=1):
+    run = _current.get()
+    if run is not None:
+        run.add_count(name, value)
+
+def current_run():
+    return _current.get()
+
+def start_run(name):
+    run = ProfileRun(name)
+    _current.set(run)
+    return run
+
+def finish_run(log_path=PROFILE_LOG_PATH):
+    """현재 실행을 끝내고 기록을 로그 파일(JSON Lines)에 한 줄 추가한다."""
+    run = _current.get()
+    if run is None:
+        return None
+    _current.set(None)
+    record = run.record()
+    if log_path:
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
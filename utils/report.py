@@ -0,0 +1,88 @@
+"""
+배치 리포트 (Streamlit 없이 실행)
+
+    python -m utils.report                  # 국내/해외 계좌를 별도 프로세스에서 동시에 계산
+    python -m utils.report --market KR --format json --out ./data/report
+
+계좌별로 <out>/<market>/ 아래에 표(평가손익, 실현손익, 일별 총자산, 목표수익률·지표, 투자비중)와
+summary.json(요약 지표, 가격 조회 실패 종목)을 저장한다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from utils.analysis import analyze_account
+from utils.prices import load_account_prices
+from utils.fx import load_fx_series
+from utils.trade_store import TradeStore
+from utils.config import REPORT_DIR, FX_SYMBOL
+
+MARKETS = ["KR", "US"]
+
+def _write_table(df, path, fmt):
+    if fmt == "parquet":
+        df.to_parquet(f"{path}.parquet")
+    else:
+        df.to_json(f"{path}.json", orient="records", force_ascii=False, date_format="iso", indent=2)
+
+def run_report(market, out_dir=REPORT_DIR, fmt="parquet", apply_fee=True):
+    """한 계좌의 리포트를 계산해 out_dir/market 에 저장하고 요약(dict)을 반환한다."""
+    started = time.perf_counter()
+
+    store = TradeStore()
+    store.sync_csv(market)
+    trading_log = store.load(market)
+    price_panel, failed = load_account_prices(trading_log)
+    fx_series = None
+    if market == "US" and not trading_log.empty:
+        fx_series, fx_error = load_fx_series(trading_log["거래일"].min(), datetime.today())
+        if fx_error is not None:
+            failed = [*failed, FX_SYMBOL]
+
+    result = analyze_account(market, trading_log, price_panel, apply_fee=apply_fee, state_key=market,
+                             fx_series=fx_series)
+    summary = result.pop("summary")
+    summary["가격조회실패"] = sorted(failed)
+
+    market_dir = os.path.join(out_dir, market)
+    os.makedirs(market_dir, exist_ok=True)
+    for name, df in result.items():
+        # nav는 날짜 index를 열로 남긴다
+        _write_table(df.rename_axis("날짜").reset_index() if name == "nav" else df,
+                     os.path.join(market_dir, name), fmt)
+
+    summary["소요시간(초)"] = round(time.perf_counter() - started, 3)
+    with open(os.path.join(market_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="계좌 분석 배치 리포트")
+    parser.add_argument("--market", choices=MARKETS, nargs="+", default=MARKETS)
+    parser.add_argument("--out", default=REPORT_DIR, help="출력 경로")
+    parser.add_argument("--format", choices=["parquet", "json"], default="parquet", help="표 저장 형식")
+    parser.add_argument("--no-fee", action="store_true", help="수수료 미적용")
+    args = parser.parse_args(argv)
+
+    # 계좌별로 가격 조회와 계산이 독립적이므로 프로세스를 나눠 동시에 실행
+    with ProcessPoolExecutor(max_workers=len(args.market)) as executor:
+        futures = {market: executor.submit(run_report, market, args.out, args.format, not args.no_fee)
+                   for market in args.market}
+
+    exit_code = 0
+    for market, future in futures.items():
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"[{market}] 실패: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        print(json.dumps(summary, ensure_ascii=False))
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+import 시간 / 첫 화면 표시 시간 측정
+
+    python -m utils.startup                                  # 기본 페이지
+    python -m utils.startup --page "국내계좌 매수/매도 정보 입력"
+
+매번 새 파이썬 프로세스에서 측정하므로 콜드 스타트 기준이다.
+반환값(dict)으로 무거운 모듈이 첫 화면에서 로드되지 않았는지 테스트에서 확인할 수 있다.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# 첫 화면에서 필요할 때까지 로드를 미루는 모듈
+LAZY_MODULES = ["FinanceDataReader", "pages_module.page_kr", "pages_module.page_us"]
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def import_times(module, top=10):
+    """module을 새 프로세스에서 import할 때 누적 import 시간(ms)이 큰 순서로 top개"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=os.path.dirname(APP_PATH), check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return dict(sorted(times.items(), key=lambda item: -item[1])[:top])
+
+_STARTUP_SCRIPT = """
+import json, sys, threading, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+if sys.argv[2]:
+    at.session_state["page"] = sys.argv[2]
+ready = time.perf_counter()
+at.run()
+finished = time.perf_counter()
+print(json.dumps({
+    "test_harness_s": round(ready - started, 3),
+    "first_run_s": round(finished - ready, 3),
+    "exceptions": [e.value for e in at.exception],
+    "loaded": [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+    "threads": sorted(thread.name for thread in threading.enumerate()),
+}, ensure_ascii=False))
+"""
+
+def startup_report(page=None):
+    """
+    새 프로세스에서 app.py를 한 번 실행(첫 화면)하는 데 걸린 시간, 로드된 LAZY_MODULES, 실행 중인 스레드.
+    page를 주면 해당 페이지를 첫 화면으로 실행한다.
+    """
+    # 실제 실행과 같게 가격 미리 받기 스케줄러도 켠 채로 측정한다 (끄려면 PREFETCH_ENABLED=0)
+    proc = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT, APP_PATH, page or "", json.dumps(LAZY_MODULES)],
+                          capture_output=True, text=True, cwd=os.path.dirname(APP_PATH), check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import / 첫 화면 표시 시간 측정")
+    parser.add_argument("--page", default=None, help="첫 화면으로 실행할 페이지")
+    parser.add_argument("--top", type=int, default=10, help="표시할 import 항목 수")
+    args = parser.parse_args(argv)
+
+    report = {
+        "import_ms": import_times("utils.data_loader", top=args.top),
+        "startup": startup_report(args.page),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
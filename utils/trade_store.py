@@ -0,0 +1,192 @@
+import os
+import sqlite3
+from contextlib import closing, nullcontext
+import pandas as pd
+
+from utils.config import TRADE_DB_PATH
+
+# ---------------------------
+# 거래로그 저장소 (SQLite)
+# 거래 추가/삭제는 한 행 단위 트랜잭션으로 처리하고, 조회는 티커/거래일 인덱스를 사용한다.
+# CSV(저장소에 Push하는 원본)가 마지막으로 가져오거나 내보낸 이후 바뀐 경우에만 다시 가져오며,
+# Push용 CSV는 export_csv()로 내보낸다.
+# 내보내지 않은 추가/삭제는 행의 상태(status)로 기록해 두고, CSV를 다시 가져올 때 CSV 내용과 합친다.
+
+TABLES = {
+    "KR": ("trading_log", ["구분1", "구분2", "거래일", "티커", "종목명", "거래유형", "거래수량", "평균단가", "금액"],
+           "./data/trading_log.csv"),
+    "US": ("trading_log_us", ["티커", "이름", "거래일", "거래유형", "구분", "거래수량", "평균단가", "금액"],
+           "./data/trading_log_us.csv"),
+}
+
+COLUMN_TYPES = {"거래수량": "INTEGER", "평균단가": "REAL", "금액": "NUMERIC"}
+
+# 행 상태: CSV와 같음 / 추가 후 아직 내보내지 않음 / 삭제 후 아직 내보내지 않음
+SYNCED, ADDED, DELETED = 0, 1, 2
+
+class TradeStore:
+    def __init__(self, path=TRADE_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for market, (table, columns, _) in TABLES.items():
+                column_defs = ", ".join(f'"{col}" {COLUMN_TYPES.get(col, "TEXT")}' for col in columns)
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs}, '
+                             f'status INTEGER NOT NULL DEFAULT {SYNCED})')
+                if "status" not in {info[1] for info in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN status INTEGER NOT NULL DEFAULT {SYNCED}")
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_ticker_date ON {table} ("티커", "거래일")')
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} ("거래일")')
+            conn.execute("CREATE TABLE IF NOT EXISTS csv_sync (market TEXT PRIMARY KEY, signature TEXT)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _csv_signature(csv_path):
+        stat = os.stat(csv_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _is_synced(self, market, csv_path, conn=None):
+        with closing(self._connect()) if conn is None else nullcontext(conn) as conn:
+            synced = conn.execute("SELECT signature FROM csv_sync WHERE market = ?", (market,)).fetchone()
+        return synced is not None and synced[0] == self._csv_signature(csv_path)
+
+    def _mark_synced(self, conn, market, csv_path):
+        conn.execute("INSERT OR REPLACE INTO csv_sync (market, signature) VALUES (?, ?)",
+                     (market, self._csv_signature(csv_path)))
+
+    def sync_csv(self, market):
+        """
+        CSV가 마지막 동기화 이후 바뀌었으면(예: git pull) CSV 내용을 가져와 합친다.
+        CSV에 그대로 남은 거래는 id를 유지하고, CSV에서 빠진 거래는 지우고, 새 거래는 추가한다.
+        내보내지 않은 추가/삭제는 그대로 유지한다 (같은 거래가 CSV에 들어온 추가분은 CSV 거래로 본다).
+        반환: CSV가 바뀌지 않았으면 None, 가져왔으면 유지된 로컬 변경 {"추가": 건수, "삭제": 건수}
+        """
+        table, columns, csv_path = TABLES[market]
+        if not os.path.exists(csv_path):
+            return None
+        if self._is_synced(market, csv_path):
+            return None
+
+        df = pd.read_csv(csv_path, dtype={"티커": str})
+        csv_rows = [self._row(record, columns) for record in df.to_dict("records")]
+        select = ", ".join(f'"{col}"' for col in columns)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # 여러 세션이 동시에 가져오지 않도록 쓰기 잠금 후 다시 확인
+            if self._is_synced(market, csv_path, conn):
+                return None
+            # 같은 내용의 기존 행에 CSV 행을 하나씩 대응 (CSV 출신 행 먼저, 그다음 내보내지 않은 추가분)
+            existing = {}
+            rows = conn.execute(f"SELECT id, status, {select} FROM {table} ORDER BY status = {ADDED}, id")
+            for trade_id, status, *row in rows:
+                existing.setdefault(self._key(row), []).append((trade_id, status))
+
+            inserts, confirmed = [], []
+            for row in csv_rows:
+                matches = existing.get(self._key(row))
+                if not matches:
+                    inserts.append(row)
+                    continue
+                trade_id, status = matches.pop(0)
+                if status == ADDED:
+                    confirmed.append((trade_id,))
+
+            # 대응되지 않은 CSV 출신 행(삭제 대기 포함)은 CSV에서 빠진 거래이므로 지운다
+            removed = [(trade_id,) for matches in existing.values() for trade_id, status in matches if status != ADDED]
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", removed)
+            conn.executemany(f"UPDATE {table} SET status = {SYNCED} WHERE id = ?", confirmed)
+            conn.executemany(self._insert_sql(table, columns), inserts)
+            self._mark_synced(conn, market, csv_path)
+        return self.pending(market)
+
+    def pending(self, market):
+        """아직 CSV로 내보내지 않은 변경 건수 {"추가": n, "삭제": n}"""
+        table, _, _ = TABLES[market]
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute(f"SELECT status, COUNT(*) FROM {table} WHERE status != {SYNCED} GROUP BY status"))
+        return {"추가": counts.get(ADDED, 0), "삭제": counts.get(DELETED, 0)}
+
+    def load(self, market, tickers=None, start=None, end=None):
+        """거래로그 조회 (index: id). tickers / start / end를 주면 인덱스 범위 조회로 해당 거래만 읽는다."""
+        table, columns, _ = TABLES[market]
+        where, params = [], []
+        if tickers is not None:
+            tickers = list(tickers)
+            where.append(f'"티커" IN ({", ".join("?" * len(tickers))})')
+            params += tickers
+        if start is not None:
+            where.append('"거래일" >= ?')
+            params.append(pd.Timestamp(start).date().isoformat())
+        if end is not None:
+            where.append('"거래일" <= ?')
+            params.append(pd.Timestamp(end).date().isoformat())
+
+        where.append(f"status != {DELETED}")
+        select = ", ".join(f'"{col}"' for col in columns)
+        sql = f"SELECT id, {select} FROM {table} WHERE " + " AND ".join(where)
+        sql += ' ORDER BY "거래일", id'
+
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, index_col="id", params=params, dtype={"티커": str})
+        df["거래일"] = pd.to_datetime(df["거래일"])
+        return df
+
+    def append(self, market, trade):
+        """거래 한 건 추가 후 id 반환 (내보내기 전까지 추가 대기 상태)"""
+        table, columns, _ = TABLES[market]
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(self._insert_sql(table, columns, status=ADDED), self._row(trade, columns))
+            return cursor.lastrowid
+
+    def delete(self, market, ids):
+        """거래 삭제 (내보내지 않은 추가분은 바로 지우고, CSV 출신 거래는 내보내기 전까지 삭제 대기 상태로 둔다)"""
+        table, _, _ = TABLES[market]
+        ids = [(int(trade_id),) for trade_id in ids]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(f"DELETE FROM {table} WHERE id = ? AND status = {ADDED}", ids)
+            conn.executemany(f"UPDATE {table} SET status = {DELETED} WHERE id = ?", ids)
+
+    def export_csv(self, market):
+        """
+        Push용 CSV로 내보내기 (임시 파일에 쓴 뒤 교체하므로 중간에 끊겨도 기존 파일은 보존).
+        그사이 CSV가 바뀌었으면 먼저 합쳐서 다른 곳에서 들어온 거래를 덮어쓰지 않는다.
+        """
+        table, columns, csv_path = TABLES[market]
+        self.sync_csv(market)
+        select = ", ".join(f'"{col}"' for col in columns)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # 읽은 뒤 상태를 바꾸기 전까지 다른 추가/삭제를 막음
+            df = pd.read_sql_query(f'SELECT {select} FROM {table} WHERE status != {DELETED} ORDER BY "거래일", id',
+                                   conn, dtype={"티커": str})
+            tmp_path = f"{csv_path}.{os.getpid()}.tmp"
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, csv_path)
+            conn.execute(f"DELETE FROM {table} WHERE status = {DELETED}")
+            conn.execute(f"UPDATE {table} SET status = {SYNCED} WHERE status = {ADDED}")
+            self._mark_synced(conn, market, csv_path)
+        return csv_path
+
+    @staticmethod
+    def _insert_sql(table, columns, status=SYNCED):
+        names = ", ".join(f'"{col}"' for col in columns)
+        return f'INSERT INTO {table} ({names}, status) VALUES ({", ".join("?" * len(columns))}, {status})'
+
+    @staticmethod
+    def _key(row):
+        """CSV 행과 저장된 행을 맞춰 보기 위한 내용 키 (숫자는 float로, 빈 값은 None으로 맞춤)"""
+        return tuple(None if pd.isna(value) else float(value) if isinstance(value, (int, float)) else value
+                     for value in row)
+
+    @staticmethod
+    def _row(trade, columns):
+        row = []
+        for col in columns:
+            value = trade.get(col)
+            if col == "거래일":
+                value = pd.Timestamp(value).date().isoformat()
+            elif hasattr(value, "item"):  # numpy 스칼라 -> 파이썬 값
+                value = value.item()
+            row.append(value)
+        return row
@@ -0,0 +1,102 @@
+import bisect
+from collections import defaultdict
+
+# ---------------------------
+# 투자대상 종목 검색 인덱스
+# 종목 목록은 한 번만 읽어 정확 일치(dict), 접두어(정렬 리스트 + bisect), 부분 문자열, 2-gram 유사 검색용
+# 인덱스를 만들어 두고, 입력 페이지의 키 입력마다 전체 DataFrame을 훑지 않고 조회한다.
+
+def _normalize(text):
+    return "".join(str(text).split()).lower()
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class InstrumentIndex:
+    def __init__(self, df, ticker_col, name_col, ticker_prefix=""):
+        """
+        df: 종목 목록, ticker_col / name_col: 티커 / 종목명 열
+        ticker_prefix: 목록의 티커에 붙어 있는 접두어 (국내 ETF 목록의 'A'), 검색 키와 결과 티커에서는 뗀다.
+        """
+        self.ticker_prefix = ticker_prefix
+        self.records = df.to_dict("records")
+        for record in self.records:
+            ticker = str(record[ticker_col])
+            record["티커"] = ticker[len(ticker_prefix):] if ticker_prefix and ticker.startswith(ticker_prefix) else ticker
+            record["종목명"] = record[name_col]
+
+        self._tickers = [_normalize(record["티커"]) for record in self.records]
+        self._names = [_normalize(record["종목명"]) for record in self.records]
+        self._exact = {ticker: row for row, ticker in enumerate(self._tickers)}
+        self._ticker_keys = sorted(zip(self._tickers, range(len(self.records))))
+        self._name_keys = sorted(zip(self._names, range(len(self.records))))
+
+        self._grams = defaultdict(list)  # 2-gram -> 행 번호
+        for row, (ticker, name) in enumerate(zip(self._tickers, self._names)):
+            for gram in _bigrams(ticker) | _bigrams(name):
+                self._grams[gram].append(row)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _key(self, query):
+        key = _normalize(query)
+        prefix = self.ticker_prefix.lower()
+        if prefix and key.startswith(prefix) and key[len(prefix):].isdigit():
+            key = key[len(prefix):]
+        return key
+
+    def lookup(self, query):
+        """정확히 일치하는 티커의 종목 정보(dict), 없으면 None. 숫자 티커는 앞자리 0을 채워서도 찾는다."""
+        key = self._key(query)
+        row = self._exact.get(key)
+        if row is None and key.isdigit():
+            row = self._exact.get(key.zfill(6))
+        return None if row is None else self.records[row]
+
+    @staticmethod
+    def _prefix_rows(keys, key):
+        start = bisect.bisect_left(keys, (key,))
+        rows = []
+        for text, row in keys[start:]:
+            if not text.startswith(key):
+                break
+            rows.append(row)
+        return rows
+
+    def search(self, query, limit=10, min_score=0.5):
+        """
+        타이핑 중인 검색어로 종목 후보를 찾아 순위대로 반환 (list of dict).
+        순위: 티커 정확 일치 > 티커 접두어 > 종목명 접두어 > 종목명 부분 일치 > 2-gram 유사도(min_score 이상)
+        """
+        key = self._key(query)
+        if not key:
+            return []
+
+        ranked = {}  # 행 번호 -> (순위, -유사도, 종목명 길이)
+        def add(rows, tier, score=1.0):
+            for row in rows:
+                rank = (tier, -score, len(self._names[row]))
+                if row not in ranked or rank < ranked[row]:
+                    ranked[row] = rank
+
+        exact = self.lookup(query)
+        if exact is not None:
+            add([self._exact[_normalize(exact["티커"])]], 0)
+        add(self._prefix_rows(self._ticker_keys, key), 1)
+        add(self._prefix_rows(self._name_keys, key), 2)
+        add([row for row, name in enumerate(self._names) if key in name], 3)
+
+        query_grams = _bigrams(key)
+        if query_grams:
+            hits = defaultdict(int)
+            for gram in query_grams:
+                for row in self._grams.get(gram, ()):
+                    hits[row] += 1
+            for row, count in hits.items():
+                score = count / len(query_grams)
+                if score >= min_score:
+                    add([row], 4, score)
+
+        rows = sorted(ranked, key=lambda row: (ranked[row], row))[:limit]
+        return [self.records[row] for row in rows]